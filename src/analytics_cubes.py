@@ -0,0 +1,446 @@
+# src/analytics_cubes.py
+
+"""
+Precomputed aggregates ("cubes") of the players table for the exploratory plots of
+notebooks/analyse.ipynb: the plots are drawn from a few small arrays instead of
+group-bys, histograms and a correlation matrix recomputed over the raw frame.
+
+    python src/analytics_cubes.py                          # build / refresh + render the 5 plots
+    python src/analytics_cubes.py --data data/synthetic_10m.csv --output-dir /tmp/plots
+
+    cubes = AnalyticsCubes.load_or_build(DATA_PATH)        # refreshed with the appended rows
+    plot_distributions(cubes, "distributions.png")
+
+What is kept (all of it adds up: chunks, appended rows and merge() just sum arrays):
+- counts per integer value of age, overall_rating and potential (histograms),
+- counts per nationality,
+- an age x overall_rating grid of counts (mean rating by age),
+- an overall_rating x log10(value_euro) grid of counts (value vs rating density),
+- for every pair of numeric columns, the count / sums / sums of squares / sum of
+  products of the rows where both are present: the pairwise correlation matrix
+  (same as DataFrame.corr()). The values are shifted by the means of the first
+  chunk, so the sums stay accurate on millions of rows.
+
+The cubes of data/fifa_players.csv are saved in data/.cache/fifa_players.cubes.npz
+(a few tens of KB). load_or_build() reads them, parses only the rows appended to the
+CSV since they were built (the file grew and its previous end is unchanged), and
+rebuilds them from scratch when the CSV was modified in any other way.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from config import DATA_PATH
+from data_loader import FIFA_SCHEMA, iter_players_csv
+
+
+FORMAT_VERSION = 1
+
+HISTOGRAM_COLS = ["age", "overall_rating", "potential"]
+
+# Integer values 0..127 (int8 columns of the loader schema); outside values are clipped
+N_VALUES = 128
+
+# value_euro bins: 10^3 to 10^9 euros, 20 bins per decade (outside values are clipped)
+VALUE_LOG_EDGES = np.linspace(3.0, 9.0, 121)
+
+DEFAULT_CHUNK_SIZE = 200_000
+
+# Bytes before the recorded end of the CSV that must be unchanged to only read the appended rows
+TAIL_BYTES = 1 << 16
+
+
+def default_cubes_path(csv_path):
+    """<csv folder>/.cache/<csv name without extension>.cubes.npz"""
+    csv_dir, csv_name = os.path.split(os.path.abspath(csv_path))
+    return os.path.join(csv_dir, ".cache", f"{os.path.splitext(csv_name)[0]}.cubes.npz")
+
+
+def _integer_bins(values):
+    """Rounded integer values 0..N_VALUES-1 of a column, missing values removed"""
+    values = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64)
+    values = values[~np.isnan(values)]
+    return np.clip(np.rint(values), 0, N_VALUES - 1).astype(np.intp)
+
+
+def _source_info(csv_path):
+    """Size, mtime and hash of the last TAIL_BYTES bytes of the CSV"""
+    stat = os.stat(csv_path)
+    with open(csv_path, "rb") as f:
+        f.seek(max(stat.st_size - TAIL_BYTES, 0))
+        tail = hashlib.sha256(f.read(TAIL_BYTES)).hexdigest()
+    return {"path": os.path.abspath(csv_path), "size": stat.st_size, "mtime": stat.st_mtime, "tail_sha256": tail}
+
+
+def _tail_unchanged(csv_path, source):
+    """True if the first source['size'] bytes of the CSV end like when they were read"""
+    with open(csv_path, "rb") as f:
+        f.seek(max(source["size"] - TAIL_BYTES, 0))
+        tail = f.read(min(TAIL_BYTES, source["size"]))
+    return hashlib.sha256(tail).hexdigest() == source["tail_sha256"]
+
+
+class AnalyticsCubes:
+    """Additive aggregates of a players table (see the module docstring)"""
+
+    def __init__(self, numeric_cols):
+        self.numeric_cols = list(numeric_cols)
+        p = len(self.numeric_cols)
+        self.n_rows = 0
+        self.histograms = np.zeros((len(HISTOGRAM_COLS), N_VALUES), dtype=np.int64)
+        self.nationalities = {}
+        self.age_rating = np.zeros((N_VALUES, N_VALUES), dtype=np.int64)
+        self.value_rating = np.zeros((N_VALUES, len(VALUE_LOG_EDGES) - 1), dtype=np.int64)
+        # Pairwise sums over the rows where both columns are present ([i, j] sums column i)
+        self.shift = None
+        self.pair_n = np.zeros((p, p))
+        self.pair_sum = np.zeros((p, p))
+        self.pair_sum_sq = np.zeros((p, p))
+        self.pair_sum_prod = np.zeros((p, p))
+        self.source = None
+
+    @classmethod
+    def from_frame(cls, df):
+        cubes = cls(df.select_dtypes("number").columns)
+        cubes.update(df)
+        return cubes
+
+    @classmethod
+    def from_csv(cls, csv_path=DATA_PATH, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Cubes of a players CSV, read in chunks (the memory only depends on chunk_size)"""
+        source = _source_info(csv_path)
+        cubes = None
+        for chunk in iter_players_csv(csv_path, chunk_size, FIFA_SCHEMA):
+            if cubes is None:
+                cubes = cls(chunk.select_dtypes("number").columns)
+            cubes.update(chunk)
+        if cubes is None:
+            raise ValueError(f"No rows were found in {csv_path}.")
+        cubes.source = source
+        return cubes
+
+    # ---------- Updates ----------
+
+    def update(self, df):
+        """Add the rows of `df` to the aggregates"""
+        if df.empty:
+            return self
+        self.n_rows += len(df)
+
+        for h, col in enumerate(HISTOGRAM_COLS):
+            if col in df.columns:
+                self.histograms[h] += np.bincount(_integer_bins(df[col]), minlength=N_VALUES)
+
+        if "nationality" in df.columns:
+            for nationality, n in df["nationality"].value_counts(sort=False).items():
+                if n:
+                    self.nationalities[str(nationality)] = self.nationalities.get(str(nationality), 0) + int(n)
+
+        age = pd.to_numeric(df["age"], errors="coerce").to_numpy(dtype=np.float64)
+        rating = pd.to_numeric(df["overall_rating"], errors="coerce").to_numpy(dtype=np.float64)
+        both = ~np.isnan(age) & ~np.isnan(rating)
+        np.add.at(self.age_rating, (np.clip(np.rint(age[both]), 0, N_VALUES - 1).astype(np.intp),
+                                    np.clip(np.rint(rating[both]), 0, N_VALUES - 1).astype(np.intp)), 1)
+
+        if "value_euro" in df.columns:
+            value = pd.to_numeric(df["value_euro"], errors="coerce").to_numpy(dtype=np.float64)
+            both = ~np.isnan(rating) & (value > 0)
+            value_bins = np.clip(np.searchsorted(VALUE_LOG_EDGES, np.log10(value[both]), side="right") - 1,
+                                 0, len(VALUE_LOG_EDGES) - 2)
+            np.add.at(self.value_rating, (np.clip(np.rint(rating[both]), 0, N_VALUES - 1).astype(np.intp),
+                                          value_bins), 1)
+
+        values = np.column_stack([pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=np.float64)
+                                  if c in df.columns else np.full(len(df), np.nan)
+                                  for c in self.numeric_cols])
+        present = ~np.isnan(values)
+        if self.shift is None:
+            with np.errstate(invalid="ignore"):
+                counts = present.sum(axis=0)
+                self.shift = np.where(counts > 0, np.nansum(values, axis=0) / np.maximum(counts, 1), 0.0)
+        centered = np.where(present, values - self.shift, 0.0)
+        present = present.astype(np.float64)
+        self.pair_n += present.T @ present
+        self.pair_sum += centered.T @ present
+        self.pair_sum_sq += (centered ** 2).T @ present
+        self.pair_sum_prod += centered.T @ centered
+        return self
+
+    def merge(self, other):
+        """Add the aggregates of `other` (built over the same numeric columns)"""
+        if other.numeric_cols != self.numeric_cols:
+            raise ValueError("Cannot merge cubes built over different numeric columns.")
+        if other.n_rows == 0:
+            return self
+        if self.shift is None:
+            self.shift = other.shift
+        # Re-center the sums of `other` on our shift: x - s = (x - s') + d with d = s' - s
+        d = other.shift - self.shift
+        n, s = other.pair_n, other.pair_sum
+        self.pair_sum_sq += other.pair_sum_sq + 2 * d[:, None] * s + d[:, None] ** 2 * n
+        self.pair_sum_prod += (other.pair_sum_prod + d[:, None] * s.T + s * d[None, :]
+                               + d[:, None] * d[None, :] * n)
+        self.pair_sum += s + d[:, None] * n
+        self.pair_n += n
+        self.n_rows += other.n_rows
+        self.histograms += other.histograms
+        self.age_rating += other.age_rating
+        self.value_rating += other.value_rating
+        for nationality, count in other.nationalities.items():
+            self.nationalities[nationality] = self.nationalities.get(nationality, 0) + count
+        return self
+
+    def refresh(self, csv_path, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Bring the cubes of `csv_path` up to date. Returns the number of rows read:
+        only the appended rows when the CSV grew, None if it had to be rebuilt.
+        """
+        current = _source_info(csv_path)
+        source = self.source or {}
+        if source.get("path") == current["path"] and source.get("size") == current["size"] \
+                and source.get("tail_sha256") == current["tail_sha256"]:
+            return 0
+        if source.get("path") == current["path"] and current["size"] > source.get("size", 0) > 0 \
+                and _tail_unchanged(csv_path, source):
+            before = self.n_rows
+            for chunk in iter_players_csv(csv_path, chunk_size, FIFA_SCHEMA, start_byte=source["size"]):
+                self.update(chunk)
+            self.source = current
+            return self.n_rows - before
+        rebuilt = AnalyticsCubes.from_csv(csv_path, chunk_size)
+        self.__dict__.update(rebuilt.__dict__)
+        return None
+
+    # ---------- Queries ----------
+
+    def histogram(self, col):
+        """Number of rows per (integer) value of a HISTOGRAM_COLS column"""
+        counts = self.histograms[HISTOGRAM_COLS.index(col)]
+        values = np.flatnonzero(counts)
+        return pd.Series(counts[values], index=pd.Index(values, name=col), name="count")
+
+    def nationality_counts(self):
+        """Number of players per nationality, most frequent first"""
+        counts = pd.Series(self.nationalities, name="count", dtype=np.int64).rename_axis("nationality")
+        return counts.sort_values(ascending=False, kind="stable")
+
+    def mean_rating_by_age(self):
+        """Average overall_rating of the players of each age"""
+        counts = self.age_rating.sum(axis=1)
+        ages = np.flatnonzero(counts)
+        sums = self.age_rating @ np.arange(N_VALUES)
+        return pd.Series(sums[ages] / counts[ages], index=pd.Index(ages, name="age"), name="overall_rating")
+
+    def correlation(self):
+        """Pairwise correlation matrix of the numeric columns (like DataFrame.corr())"""
+        n = self.pair_n
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_x, mean_y = self.pair_sum / n, self.pair_sum.T / n
+            cov = self.pair_sum_prod / n - mean_x * mean_y
+            var_x = self.pair_sum_sq / n - mean_x ** 2
+            var_y = self.pair_sum_sq.T / n - mean_y ** 2
+            corr = cov / np.sqrt(var_x * var_y)
+        corr[(var_x <= 0) | (var_y <= 0) | (n == 0)] = np.nan
+        return pd.DataFrame(np.clip(corr, -1.0, 1.0), index=self.numeric_cols, columns=self.numeric_cols)
+
+    # ---------- Persistence ----------
+
+    def save(self, path):
+        """Write the cubes as a compressed .npz (atomic replace)"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        meta = {"format_version": FORMAT_VERSION, "n_rows": self.n_rows, "source": self.source}
+        tmp_path = f"{path}.tmp-{os.getpid()}.npz"
+        np.savez_compressed(
+            tmp_path,
+            meta=np.array(json.dumps(meta)),
+            numeric_cols=np.array(self.numeric_cols, dtype=str),
+            histograms=self.histograms,
+            nationality_names=np.array(list(self.nationalities), dtype=str),
+            nationality_counts=np.array(list(self.nationalities.values()), dtype=np.int64),
+            age_rating=self.age_rating,
+            value_rating=self.value_rating,
+            shift=self.shift if self.shift is not None else np.zeros(len(self.numeric_cols)),
+            pair_n=self.pair_n,
+            pair_sum=self.pair_sum,
+            pair_sum_sq=self.pair_sum_sq,
+            pair_sum_prod=self.pair_sum_prod,
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("format_version") != FORMAT_VERSION:
+                raise ValueError(f"Unsupported analytics cubes format {meta.get('format_version')}.")
+            cubes = cls(data["numeric_cols"].tolist())
+            cubes.n_rows = meta["n_rows"]
+            cubes.source = meta["source"]
+            cubes.histograms = data["histograms"]
+            cubes.nationalities = dict(zip(data["nationality_names"].tolist(), data["nationality_counts"].tolist()))
+            cubes.age_rating = data["age_rating"]
+            cubes.value_rating = data["value_rating"]
+            cubes.shift = data["shift"] if cubes.n_rows else None
+            cubes.pair_n = data["pair_n"]
+            cubes.pair_sum = data["pair_sum"]
+            cubes.pair_sum_sq = data["pair_sum_sq"]
+            cubes.pair_sum_prod = data["pair_sum_prod"]
+        return cubes
+
+    @classmethod
+    def load_or_build(cls, csv_path=DATA_PATH, path=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """The saved cubes of `csv_path`, refreshed (or built) and saved again if the CSV changed"""
+        path = path or default_cubes_path(csv_path)
+        try:
+            cubes = cls.load(path)
+        except (FileNotFoundError, ValueError, KeyError):
+            cubes = cls.from_csv(csv_path, chunk_size)
+            cubes.save(path)
+            return cubes
+        if cubes.refresh(csv_path, chunk_size) != 0:
+            cubes.save(path)
+        return cubes
+
+
+# ---------- Plots (same figures as notebooks/analyse.ipynb) ----------
+
+def _save(fig, save_path):
+    if save_path:
+        fig.savefig(save_path)
+    return fig
+
+
+def plot_distributions(cubes, save_path=None):
+    """Histograms (+ KDE) of age, overall_rating and potential"""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    fig, axes = plt.subplots(1, 3, figsize=(18, 5))
+    for ax, col, color, title in zip(axes, HISTOGRAM_COLS, ["skyblue", "salmon", "lightgreen"],
+                                     ["Age Distribution", "Overall Rating Distribution", "Potential Distribution"]):
+        counts = cubes.histogram(col)
+        # Weighted KDE: Scott's bandwidth of the number of rows (not of the number of bins)
+        sns.histplot(x=counts.index.to_numpy(), weights=counts.to_numpy(), discrete=True, kde=True,
+                     kde_kws={"bw_method": max(int(counts.sum()), 1) ** -0.2}, ax=ax, color=color)
+        ax.set_xlabel(col)
+        ax.set_title(title)
+    fig.tight_layout()
+    return _save(fig, save_path)
+
+
+def plot_correlation_heatmap(cubes, save_path=None, k=10):
+    """Correlations between the k numeric columns most correlated with overall_rating"""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    corr = cubes.correlation()
+    cols = corr.nlargest(k, "overall_rating")["overall_rating"].index
+    fig = plt.figure(figsize=(10, 8))
+    sns.heatmap(corr.loc[cols, cols].to_numpy(), cbar=True, annot=True, square=True, fmt=".2f",
+                annot_kws={"size": 10}, yticklabels=cols.values, xticklabels=cols.values, cmap="coolwarm")
+    plt.title("Top 10 Features Correlated with Overall Rating")
+    return _save(fig, save_path)
+
+
+def plot_age_vs_rating(cubes, save_path=None):
+    """Average overall rating by age"""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    means = cubes.mean_rating_by_age()
+    fig = plt.figure(figsize=(12, 6))
+    sns.lineplot(x=means.index.to_numpy(), y=means.to_numpy(), color="purple")
+    plt.title("Average Overall Rating by Age")
+    plt.xlabel("Age")
+    plt.ylabel("Average Overall Rating")
+    return _save(fig, save_path)
+
+
+def plot_value_vs_rating(cubes, save_path=None):
+    """
+    Density of the players in the (overall rating, value) plane.
+
+    The notebook draws one point per player; with millions of rows the same plane is
+    drawn as a grid of counts (log color scale) over the binned ratings and values.
+    """
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import LogNorm
+
+    ratings = np.flatnonzero(cubes.value_rating.sum(axis=1))
+    grid = cubes.value_rating[ratings.min():ratings.max() + 1] if len(ratings) else cubes.value_rating[:1]
+    rating_edges = np.arange(ratings.min() if len(ratings) else 0, (ratings.max() if len(ratings) else 0) + 2) - 0.5
+    fig = plt.figure(figsize=(10, 6))
+    mesh = plt.pcolormesh(rating_edges, 10 ** VALUE_LOG_EDGES, np.ma.masked_equal(grid, 0).T,
+                          norm=LogNorm(), cmap="Oranges")
+    plt.colorbar(mesh, label="Number of Players")
+    plt.title("Player Value vs Overall Rating")
+    plt.xlabel("Overall Rating")
+    plt.ylabel("Value (Euro)")
+    plt.yscale("log")  # Use log scale for value due to large range
+    return _save(fig, save_path)
+
+
+def plot_top_nationalities(cubes, save_path=None, top=10):
+    """Number of players of the most frequent nationalities"""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    top_nationalities = cubes.nationality_counts().head(top)
+    fig = plt.figure(figsize=(12, 6))
+    sns.barplot(x=top_nationalities.values, y=top_nationalities.index, hue=top_nationalities.index,
+                palette="viridis", legend=False)
+    plt.title("Top 10 Nationalities by Player Count")
+    plt.xlabel("Number of Players")
+    return _save(fig, save_path)
+
+
+PLOTS = {
+    "distributions.png": plot_distributions,
+    "correlation_heatmap.png": plot_correlation_heatmap,
+    "age_vs_rating.png": plot_age_vs_rating,
+    "value_vs_rating.png": plot_value_vs_rating,
+    "top_nationalities.png": plot_top_nationalities,
+}
+
+
+# ---------- CLI ----------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aggregate cubes of a players CSV and the exploratory plots")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--cubes", help="Cubes file (default: <data folder>/.cache/<name>.cubes.npz)")
+    parser.add_argument("--output-dir", help="Save the plots in this folder")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the cubes from the whole CSV")
+    args = parser.parse_args(argv)
+
+    path = args.cubes or default_cubes_path(args.data)
+    start = time.perf_counter()
+    if args.rebuild and os.path.exists(path):
+        os.remove(path)
+    cubes = AnalyticsCubes.load_or_build(args.data, path, args.chunk_size)
+    print(f"✅ Cubes of {cubes.n_rows:,d} rows ready in {time.perf_counter() - start:.2f} s -> {path} "
+          f"({os.path.getsize(path) / 1024:,.0f} KB)")
+
+    if args.output_dir:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
+        sns.set(style="whitegrid", palette="muted")
+        os.makedirs(args.output_dir, exist_ok=True)
+        start = time.perf_counter()
+        for file_name, plot in PLOTS.items():
+            plt.close(plot(cubes, os.path.join(args.output_dir, file_name)))
+        print(f"✅ {len(PLOTS)} plots saved in {args.output_dir} in {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
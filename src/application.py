@@ -1,11 +1,24 @@
-import streamlit as st
-import pandas as pd
-import numpy as np
-import joblib
+# Startup instrumentation first: it times the imports below (cold start of a new container)
+from startup_profile import STARTUP
+
+with STARTUP.measure_import("streamlit"):
+    import streamlit as st
+with STARTUP.measure_import("pandas"):
+    import pandas as pd
 import os
 from datetime import datetime
-import xgboost as xgb
-import csv
+from concurrent.futures import ThreadPoolExecutor
+import sqlite3
+# Light modules: XGBoost, scikit-learn and joblib are only imported when the models
+# are unpickled, in the background thread started below.
+with STARTUP.measure_import("model_registry"):
+    from model_registry import load_serving_predictor, registry_fingerprint
+with STARTUP.measure_import("prediction_cache"):
+    from prediction_cache import MODEL_FILES, PredictionCache, model_fingerprint
+with STARTUP.measure_import("history_store"):
+    from history_store import HistoryStore, HistoryAggregates
+with STARTUP.measure_import("similarity_index"):
+    from similarity_index import SimilarityIndex
 
 # 1. Page configuration
 st.set_page_config(page_title="AI Football Scout", layout="wide", initial_sidebar_state="expanded")
@@ -15,37 +28,87 @@ st.markdown("### Player Performance Analysis & Prediction with XGBoost")
 # Define the project root path
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-# 2. Load models (cached for speed)
+MODELS_DIR = os.path.join(PROJECT_ROOT, 'models')
+MODEL_REGISTRY_DIR = os.path.join(MODELS_DIR, 'registry')
+SIMILARITY_INDEX_DIR = os.path.join(MODELS_DIR, 'similarity_index')
+
+# Max number of predictions kept in the shared prediction cache
+PREDICTION_CACHE_SIZE = 4096
+
+# 2. Load models (in the background, once per set of model files)
+# Unpickling the models imports XGBoost + scikit-learn (most of the cold start) and the
+# first XGBoost predict is slow too. Both run in a background thread started by the first
+# session, so the page renders right away and the models are usually ready before the
+# first click on "Analyze". The models come from the active version of the model
+# registry (the .pkl files if there is no registry yet). The fingerprint of the active
+# version is part of the cache key: activating another version (model_registry.py
+# activate vXXXX) or retraining switches the app to the new models without a restart.
+def _load_and_warm_predictor():
+    with STARTUP.measure("model loading"):
+        predictor = load_serving_predictor(MODELS_DIR, MODEL_REGISTRY_DIR)
+    with STARTUP.measure("model warm-up (first predict)"):
+        predictor.warm_up()
+    STARTUP.mark("models ready")
+    return predictor
+
 @st.cache_resource
-def load_models():
-    try:
-        models_dir = os.path.join(PROJECT_ROOT, 'models')
-        reg_model = joblib.load(os.path.join(models_dir, 'regression_model.pkl'))
-        clf_model = joblib.load(os.path.join(models_dir, 'classification_model.pkl'))
-        return reg_model, clf_model
-    except FileNotFoundError:
-        return None, None
+def start_model_loading(fingerprint):
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-warmup")
+    future = executor.submit(_load_and_warm_predictor)
+    executor.shutdown(wait=False)  # the thread exits once the models are loaded
+    return future
 
-reg_model, clf_model = load_models()
+# One prediction cache shared by all the sessions
+@st.cache_resource
+def get_prediction_cache():
+    return PredictionCache(max_size=PREDICTION_CACHE_SIZE)
 
-if reg_model is None or clf_model is None:
-    st.error("❌ Models not found! Please run training with 'ml_analysis.py' first")
-    st.stop()
+models_fingerprint = registry_fingerprint(MODEL_REGISTRY_DIR)
+if models_fingerprint is not None:
+    model_version_label = models_fingerprint.split(":")[0]
+else:
+    if not all(os.path.exists(os.path.join(MODELS_DIR, f)) for f in MODEL_FILES):
+        st.error("❌ Models not found! Please run training with 'ml_analysis.py' first")
+        st.stop()
+    models_fingerprint = model_fingerprint(MODELS_DIR)
+    model_version_label = ".pkl files"
+predictor_future = start_model_loading(models_fingerprint)
+prediction_cache = get_prediction_cache()
 
 # Define paths
 # PROJECT_ROOT is already defined above
 DATA_PATH = os.path.join(PROJECT_ROOT, "data", "fifa_players.csv")
-PLAYERS_DB_PATH = os.path.join(PROJECT_ROOT, "data", "history.csv")
+PLAYERS_DB_PATH = os.path.join(PROJECT_ROOT, "data", "history.db")
+LEGACY_HISTORY_CSV = os.path.join(PROJECT_ROOT, "data", "history.csv")
+
+# Page sizes offered in the history view
+HISTORY_PAGE_SIZES = [25, 50, 100, 250]
+
+# Sort options of the history view -> (column, descending)
+HISTORY_SORTS = {
+    "Newest first": ("id", True),
+    "Oldest first": ("id", False),
+    "Best rating": ("predicted_overall_rating", True),
+    "Lowest rating": ("predicted_overall_rating", False),
+    "Name (A-Z)": ("player_name", False),
+}
+
+# 3. Analysis history (SQLite database, shared by all sessions)
+# The old history.csv is imported once, the first time the database is created.
+@st.cache_resource
+def get_history_store():
+    return HistoryStore(PLAYERS_DB_PATH, LEGACY_HISTORY_CSV)
+
+history_store = get_history_store()
 
-# Create directory if needed
-os.makedirs(os.path.dirname(PLAYERS_DB_PATH), exist_ok=True)
+# Number of real players shown in "Similar Real Players"
+SIMILAR_PLAYERS_COUNT = 10
 
-# 3. Function to load the added players database
-# @st.cache_data removed to ensure real-time updates
-def load_added_players():
-    if os.path.exists(PLAYERS_DB_PATH):
-        return pd.read_csv(PLAYERS_DB_PATH)
-    return pd.DataFrame()
+# Similar players index (memory-mapped, built from the players CSV on first use).
+# The modification time of the CSV is part of the cache key: a new CSV rebuilds it.
+@st.cache_resource
+def get_similarity_index(data_mtime):
+    return SimilarityIndex.load_or_build(SIMILARITY_INDEX_DIR, DATA_PATH)
 
 # 4. Input Form (Sidebar)
 st.sidebar.header("➕ Add a New Player")
@@ -82,9 +145,10 @@ def user_input_features():
         'strength': strength
     }
     
-    return name, pd.DataFrame(data, index=[0])
+    return name, data
 
-name, input_df = user_input_features()
+name, input_features = user_input_features()
+input_df = pd.DataFrame(input_features, index=[0])
 
 # 5. Main Display
 col1, col2 = st.columns([1, 1])
@@ -141,17 +205,21 @@ if analyze_button:
     if not name or name.strip() == "":
         st.error("❌ Please enter the player name!")
     else:
-        # PREDICTIONS with XGBoost
-        predicted_rating = reg_model.predict(input_df)[0]
-        future_class = clf_model.predict(input_df)[0]
-        
-        # Probabilities for the classifier
+        # Models loaded in the background: only wait if they are not ready yet
         try:
-            future_proba = clf_model.predict_proba(input_df)[0]
-            classes = clf_model.classes_
-        except:
-            future_proba = None
-            classes = []
+            with st.spinner("Loading the models..."):
+                predictor = predictor_future.result()
+        except Exception as e:
+            st.error(f"❌ Unable to load the models: {e}")
+            st.stop()
+
+        # PREDICTIONS with XGBoost (rating) and the classifier (class + probabilities)
+        predicted_rating, future_class, future_proba = prediction_cache.predict(
+            predictor, input_features, models_fingerprint
+        )
+        classes = predictor.classes
+        if STARTUP.mark("first prediction"):
+            print(STARTUP.format_report())
 
         # Store results in session_state
         st.session_state['analysis_results'] = {
@@ -264,6 +332,44 @@ if 'analysis_results' in st.session_state:
         with proba_col4:
             st.metric("Decline", f"{proba_dict.get('decline', 0)*100:.1f}%")
     
+    # Most similar real players (nearest neighbours on the ten attributes)
+    st.markdown("---")
+    st.markdown("### 👥 Similar Real Players")
+    try:
+        similarity_index = get_similarity_index(os.path.getmtime(DATA_PATH))
+    except Exception as e:
+        similarity_index = None
+        st.info(f"Similar players unavailable: {e}")
+    
+    if similarity_index is not None:
+        filter_col1, filter_col2 = st.columns(2)
+        with filter_col1:
+            similar_positions = st.multiselect(
+                "Positions", similarity_index.position_vocabulary, key="similar_positions"
+            )
+        with filter_col2:
+            similar_nationality = st.selectbox(
+                "Nationality", ["All"] + sorted(similarity_index.nationalities), key="similar_nationality"
+            )
+        
+        similar_players = similarity_index.similar_players(
+            res_input_df.iloc[0].to_dict(),
+            k=SIMILAR_PLAYERS_COUNT,
+            positions=similar_positions,
+            nationality=None if similar_nationality == "All" else similar_nationality,
+        )
+        if similar_players.empty:
+            st.info("No real player matches these filters.")
+        else:
+            st.dataframe(
+                similar_players.drop(columns=["row_id"]).rename(columns={
+                    "name": "Name", "positions": "Positions", "nationality": "Nationality",
+                    "age": "Age", "overall_rating": "Overall Rating", "distance": "Distance",
+                }),
+                use_container_width=True, hide_index=True,
+            )
+            st.caption("Distance: gap between the profiles, in standard deviations of the ten attributes")
+    
     # Save to database
     st.markdown("---")
     save_col1, save_col2 = st.columns(2)
@@ -277,50 +383,21 @@ if 'analysis_results' in st.session_state:
             save_row['predicted_future_class'] = future_class
             save_row['date_added'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             
-            # Add to database (Append Mode with CSV module)
+            # Add to database (one SQLite transaction, safe with several sessions)
             try:
                 print(f"Saving attempt for: {res_name}")
                 
-                # Prepare list of values in CSV column order
-                # Columns: player_name,age,height_cm,weight_kgs,finishing,dribbling,short_passing,acceleration,sprint_speed,stamina,strength,predicted_overall_rating,predicted_future_class,date_added
-                
-                # Explicit re-mapping to ensure order
-                c_age = save_row['age'][0]
-                c_h = save_row['height_cm'][0]
-                c_w = save_row['weight_kgs'][0]
-                c_fin = save_row['finishing'][0]
-                c_drib = save_row['dribbling'][0]
-                c_pass = save_row['short_passing'][0]
-                c_acc = save_row['acceleration'][0]
-                c_spd = save_row['sprint_speed'][0]
-                c_sta = save_row['stamina'][0]
-                c_str = save_row['strength'][0]
-                c_rat = save_row['predicted_overall_rating'][0]
-                c_cls = save_row['predicted_future_class'][0]
-                c_date = save_row['date_added'][0]
-                
-                # Strict order of history.csv:
-                final_csv_row = [res_name, c_age, c_h, c_w, c_fin, c_drib, c_pass, c_acc, c_spd, c_sta, c_str, c_rat, c_cls, c_date]
-                
-                # Check if file exists to know if we need header
-                file_exists = os.path.exists(PLAYERS_DB_PATH)
-                
-                with open(PLAYERS_DB_PATH, mode='a', newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f)
-                    # If file is empty or doesn't exist, write headers
-                    if not file_exists or os.path.getsize(PLAYERS_DB_PATH) == 0:
-                        headers = ['player_name','age','height_cm','weight_kgs','finishing','dribbling','short_passing','acceleration','sprint_speed','stamina','strength','predicted_overall_rating','predicted_future_class','date_added']
-                        writer.writerow(headers)
-                        
-                    writer.writerow(final_csv_row)
+                record = save_row.iloc[0].to_dict()
+                history_store.add_player(record)
                 
                 print(f"SUCCESS: Player {res_name} saved to {PLAYERS_DB_PATH}")
                 st.success(f"✅ {res_name} successfully added to history!")
                 st.balloons()
                 
-            except PermissionError:
-                print(f"ERROR: Permission denied writing to {PLAYERS_DB_PATH}. File open?")
-                st.error("❌ Cannot save: history.csv is probably open in Excel. Close it and try again.")
+            except sqlite3.OperationalError as e:
+                # e.g. "database is locked" if another program holds the write lock too long
+                print(f"ERROR: Database busy while writing to {PLAYERS_DB_PATH}: {e}")
+                st.error(f"❌ Cannot save: the history database is busy ({e}). Try again.")
             except Exception as e:
                 print(f"CRITICAL ERROR: {e}")
                 st.error(f"❌ Error while saving: {e}")
@@ -330,22 +407,68 @@ st.markdown("---")
 st.markdown("### 📚 Analysis History")
 
 try:
-    players_df = load_added_players()
-    if not players_df.empty:
-        st.dataframe(players_df, use_container_width=True)
-        
+    # Running aggregates of this session: only the rows added since the last rerun are read
+    if 'history_aggregates' not in st.session_state:
+        st.session_state['history_aggregates'] = HistoryAggregates()
+    aggregates = st.session_state['history_aggregates']
+    aggregates.refresh(history_store)
+    
+    if aggregates.n_players > 0:
         # Statistics
         stats_col1, stats_col2, stats_col3, stats_col4 = st.columns(4)
         with stats_col1:
-            st.metric("Total Players", len(players_df))
+            st.metric("Total Players", aggregates.n_players)
         with stats_col2:
-            st.metric("Average Rating", f"{players_df['predicted_overall_rating'].mean():.1f}")
+            st.metric("Average Rating", f"{aggregates.average_rating:.1f}")
         with stats_col3:
-            st.metric("Average Age", f"{players_df['age'].mean():.1f}")
+            st.metric("Average Age", f"{aggregates.average_age:.1f}")
         with stats_col4:
-            superstars = len(players_df[players_df['predicted_future_class'] == 'high_growth'])
-            st.metric("Future Superstars", superstars)
+            st.metric("Future Superstars", aggregates.class_counts.get('high_growth', 0))
+        
+        # Filters and sorting (applied by the database, only one page is loaded)
+        filter_col1, filter_col2, filter_col3, filter_col4 = st.columns([2, 2, 2, 1])
+        with filter_col1:
+            name_filter = st.text_input("🔎 Player name contains", "", key="history_name_filter")
+        with filter_col2:
+            class_filter = st.selectbox(
+                "Future class", ["All", "high_growth", "likely_improve", "stable", "decline"],
+                key="history_class_filter"
+            )
+        with filter_col3:
+            sort_label = st.selectbox("Sort by", list(HISTORY_SORTS), key="history_sort")
+        with filter_col4:
+            page_size = st.selectbox("Rows", HISTORY_PAGE_SIZES, index=1, key="history_page_size")
+        
+        class_filter = None if class_filter == "All" else class_filter
+        n_matching = history_store.count(player_name=name_filter.strip(), future_class=class_filter)
+        n_pages = max(1, -(-n_matching // page_size))
+        page_number = st.number_input(f"Page (1 - {n_pages})", min_value=1, max_value=n_pages, value=1,
+                                      key="history_page")
+        
+        sort_by, descending = HISTORY_SORTS[sort_label]
+        page_df = history_store.page(
+            offset=(page_number - 1) * page_size, limit=page_size,
+            player_name=name_filter.strip(), future_class=class_filter,
+            sort_by=sort_by, descending=descending,
+        )
+        st.caption(f"{n_matching} matching analyses - page {page_number} of {n_pages}")
+        st.dataframe(page_df, use_container_width=True, hide_index=True)
     else:
         st.info("📭 No players added yet. Start by analyzing a player!")
 except Exception as e:
     st.warning(f"⚠️ Unable to load database: {e}")
+
+STARTUP.mark("first page rendered")
+
+# Startup profile of this server process (imports, model loading, first prediction)
+with st.sidebar.expander("⏱️ Startup profile"):
+    st.text(STARTUP.format_report())
+
+# Prediction cache statistics (shared by all sessions)
+cache_stats = prediction_cache.stats()
+st.sidebar.markdown("---")
+st.sidebar.caption(
+    f"⚡ Prediction cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+    f"({cache_stats['hit_rate'] * 100:.0f}% hit rate, {cache_stats['size']}/{cache_stats['max_size']} entries)"
+)
+st.sidebar.caption(f"🧠 Model version: {model_version_label}")
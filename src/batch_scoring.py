@@ -0,0 +1,170 @@
+# src/batch_scoring.py
+
+"""
+Batch scoring of whole scouting lists.
+
+The Streamlit application scores one player per click. This script scores a
+complete file of players (CSV or Parquet) with the two trained models and writes
+the predicted rating, the predicted future class and the class probabilities
+for every row in a single pass.
+
+It can be used in two ways:
+
+    # From the command line
+    python src/batch_scoring.py data/fifa_players.csv data/scored_players.csv
+
+    # From Python
+    from batch_scoring import score_players
+    scored_df = score_players(players_df)
+"""
+
+# argparse : used to build the command line interface
+import argparse
+
+# os : used for manipulating file paths
+import os
+
+# time : used to measure the scoring throughput (rows/sec)
+import time
+
+# numpy : used to turn the class probabilities into class labels (argmax)
+import numpy as np
+
+# pandas : used to read the input file and write the scored output
+import pandas as pd
+
+# joblib : used to load the trained models saved by ml_analysis.py
+import joblib
+
+# Shared definitions from the training script, so both sides stay in sync
+from ml_analysis import DATA_PATH, FEATURE_COLS, MODELS_DIR
+
+# LogisticScorer : NumPy-only version of the classifier's predict_proba
+from logistic_scorer import LogisticScorer
+
+
+# Number of rows sent to the models in one call.
+# Big enough to amortise the per-call overhead, small enough to keep memory flat.
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+def load_models(models_dir=MODELS_DIR):
+    """Load the regression and classification models saved by ml_analysis.py"""
+    reg_model = joblib.load(os.path.join(models_dir, "regression_model.pkl"))
+    clf_model = joblib.load(os.path.join(models_dir, "classification_model.pkl"))
+    return reg_model, clf_model
+
+
+def read_players(path):
+    """Read a list of players from a CSV or Parquet file (chosen by extension)"""
+    if path.lower().endswith((".parquet", ".pq")):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def write_players(df, path):
+    """Write the scored players to a CSV or Parquet file (chosen by extension)"""
+    if path.lower().endswith((".parquet", ".pq")):
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+
+def score_players(df, reg_model=None, clf_model=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Score every player of a DataFrame with both models.
+
+    The rows are scored in vectorized chunks of `chunk_size` rows. For each chunk the
+    classifier (LogisticScorer) is called only once: the predicted class is the argmax of the class
+    probabilities, which is exactly what LogisticRegression.predict() returns.
+
+    Rows with a missing value in one of the FEATURE_COLS are not scored and keep NaN
+    predictions.
+
+    Returns a copy of `df` with the following columns added:
+    - predicted_overall_rating
+    - predicted_future_class
+    - proba_<class> (one column per class of the classifier)
+    """
+    if reg_model is None or clf_model is None:
+        reg_model, clf_model = load_models()
+
+    # Ensure all required columns exist in the input
+    for c in FEATURE_COLS:
+        if c not in df.columns:
+            raise ValueError(f"Column '{c}' was not found in the input data.")
+
+    # NumPy-only classifier: same probabilities as predict_proba, without sklearn's per-call overhead
+    scorer = LogisticScorer.from_model(clf_model)
+    classes = scorer.classes
+    n_rows = len(df)
+
+    # Preallocate the outputs once, then fill them chunk by chunk
+    ratings = np.full(n_rows, np.nan, dtype=np.float32)
+    class_idx = np.full(n_rows, -1, dtype=np.int64)
+    probas = np.full((n_rows, len(classes)), np.nan, dtype=np.float64)
+
+    features = df[FEATURE_COLS]
+    valid_rows = np.flatnonzero(features.notna().all(axis=1).to_numpy())
+
+    for start in range(0, len(valid_rows), chunk_size):
+        rows = valid_rows[start:start + chunk_size]
+        X_chunk = features.iloc[rows]
+
+        ratings[rows] = reg_model.predict(X_chunk)
+        chunk_proba = scorer.predict_proba(X_chunk.to_numpy(dtype=np.float64))
+        probas[rows] = chunk_proba
+        class_idx[rows] = chunk_proba.argmax(axis=1)
+
+    scored = df.copy()
+    scored["predicted_overall_rating"] = ratings
+    predicted_class = np.where(class_idx >= 0, classes[np.maximum(class_idx, 0)], None)
+    scored["predicted_future_class"] = predicted_class
+    for i, cls in enumerate(classes):
+        scored[f"proba_{cls}"] = probas[:, i]
+    return scored
+
+
+def score_file(input_path, output_path, models_dir=MODELS_DIR, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Score a CSV/Parquet file of players and write the result to `output_path`.
+
+    Returns a small dict with the throughput of the scoring step:
+    rows, seconds and rows_per_sec (file reading and writing are not included).
+    """
+    reg_model, clf_model = load_models(models_dir)
+    df = read_players(input_path)
+
+    start = time.perf_counter()
+    scored = score_players(df, reg_model, clf_model, chunk_size=chunk_size)
+    elapsed = time.perf_counter() - start
+
+    write_players(scored, output_path)
+
+    return {
+        "rows": len(df),
+        "seconds": elapsed,
+        "rows_per_sec": len(df) / elapsed if elapsed > 0 else float("inf"),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a whole scouting list with the trained models.")
+    parser.add_argument("input", nargs="?", default=DATA_PATH,
+                        help="CSV or Parquet file with the player features (default: data/fifa_players.csv)")
+    parser.add_argument("output", nargs="?", default=os.path.join(os.path.dirname(DATA_PATH), "scored_players.csv"),
+                        help="Output CSV or Parquet file (default: data/scored_players.csv)")
+    parser.add_argument("--models-dir", default=MODELS_DIR, help="Directory containing the .pkl models")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows scored per model call")
+    args = parser.parse_args(argv)
+
+    print(f"Scoring players from: {args.input}")
+    stats = score_file(args.input, args.output, models_dir=args.models_dir, chunk_size=args.chunk_size)
+
+    print(f"Scored {stats['rows']} players in {stats['seconds']:.3f} s "
+          f"({stats['rows_per_sec']:,.0f} rows/sec)")
+    print(f"Results saved in: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
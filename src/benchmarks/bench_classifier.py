@@ -0,0 +1,90 @@
+# src/benchmarks/bench_classifier.py
+
+"""
+future_class classifier: sklearn predict_proba vs the NumPy LogisticScorer.
+
+    python src/benchmarks/bench_classifier.py
+
+Times one row (p50 latency) and batches of 100 to 1M rows (throughput), and checks
+that both give the same probabilities and classes. sklearn gets DataFrames with the
+feature names, like its callers (the app, batch_scoring) used to pass.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_scoring import load_models
+from config import FEATURE_COLS
+from logistic_scorer import LogisticScorer
+
+
+BATCH_SIZES = [100, 10_000, 1_000_000]
+
+
+def random_players(n, seed=0):
+    """Random feature rows in plausible ranges (FEATURE_COLS order)"""
+    rng = np.random.default_rng(seed)
+    low = np.array([16, 155, 50, 5, 5, 5, 10, 10, 10, 20], dtype=np.float64)
+    high = np.array([40, 205, 100, 95, 95, 95, 97, 97, 97, 97], dtype=np.float64)
+    return low + rng.random((n, len(low))) * (high - low)
+
+
+def best_time(func, repeat):
+    """Best of `repeat` runs, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def single_row_latency(func, iterations):
+    timings = np.empty(iterations)
+    for i in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings[i] = time.perf_counter() - start
+    return np.percentile(timings * 1e6, 50)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Logistic regression scoring benchmark")
+    parser.add_argument("--iterations", type=int, default=5000, help="Single-row calls")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per batch size (best is kept)")
+    args = parser.parse_args(argv)
+
+    _, clf_model = load_models()
+    scorer = LogisticScorer.from_model(clf_model)
+
+    # Same outputs
+    X_check = random_players(100_000, seed=1)
+    df_check = pd.DataFrame(X_check, columns=FEATURE_COLS)
+    max_diff = np.abs(scorer.predict_proba(X_check) - clf_model.predict_proba(df_check)).max()
+    same_classes = (scorer.predict(X_check) == clf_model.predict(df_check)).all()
+    assert max_diff < 1e-9 and same_classes
+    print(f"Check on 100k rows: max probability difference {max_diff:.1e}, identical classes")
+
+    row = random_players(1)[0]
+    sklearn_row = pd.DataFrame(row.reshape(1, -1), columns=FEATURE_COLS)
+    sk = single_row_latency(lambda: clf_model.predict_proba(sklearn_row), args.iterations)
+    fast = single_row_latency(lambda: scorer.predict_proba(row), args.iterations)
+    print(f"\n{'1 row':>10s} | sklearn p50: {sk:8.1f} µs | scorer p50: {fast:8.1f} µs | x{sk / fast:.0f}")
+
+    for n in BATCH_SIZES:
+        X = random_players(n)
+        df = pd.DataFrame(X, columns=FEATURE_COLS)
+        sk = best_time(lambda: clf_model.predict_proba(df), args.repeat)
+        fast = best_time(lambda: scorer.predict_proba(X), args.repeat)
+        print(f"{n:>10,d} | sklearn: {n / sk:12,.0f} rows/s | scorer: {n / fast:12,.0f} rows/s | x{sk / fast:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# src/benchmarks/bench_inference.py
+
+"""
+Single-player inference latency: DataFrame path (old application code) vs FastPredictor.
+
+    python src/benchmarks/bench_inference.py --iterations 5000
+
+Reports p50 / p99 latency of one full prediction (rating + class + probabilities)
+and checks that both paths give the same answer.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_scoring import load_models
+from fast_predictor import FastPredictor
+
+
+EXAMPLE_PLAYER = {
+    "age": 20, "height_cm": 175, "weight_kgs": 70,
+    "finishing": 78, "dribbling": 85, "short_passing": 82,
+    "acceleration": 88, "sprint_speed": 90, "stamina": 80, "strength": 65,
+}
+
+
+def dataframe_path(reg_model, clf_model, player):
+    """What application.py did before: one-row DataFrame + three sklearn calls"""
+    input_df = pd.DataFrame(player, index=[0])
+    rating = reg_model.predict(input_df)[0]
+    future_class = clf_model.predict(input_df)[0]
+    probabilities = clf_model.predict_proba(input_df)[0]
+    return rating, future_class, probabilities
+
+
+def latencies(func, iterations, warmup=50):
+    """Latency of each call, in microseconds"""
+    for _ in range(warmup):
+        func()
+    timings = np.empty(iterations)
+    for i in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings[i] = time.perf_counter() - start
+    return timings * 1e6
+
+
+def report(name, timings):
+    p50, p99 = np.percentile(timings, [50, 99])
+    print(f"{name:>22s} | p50: {p50:9.1f} µs | p99: {p99:9.1f} µs")
+    return p50
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Single-player inference latency benchmark")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    reg_model, clf_model = load_models()
+    predictor = FastPredictor(reg_model=reg_model, clf_model=clf_model)
+
+    # Same predictions on both paths
+    old = dataframe_path(reg_model, clf_model, EXAMPLE_PLAYER)
+    new = predictor.predict(EXAMPLE_PLAYER)
+    assert abs(old[0] - new[0]) < 1e-3 and old[1] == new[1] and np.allclose(old[2], new[2])
+
+    vector = np.array([EXAMPLE_PLAYER[name] for name in predictor.feature_names], dtype=np.float64)
+
+    print(f"{args.iterations} predictions per path")
+    base = report("DataFrame + sklearn", latencies(lambda: dataframe_path(reg_model, clf_model, EXAMPLE_PLAYER), args.iterations))
+    fast_dict = report("FastPredictor (dict)", latencies(lambda: predictor.predict(EXAMPLE_PLAYER), args.iterations))
+    fast_vec = report("FastPredictor (vector)", latencies(lambda: predictor.predict(vector), args.iterations))
+    print(f"p50 speedup: x{base / fast_dict:.0f} (dict), x{base / fast_vec:.0f} (vector)")
+
+
+if __name__ == "__main__":
+    main()
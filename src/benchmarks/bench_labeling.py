@@ -0,0 +1,83 @@
+# src/benchmarks/bench_labeling.py
+
+"""
+Benchmark of the 'future_class' labeling: row-wise apply vs vectorized np.select.
+
+    python src/benchmarks/bench_labeling.py            # real data + 10M synthetic rows
+    python src/benchmarks/bench_labeling.py --full     # also time apply on 10M rows (slow!)
+
+Both versions are checked to give the same label on every row. Without --full, the
+apply path is timed on a 200k-row sample of the synthetic data and extrapolated.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Make the modules of src/ importable when running this file directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_loader import load_players
+from labels import build_future_label, build_future_labels
+
+
+SYNTHETIC_ROWS = 10_000_000
+APPLY_SAMPLE_ROWS = 200_000
+
+
+def synthetic_players(n_rows, seed=42):
+    """Random players with the three columns used by the labeling (same dtypes as the loader)"""
+    rng = np.random.default_rng(seed)
+    overall = rng.integers(40, 95, n_rows, dtype=np.int8)
+    return pd.DataFrame({
+        "age": rng.integers(16, 42, n_rows, dtype=np.int8),
+        "overall_rating": overall,
+        "potential": np.clip(overall + rng.integers(-6, 25, n_rows), 40, 99).astype(np.int8),
+    })
+
+
+def best_time(func, repeat=3):
+    """Best wall-clock time of `repeat` calls (seconds) and the last result"""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def compare(name, df, apply_df=None):
+    """Time both versions on `df` (apply on `apply_df` if given, then extrapolated)"""
+    apply_df = df if apply_df is None else apply_df
+    apply_time, apply_labels = best_time(lambda: apply_df.apply(build_future_label, axis=1), repeat=1)
+    vector_time, vector_labels = best_time(lambda: build_future_labels(df))
+
+    # Same label on every row of the apply sample
+    assert (apply_labels.to_numpy() == vector_labels[:len(apply_df)]).all(), "labels differ!"
+
+    estimated = len(apply_df) < len(df)
+    apply_time *= len(df) / len(apply_df)
+    print(f"{name:>12s} | {len(df):>10,d} rows | apply: {apply_time:9.3f} s{' (est.)' if estimated else '       '}"
+          f" | vectorized: {vector_time:7.3f} s | speedup: x{apply_time / vector_time:,.0f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark of the future_class labeling")
+    parser.add_argument("--rows", type=int, default=SYNTHETIC_ROWS, help="Number of synthetic rows")
+    parser.add_argument("--full", action="store_true", help="Run apply on all synthetic rows instead of a sample")
+    args = parser.parse_args(argv)
+
+    df = load_players().dropna(subset=["overall_rating", "potential", "age"])
+    compare("real data", df)
+
+    synthetic = synthetic_players(args.rows)
+    sample = None if args.full else synthetic.iloc[:APPLY_SAMPLE_ROWS]
+    compare("synthetic", synthetic, sample)
+
+
+if __name__ == "__main__":
+    main()
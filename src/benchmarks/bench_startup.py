@@ -0,0 +1,102 @@
+# src/benchmarks/bench_startup.py
+
+"""
+Cold start of the application, measured in fresh interpreters (like a new container).
+
+    python src/benchmarks/bench_startup.py --repeat 3
+
+Reports:
+- the import time of each top-level module the application needs (python -X importtime),
+- the time until the page can render (imports of application.py, models not loaded),
+- the time until the first prediction (models unpickled + first XGBoost predict),
+- the same first prediction with the old eager path (import xgboost + load everything
+  before rendering), for comparison.
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+import numpy as np
+
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+EXAMPLE_PLAYER = "[20, 175, 70, 78, 85, 82, 88, 90, 80, 65]"
+
+# Each snippet prints "<milestone> <seconds>" lines, timed from the start of the snippet
+LAZY_STARTUP = f"""
+import time
+start = time.perf_counter()
+import streamlit, pandas, os, sqlite3
+from fast_predictor import FastPredictor
+from prediction_cache import PredictionCache, model_fingerprint
+from history_store import HistoryStore, HistoryAggregates
+print("page_ready", time.perf_counter() - start)
+predictor = FastPredictor().warm_up()
+predictor.predict({EXAMPLE_PLAYER})
+print("first_prediction", time.perf_counter() - start)
+"""
+
+EAGER_STARTUP = f"""
+import time
+start = time.perf_counter()
+import streamlit, pandas, numpy, os, sqlite3
+import xgboost, joblib
+import ml_analysis
+from fast_predictor import FastPredictor
+from prediction_cache import PredictionCache, model_fingerprint
+from history_store import HistoryStore, HistoryAggregates
+predictor = FastPredictor()
+print("page_ready", time.perf_counter() - start)
+predictor.predict({EXAMPLE_PLAYER})
+print("first_prediction", time.perf_counter() - start)
+"""
+
+IMPORTED_MODULES = ["streamlit", "pandas", "numpy", "joblib", "sklearn", "xgboost", "matplotlib",
+                    "fast_predictor", "prediction_cache", "history_store", "ml_analysis"]
+
+
+def run_snippet(code):
+    """Run a snippet in a fresh interpreter, return {milestone: seconds}"""
+    output = subprocess.run([sys.executable, "-c", code], cwd=SRC_DIR, capture_output=True, text=True,
+                            check=True).stdout
+    return {name: float(value) for name, value in (line.split() for line in output.splitlines() if line)}
+
+
+def import_times(modules):
+    """Cumulative import time of each top-level module (fresh interpreter per module, in ms)"""
+    times = {}
+    for module in modules:
+        stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=SRC_DIR,
+                                capture_output=True, text=True).stderr
+        # "import time: self [us] | cumulative | imported package"
+        match = re.search(rf"^import time:\s+\d+ \|\s+(\d+) \| {re.escape(module)}$", stderr, re.MULTILINE)
+        if match:
+            times[module] = int(match.group(1)) / 1000
+    return times
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Application cold start benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per startup path")
+    args = parser.parse_args(argv)
+
+    print("Import time of each module alone (fresh interpreter):")
+    for module, ms in sorted(import_times(IMPORTED_MODULES).items(), key=lambda item: -item[1]):
+        print(f"  {module:<18s} {ms:8.1f} ms")
+
+    print(f"\nStartup paths (median of {args.repeat} fresh interpreters):")
+    for name, code in [("eager (before)", EAGER_STARTUP), ("lazy + warm-up", LAZY_STARTUP)]:
+        runs = [run_snippet(code) for _ in range(args.repeat)]
+        page = np.median([r["page_ready"] for r in runs])
+        first = np.median([r["first_prediction"] for r in runs])
+        print(f"  {name:<16s} page ready: {page:6.2f} s | first prediction: {first:6.2f} s")
+    print("\nWith the lazy path the models load in a background thread while the page is shown,"
+          "\nso a user clicking 'Analyze' after the page appeared waits for the difference at most.")
+
+
+if __name__ == "__main__":
+    main()
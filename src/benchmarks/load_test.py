@@ -0,0 +1,150 @@
+# src/benchmarks/load_test.py
+
+"""
+Load test of the local inference server (src/inference_server.py).
+
+    python src/inference_server.py &
+    python src/benchmarks/load_test.py --concurrency 64 --requests 20000
+
+or let the script start (and stop) a server itself:
+
+    python src/benchmarks/load_test.py --start-server
+
+Every client keeps one HTTP/1.1 keep-alive connection and sends single-player
+/predict requests back to back. Reports the throughput, the client-side p50 / p99
+latency and the server metrics (batch sizes, queue depth).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference_server import DEFAULT_HOST, DEFAULT_PORT
+
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def random_players(n, seed=0):
+    """Plausible random profiles (same ranges as the application sliders)"""
+    rng = np.random.default_rng(seed)
+    return [{
+        "age": int(rng.integers(16, 41)),
+        "height_cm": int(rng.integers(150, 211)),
+        "weight_kgs": int(rng.integers(50, 111)),
+        "finishing": int(rng.integers(1, 100)),
+        "dribbling": int(rng.integers(1, 100)),
+        "short_passing": int(rng.integers(1, 100)),
+        "acceleration": int(rng.integers(1, 100)),
+        "sprint_speed": int(rng.integers(1, 100)),
+        "stamina": int(rng.integers(1, 100)),
+        "strength": int(rng.integers(1, 100)),
+    } for _ in range(n)]
+
+
+async def _request(reader, writer, host, method, path, body=b""):
+    writer.write((f"{method} {path} HTTP/1.1\r\nHost: {host}\r\n"
+                  f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n").encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def _client(host, port, bodies, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for body in bodies:
+            start = time.perf_counter()
+            status, _ = await _request(reader, writer, host, "POST", "/predict", body)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def get_json(host, port, path):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        _, body = await _request(reader, writer, host, "GET", path)
+        return json.loads(body)
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, n_requests, concurrency):
+    bodies = [json.dumps(p).encode() for p in random_players(min(n_requests, 5000))]
+    per_client = [[bodies[(c + i * concurrency) % len(bodies)] for i in range(n_requests // concurrency)]
+                  for c in range(concurrency)]
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, b, latencies, errors) for b in per_client))
+    wall = time.perf_counter() - start
+    return np.array(latencies) * 1000, errors, wall
+
+
+async def wait_until_up(host, port, timeout=60):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            return await get_json(host, port, "/health")
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test of the local inference server")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--requests", type=int, default=10000, help="Total number of requests")
+    parser.add_argument("--concurrency", type=int, default=32, help="Number of concurrent connections")
+    parser.add_argument("--start-server", action="store_true", help="Start a server for the test")
+    parser.add_argument("--max-wait-ms", type=float, default=2.0, help="Batching delay of the started server")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.start_server:
+        server = subprocess.Popen([sys.executable, os.path.join(SRC_DIR, "inference_server.py"),
+                                   "--host", args.host, "--port", str(args.port),
+                                   "--max-wait-ms", str(args.max_wait_ms)],
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        asyncio.run(wait_until_up(args.host, args.port))
+        latencies, errors, wall = asyncio.run(run_load(args.host, args.port, args.requests, args.concurrency))
+        metrics = asyncio.run(get_json(args.host, args.port, "/metrics"))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    p50, p99 = np.percentile(latencies, [50, 99])
+    print(f"{len(latencies)} requests, {args.concurrency} connections, {len(errors)} errors")
+    print(f"Throughput : {len(latencies) / wall:,.0f} requests/s")
+    print(f"Latency    : p50 {p50:.2f} ms | p99 {p99:.2f} ms (client side)")
+    batch = metrics["batch_size"]
+    print(f"Batches    : {batch['count']} model calls, mean batch size {batch['mean']:.1f}, "
+          f"max queue depth {metrics['max_queue_depth']}")
+    print(f"Server     : predict p50 {metrics['predict_latency_ms']['p50']} ms | "
+          f"request p99 {metrics['request_latency_ms']['p99']} ms")
+
+
+if __name__ == "__main__":
+    main()
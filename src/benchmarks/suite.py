@@ -0,0 +1,323 @@
+# src/benchmarks/suite.py
+
+"""
+Benchmark suite of the whole pipeline, with regression detection.
+
+    python src/benchmarks/suite.py                                   # real data + 100k rows
+    python src/benchmarks/suite.py --sizes real,100k,1m --full        # up to 1M rows, training included
+    python src/benchmarks/suite.py --filter infer,history             # only some cases
+    python src/benchmarks/suite.py --baseline src/benchmarks/results/baseline.json --threshold 0.25
+
+Cases (each one timed at every data size, except infer.single / history.append_one):
+- load.read_csv / load.cached   -> CSV parsing vs the columnar cache of data_loader.load_players
+- clean                         -> clean_players + build_model_matrix (data_analysis.py)
+- label                         -> build_future_labels (labels.py)
+- train.regressor / classifier  -> one fit of each model of ml_analysis.main
+- infer.single / infer.batch    -> FastPredictor.predict (one player) / predict_batch
+- history.*                     -> HistoryStore append (one / 1000 players), page and stats
+
+The synthetic sizes come from synthetic_data.SyntheticPlayers, fitted on the real players. Training is capped at TRAIN_MAX_ROWS rows unless --full is given.
+
+Each case is run `number` times per round (enough for a round to last about
+--min-time seconds), for --repeat rounds; the median and best time per call are kept.
+The results (plus git commit, library versions and machine) are written as JSON in
+src/benchmarks/results/. With --baseline, every case present in both files is
+compared and the script exits with status 1 when one is slower than the baseline by
+more than --threshold (0.25 = 25 %).
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Make the modules of src/ importable when running this file directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import DATA_PATH, FEATURE_COLS, PROJECT_ROOT
+from data_loader import load_players, read_players_csv
+from synthetic_data import SyntheticPlayers
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+SIZES = {"real": None, "100k": 100_000, "1m": 1_000_000, "2m": 2_000_000}
+DEFAULT_SIZES = "real,100k"
+
+TRAIN_MAX_ROWS = 100_000
+HISTORY_BATCH = 1000
+
+EXAMPLE_PLAYER = {
+    "age": 20, "height_cm": 175, "weight_kgs": 70,
+    "finishing": 78, "dribbling": 85, "short_passing": 82,
+    "acceleration": 88, "sprint_speed": 90, "stamina": 80, "strength": 65,
+}
+
+
+# ---------- Data ----------
+
+def synthetic_players(real_df, n_rows, seed=42):
+    """`n_rows` players drawn by the synthetic_data generator fitted on `real_df`"""
+    model = SyntheticPlayers.fit(real_df)
+    return pd.concat(model.generate(n_rows, seed=seed), ignore_index=True)
+
+
+def training_data(df):
+    """Features / targets of ml_analysis.main (rows with a missing value removed)"""
+    from labels import build_future_labels
+
+    df_clean = df.dropna(subset=FEATURE_COLS + ["overall_rating", "potential", "age"])
+    return df_clean[FEATURE_COLS], df_clean["overall_rating"], build_future_labels(df_clean)
+
+
+def history_records(n_rows, seed=0):
+    """History rows like the ones saved by the application"""
+    from labels import FUTURE_CLASSES
+
+    rng = np.random.default_rng(seed)
+    records = []
+    for i in range(n_rows):
+        record = {col: int(rng.integers(40, 95)) for col in FEATURE_COLS}
+        record.update({
+            "player_name": f"Player {i}",
+            "predicted_overall_rating": float(rng.uniform(40, 95)),
+            "predicted_future_class": FUTURE_CLASSES[int(rng.integers(0, len(FUTURE_CLASSES)))],
+            "date_added": "2025-01-01 12:00:00",
+        })
+        records.append(record)
+    return records
+
+
+# ---------- Timing ----------
+
+def autorange(func, min_time):
+    """Number of calls needed for one round to last at least `min_time` seconds (like timeit)"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return number
+        number *= 10 if elapsed < min_time / 10 else 2
+
+
+def measure(func, repeat, min_time):
+    """Median / best time per call over `repeat` rounds (func is called once first as a warm-up)"""
+    func()
+    number = autorange(func, min_time)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return {
+        "median_s": float(np.median(timings)),
+        "min_s": float(np.min(timings)),
+        "repeat": repeat,
+        "number": number,
+    }
+
+
+# ---------- Cases ----------
+
+def cases_for_size(size_name, df, predictor, workdir, full, selected=lambda name: True):
+    """
+    (name, func, rows) of every case at one data size.
+
+    The preparation (files, models, databases) is done here, outside the timings, and
+    only for the groups of cases accepted by `selected`.
+    """
+    from history_store import HistoryStore
+    from labels import build_future_labels
+    from ml_analysis import build_classifier, build_regressor
+    from preprocessing import build_model_matrix, clean_players
+
+    n_rows = len(df)
+    size_dir = os.path.join(workdir, size_name)
+    os.makedirs(size_dir, exist_ok=True)
+
+    # Loading: the real CSV, or the synthetic rows written as a CSV once
+    if selected("load."):
+        csv_path = DATA_PATH
+        if size_name != "real":
+            csv_path = os.path.join(size_dir, "players.csv")
+            df.to_csv(csv_path, index=False)
+        cache_dir = os.path.join(size_dir, "cache")
+        load_players(csv_path, cache_dir=cache_dir)
+        yield "load.read_csv", lambda: read_players_csv(csv_path), n_rows
+        yield "load.cached", lambda: load_players(csv_path, cache_dir=cache_dir), n_rows
+
+    yield "clean", lambda: build_model_matrix(clean_players(df)), n_rows
+    yield "label", lambda: build_future_labels(df), n_rows
+
+    X, y, labels = training_data(df)
+    if selected("train.") and (full or len(X) <= TRAIN_MAX_ROWS):
+        yield "train.regressor", lambda: build_regressor().fit(X, y), len(X)
+        yield "train.classifier", lambda: build_classifier().fit(X, labels), len(X)
+
+    rows = X.to_numpy(dtype=np.float64)
+    if size_name == "real":
+        yield "infer.single", lambda: predictor.predict(EXAMPLE_PLAYER), 1
+    yield "infer.batch", lambda: predictor.predict_batch(rows), len(rows)
+
+    if not selected("history."):
+        return
+    # History: a database already holding n_rows players
+    store = HistoryStore(os.path.join(size_dir, "history.db"), csv_path=None)
+    records = history_records(n_rows)
+    for start in range(0, n_rows, 100_000):
+        store.add_players(records[start:start + 100_000])
+    batch = records[:HISTORY_BATCH]
+    if size_name == "real":
+        yield "history.append_one", lambda: store.add_player(batch[0]), 1
+    yield "history.append_batch", lambda: store.add_players(batch), HISTORY_BATCH
+    yield "history.page", lambda: store.page(offset=n_rows // 2, limit=50, sort_by="predicted_overall_rating"), 50
+    yield "history.stats", store.stats, 1
+
+
+# ---------- Results ----------
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    import sklearn
+    import xgboost as xgb
+
+    return {
+        "git_commit": git_commit(),
+        "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+        "xgboost": xgb.__version__,
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare the median times with a baseline results file.
+
+    Returns the list of regressions (case, baseline median, current median, ratio).
+    """
+    regressions = []
+    print(f"\n{'case':<36s} {'baseline':>11s} {'current':>11s} {'change':>8s}")
+    for key, current in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        ratio = current["median_s"] / base["median_s"]
+        regressed = ratio > 1 + threshold
+        flag = " ❌" if regressed else ""
+        print(f"{key:<36s} {format_time(base['median_s']):>11s} {format_time(current['median_s']):>11s} "
+              f"{(ratio - 1) * 100:+7.1f}%{flag}")
+        if regressed:
+            regressions.append((key, base["median_s"], current["median_s"], ratio))
+    return regressions
+
+
+def format_time(seconds):
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.1f} ms"
+    return f"{seconds:.2f} s"
+
+
+# ---------- CLI ----------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark suite (loading, cleaning, training, inference, history)")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"Comma-separated data sizes among {', '.join(SIZES)}")
+    parser.add_argument("--filter", default="", help="Only run the cases whose name starts with one of these prefixes")
+    parser.add_argument("--full", action="store_true", help=f"Also train on more than {TRAIN_MAX_ROWS:,} rows")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed rounds per case")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum duration of one round (seconds)")
+    parser.add_argument("--output", help="Results file (default: results/<date>-<commit>.json)")
+    parser.add_argument("--baseline", help="Results file to compare with")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown vs the baseline (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    sizes = [s.strip().lower() for s in args.sizes.split(",") if s.strip()]
+    for size in sizes:
+        if size not in SIZES:
+            parser.error(f"Unknown size '{size}', use one of {', '.join(SIZES)}.")
+    prefixes = tuple(p.strip() for p in args.filter.split(",") if p.strip())
+
+    def selected(name):
+        # "train" selects "train.regressor", and the group "train." is selected by "train.regressor"
+        return not prefixes or any(name.startswith(p) or p.startswith(name) for p in prefixes)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    # The sklearn deprecation / convergence warnings of the training cases would flood the report
+    warnings.filterwarnings("ignore", module="sklearn")
+
+    from model_registry import load_serving_predictor
+
+    predictor = load_serving_predictor()
+    predictor.warm_up()
+    real_df = load_players()
+
+    meta = environment()
+    results = {}
+    workdir = tempfile.mkdtemp(prefix="fifa-bench-")
+    try:
+        for size in sizes:
+            df = real_df if SIZES[size] is None else synthetic_players(real_df, SIZES[size])
+            print(f"\n=== {size}: {len(df):,} rows ===")
+            for name, func, rows in cases_for_size(size, df, predictor, workdir, args.full, selected):
+                if not selected(name):
+                    continue
+                stats = measure(func, args.repeat, args.min_time)
+                stats.update(case=name, size=size, rows=rows,
+                             rows_per_s=rows / stats["median_s"] if stats["median_s"] > 0 else None)
+                results[f"{name}@{size}"] = stats
+                print(f"{name:<24s} median {format_time(stats['median_s']):>11s} | "
+                      f"best {format_time(stats['min_s']):>11s} | {stats['rows_per_s']:>14,.0f} rows/s", flush=True)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}-{meta['git_commit'] or 'nogit'}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2)
+    print(f"\nResults saved in: {output}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} case(s) slower than the baseline by more than {args.threshold:.0%}")
+            sys.exit(1)
+        print(f"\n✅ No regression above {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
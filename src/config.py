@@ -0,0 +1,41 @@
+# src/config.py
+
+"""
+Paths and feature list shared by the training scripts, the application and the services.
+
+This module only uses the standard library, so importing it is instant: the
+application and the inference server get the constants without importing the
+training stack (scikit-learn, XGBoost, matplotlib) of ml_analysis.py.
+"""
+
+import os
+
+
+# ---------- Clean relative paths ----------
+
+# Determine the base directory of the project dynamically.
+# This ensures the scripts work even if run from different working directories.
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+
+# Path to the CSV file containing FIFA player data
+DATA_PATH = os.path.join(PROJECT_ROOT, "data", "fifa_players.csv")
+
+# Directory where the trained models are saved (and read back by the app)
+MODELS_DIR = os.path.join(PROJECT_ROOT, "models")
+
+# Selected technical and physical attributes used as predictors.
+# These features are numerical and suitable for ML models.
+# Shared with the application and the batch scoring script, so the order matters.
+FEATURE_COLS = [
+    "age",
+    "height_cm",
+    "weight_kgs",
+    "finishing",
+    "dribbling",
+    "short_passing",
+    "acceleration",
+    "sprint_speed",
+    "stamina",
+    "strength",
+]
@@ -6,14 +6,19 @@ print("DEBUG: script start", flush=True)
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error, r2_score
+from data_loader import load_players
+from preprocessing import clean_players, build_model_matrix
+from position_encoder import PositionEncoder
 # ------------------------
 
 file_path = os.path.join(os.path.dirname(__file__), '../data/fifa_players.csv') 
 
 # 1. Data Loading
 try:
-    # Reading the CSV file
-    df = pd.read_csv(file_path)
+    # Reading the CSV file (through the shared columnar cache).
+    # The loader enforces the compact FIFA schema (int8 ratings, float32, categoricals)
+    # and reports the memory footprint before and after it.
+    df = load_players(file_path, report_memory=True)
     print("File successfully loaded.")
 except FileNotFoundError:
     print(f"ERROR: The file '{file_path}' was not found. Check the name and location.")
@@ -35,25 +40,14 @@ df.info(verbose=False, memory_usage="deep")
 
 # --- Data Preprocessing Step (cleaning improper values from the CSV) ---
 
-# 1. Convert 'national_rating' to numeric
-# 'errors='coerce'' replaces any non-numeric values with NaN.
-df['national_rating'] = pd.to_numeric(df['national_rating'], errors='coerce') 
-
-# 2. Convert financial columns to float
-financial_cols = ['value_euro', 'wage_euro', 'release_clause_euro']
-for col in financial_cols:
-    df[col] = pd.to_numeric(df[col], errors='coerce')
-
-# 3. Imputation (Replace missing values)
-# For values/salaries, replace NaN by the median (less sensitive to outliers)
-for col in ['value_euro', 'wage_euro']:
-    median_val = df[col].median()
-    df[col].fillna(median_val, inplace=True)
-    
-# For release clause and national ratings, replace NaN with 0
-# (Indicates absence of clause or no national team selection)
-df['release_clause_euro'].fillna(0, inplace=True)
-df['national_rating'].fillna(0, inplace=True)
+# 1. Convert 'national_rating' and the financial columns to numeric
+#    ('errors=coerce' replaces any non-numeric values with NaN).
+# 2. Imputation (Replace missing values):
+#    - values/salaries -> median (less sensitive to outliers)
+#    - release clause and national rating -> 0
+#      (Indicates absence of clause or no national team selection)
+# The steps live in preprocessing.py, shared with the benchmark suite.
+df = clean_players(df)
 
 # 4. Verification after cleaning
 print("Verification of the first 5 rows after cleaning:")
@@ -65,25 +59,13 @@ print("-" * 50)
 # One-Hot encoding converts a textual (categorical) column into several binary columns (0 or 1).
 
 # 1. Extract the main position (the first in the list)
-df['main_position'] = df['positions'].apply(lambda x: str(x).split(',')[0].strip())
-
-# 2. Apply One-Hot Encoding
-df_encoded = pd.get_dummies(df, columns=['main_position'], prefix='pos')
-
-# 3. Select columns for the model
-# Target variable (Y) and Feature variables (X)
-y = df_encoded['overall_rating']
-
-# Removing irrelevant or identification columns
-cols_to_drop = [
-    'overall_rating', 'id', 'url', 'name', 'full_name', 'birth_date', 
-    'nationality', 'positions', 'preferred_foot', 'body_type', 
-    'national_team', 'national_team_position', 'national_jersey_number'
-]
-X = df_encoded.drop(columns=cols_to_drop, errors='ignore')
-
+# 2. Apply One-Hot Encoding, with the saved position vocabulary
+#    (models/position_vocabulary.json) so the pos_ columns never depend on the batch
+# 3. Select columns for the model: target variable (Y) and feature variables (X),
+#    without the irrelevant or identification columns
 # 4. Final NaN handling (replace any remaining NaN with the column mean)
-X = X.fillna(X.mean())
+position_encoder = PositionEncoder.load_or_fit(df["positions"])
+X, y = build_model_matrix(df, encoder=position_encoder)
 
 print("Model Preparation Completed:")
 print(f"  - Features (X) ready: {X.shape[0]} rows, {X.shape[1]} columns.")
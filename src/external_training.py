@@ -0,0 +1,262 @@
+# src/external_training.py
+
+"""
+Out-of-core training of the overall_rating regressor, for data that does not fit in memory.
+
+ml_analysis.main fits XGBRegressor on an in-memory X_train. Here the rows are read
+from one or more CSV / Parquet files in chunks and fed to XGBoost through an
+xgboost.DataIter, so the raw table is never loaded as a whole:
+- --mode quantile (default): QuantileDMatrix, only the quantized training matrix
+  (about 1 byte per value) is kept in memory,
+- --mode external: ExtMemQuantileDMatrix, the quantized pages are cached on disk
+  and only a few of them are in memory at a time.
+
+Same split as ml_analysis: the rows with a missing feature / target are removed, then
+train_test_split(test_size=0.3, random_state=42) is applied to the remaining row
+numbers. The split is kept as a boolean mask (1 byte per row), and the test rows are
+evaluated by streaming too (MSE / R², like ml_analysis). The hyperparameters are the
+ones of ml_analysis.build_regressor.
+
+    python src/external_training.py data/synthetic_10m.csv
+    python src/external_training.py part-1.parquet part-2.parquet --mode external --output models/regressor_big.ubj
+    python src/external_training.py --compare      # real data: also the in-memory fit, to compare the quality
+
+Peak RSS and throughput (rows/s) are reported after each step.
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split
+
+from config import DATA_PATH, FEATURE_COLS, MODELS_DIR
+from ml_analysis import build_regressor
+
+
+TARGET_COL = "overall_rating"
+
+# Same split as ml_analysis.main
+TEST_SIZE = 0.3
+RANDOM_STATE = 42
+
+DEFAULT_CHUNK_SIZE = 200_000
+CACHE_DIR = os.path.join(MODELS_DIR, ".xgb-cache")
+
+# Rows with a missing value in one of these columns are removed (like ml_analysis)
+REQUIRED_COLS = FEATURE_COLS + [TARGET_COL, "potential", "age"]
+
+
+def peak_rss_mb():
+    """Peak resident memory of the process so far, in MB"""
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except ImportError:
+        # Windows: no resource module, psutil gives the peak working set
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 1024 ** 2
+
+
+# ---------- Chunked data source ----------
+
+def iter_chunks(paths, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield the rows of the CSV / Parquet files as DataFrames of at most `chunk_size`
+    rows, with the REQUIRED_COLS only and without the rows that have a missing value.
+    """
+    columns = list(dict.fromkeys(REQUIRED_COLS))
+    for path in paths:
+        if path.lower().endswith((".parquet", ".pq")):
+            import pyarrow.parquet as pq
+            batches = (batch.to_pandas() for batch in pq.ParquetFile(path).iter_batches(chunk_size, columns=columns))
+        else:
+            batches = pd.read_csv(path, usecols=columns, chunksize=chunk_size)
+        for chunk in batches:
+            chunk = chunk.dropna(subset=columns)
+            if len(chunk):
+                yield chunk
+
+
+def count_rows(paths, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Number of usable rows (first pass, needed to split like train_test_split)"""
+    return sum(len(chunk) for chunk in iter_chunks(paths, chunk_size))
+
+
+def split_mask(n_rows, test_size=TEST_SIZE, random_state=RANDOM_STATE):
+    """Boolean mask of the test rows, the same rows as train_test_split on the whole table"""
+    _, test_idx = train_test_split(np.arange(n_rows), test_size=test_size, random_state=random_state)
+    is_test = np.zeros(n_rows, dtype=bool)
+    is_test[test_idx] = True
+    return is_test
+
+
+def iter_split(paths, is_test, test, chunk_size=DEFAULT_CHUNK_SIZE):
+    """(X, y) chunks of the train rows (test=False) or the test rows (test=True)"""
+    offset = 0
+    for chunk in iter_chunks(paths, chunk_size):
+        keep = is_test[offset:offset + len(chunk)] == test
+        offset += len(chunk)
+        if keep.any():
+            rows = chunk[keep]
+            yield rows[FEATURE_COLS].astype(np.float32), rows[TARGET_COL].to_numpy(dtype=np.float32)
+
+
+class SplitIter(xgb.DataIter):
+    """Feeds XGBoost with the train (or test) rows of the files, one chunk at a time"""
+
+    def __init__(self, paths, is_test, test=False, chunk_size=DEFAULT_CHUNK_SIZE, cache_prefix=None):
+        self.paths = paths
+        self.is_test = is_test
+        self.test = test
+        self.chunk_size = chunk_size
+        self.rows_seen = 0
+        self._chunks = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data):
+        if self._chunks is None:
+            self._chunks = iter_split(self.paths, self.is_test, self.test, self.chunk_size)
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            return False
+        X, y = chunk
+        self.rows_seen += len(y)
+        input_data(data=X, label=y)
+        return True
+
+    def reset(self):
+        self._chunks = None
+
+
+# ---------- Training ----------
+
+def xgb_params(**overrides):
+    """Booster parameters and number of rounds of ml_analysis.build_regressor"""
+    model = build_regressor(**overrides)
+    params = {k: v for k, v in model.get_xgb_params().items() if v is not None}
+    params.setdefault("tree_method", "hist")
+    return params, model.n_estimators
+
+
+def evaluate(booster, paths, is_test, chunk_size=DEFAULT_CHUNK_SIZE):
+    """MSE / R² on the test rows, streamed (sums of squares accumulated chunk by chunk)"""
+    n, sse, sum_y, sum_y2 = 0, 0.0, 0.0, 0.0
+    for X, y in iter_split(paths, is_test, True, chunk_size):
+        y = y.astype(np.float64)
+        pred = booster.inplace_predict(X).astype(np.float64)
+        n += len(y)
+        sse += float(((y - pred) ** 2).sum())
+        sum_y += float(y.sum())
+        sum_y2 += float((y ** 2).sum())
+    sst = sum_y2 - sum_y ** 2 / n
+    return {"mse": sse / n, "r2": 1 - sse / sst, "test_rows": n}
+
+
+def train_external(paths, mode="quantile", chunk_size=DEFAULT_CHUNK_SIZE, cache_dir=CACHE_DIR, **overrides):
+    """
+    Train the regressor from the files, chunk by chunk.
+
+    Returns (booster, report) where report has the split sizes, the test metrics and,
+    for each step, its duration, throughput and the peak RSS after it.
+    """
+    report = {"mode": mode, "chunk_size": chunk_size, "steps": {}}
+
+    def step(name, start, rows):
+        elapsed = time.perf_counter() - start
+        report["steps"][name] = {"seconds": elapsed, "rows_per_s": rows / elapsed if elapsed else None,
+                                 "peak_rss_mb": peak_rss_mb()}
+
+    start = time.perf_counter()
+    n_rows = count_rows(paths, chunk_size)
+    if n_rows == 0:
+        raise ValueError("No usable rows (without missing values) were found in the input files.")
+    is_test = split_mask(n_rows)
+    report["rows"] = n_rows
+    report["train_rows"] = int(n_rows - is_test.sum())
+    step("split", start, n_rows)
+
+    params, rounds = xgb_params(**overrides)
+    tmp_cache = None
+    start = time.perf_counter()
+    if mode == "external":
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_cache = tempfile.mkdtemp(dir=cache_dir)
+        data_iter = SplitIter(paths, is_test, chunk_size=chunk_size, cache_prefix=os.path.join(tmp_cache, "train"))
+        dtrain = xgb.ExtMemQuantileDMatrix(data_iter, max_bin=params.get("max_bin"))
+    elif mode == "quantile":
+        data_iter = SplitIter(paths, is_test, chunk_size=chunk_size)
+        dtrain = xgb.QuantileDMatrix(data_iter, max_bin=params.get("max_bin"))
+    else:
+        raise ValueError(f"Unknown training mode '{mode}', use 'quantile' or 'external'.")
+    step("build_matrix", start, report["train_rows"])
+
+    try:
+        start = time.perf_counter()
+        booster = xgb.train(params, dtrain, num_boost_round=rounds)
+        step("train", start, report["train_rows"])
+    finally:
+        del dtrain
+        if tmp_cache is not None:
+            shutil.rmtree(tmp_cache, ignore_errors=True)
+
+    start = time.perf_counter()
+    report["metrics"] = evaluate(booster, paths, is_test, chunk_size)
+    step("evaluate", start, report["metrics"]["test_rows"])
+    return booster, report
+
+
+def train_in_memory(paths):
+    """The ml_analysis path (whole table in memory), for the comparison"""
+    df = pd.concat(iter_chunks(paths), ignore_index=True)
+    X_train, X_test, y_train, y_test = train_test_split(
+        df[FEATURE_COLS], df[TARGET_COL], test_size=TEST_SIZE, random_state=RANDOM_STATE
+    )
+    model = build_regressor()
+    model.fit(X_train, y_train)
+    y_pred = model.predict(X_test)
+    return {"mse": mean_squared_error(y_test, y_pred), "r2": r2_score(y_test, y_pred), "test_rows": len(y_test)}
+
+
+# ---------- CLI ----------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Out-of-core XGBoost training of the overall_rating regressor")
+    parser.add_argument("paths", nargs="*", default=[DATA_PATH], help="CSV / Parquet files (default: the real data)")
+    parser.add_argument("--mode", choices=["quantile", "external"], default="quantile")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--output", help="Save the trained booster (.ubj / .json)")
+    parser.add_argument("--compare", action="store_true", help="Also train in memory (ml_analysis) and compare")
+    args = parser.parse_args(argv)
+
+    booster, report = train_external(args.paths, args.mode, args.chunk_size)
+
+    print(f"Rows: {report['rows']:,d} ({report['train_rows']:,d} train / {report['metrics']['test_rows']:,d} test), "
+          f"mode: {report['mode']}, chunks of {args.chunk_size:,d} rows")
+    for name, s in report["steps"].items():
+        print(f"  {name:<13s} {s['seconds']:8.2f} s | {s['rows_per_s'] or 0:>12,.0f} rows/s | "
+              f"peak RSS {s['peak_rss_mb']:8.0f} MB")
+    metrics = report["metrics"]
+    print(f"\n=== XGBoost Regression Model (overall_rating), out-of-core ===")
+    print(f"MSE: {metrics['mse']:.4f}")
+    print(f"R² : {metrics['r2']:.4f}")
+
+    if args.output:
+        booster.save_model(args.output)
+        print(f"Booster saved in: {args.output}")
+
+    if args.compare:
+        reference = train_in_memory(args.paths)
+        print(f"\n=== In-memory fit (ml_analysis) ===")
+        print(f"MSE: {reference['mse']:.4f}   (out-of-core - in-memory: {metrics['mse'] - reference['mse']:+.4f})")
+        print(f"R² : {reference['r2']:.4f}   (out-of-core - in-memory: {metrics['r2'] - reference['r2']:+.4f})")
+
+
+if __name__ == "__main__":
+    main()
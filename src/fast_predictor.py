@@ -0,0 +1,131 @@
+# src/fast_predictor.py
+
+"""
+Low-latency single-player inference.
+
+The application used to build a one-row pandas DataFrame and call predict(),
+predict() and predict_proba() for every analysis. For a single player most of that
+time is overhead: DataFrame construction, sklearn input validation and the
+conversion of the DataFrame into an XGBoost DMatrix.
+
+FastPredictor loads the two models once and then works on a one-row NumPy array:
+- the XGBoost regressor is called with Booster.inplace_predict (no DMatrix),
+- the logistic regression is evaluated by LogisticScorer: one small matrix product + softmax.
+The results are the same as the sklearn calls (up to float rounding).
+Every call builds its own row, so one predictor can be shared by several threads
+(the app gives the same instance to every session).
+"""
+
+import os
+
+import numpy as np
+
+from config import FEATURE_COLS, MODELS_DIR
+from logistic_scorer import LogisticScorer, classifier_mode
+
+
+class FastPredictor:
+    """
+    Rating + future class predictor for one player at a time.
+
+        predictor = FastPredictor()
+        rating, future_class, probabilities = predictor.predict({"age": 20, ...})
+
+    `probabilities` follows the order of `predictor.classes`.
+    """
+
+    def __init__(self, models_dir=MODELS_DIR, reg_model=None, clf_model=None):
+        if reg_model is None or clf_model is None:
+            # Imported here: unpickling also imports XGBoost and scikit-learn, the slowest
+            # part of a cold start, so callers decide when (and in which thread) to pay for it.
+            import joblib
+        if reg_model is None:
+            reg_model = joblib.load(os.path.join(models_dir, "regression_model.pkl"))
+        if clf_model is None:
+            clf_model = joblib.load(os.path.join(models_dir, "classification_model.pkl"))
+
+        # Regression: keep only the raw booster
+        booster = reg_model.get_booster()
+        try:
+            iteration_range = (0, booster.best_iteration + 1)
+        except AttributeError:
+            # No early stopping during training -> use all the trees
+            iteration_range = (0, 0)
+
+        # Classification: keep only the coefficients (features x classes)
+        self._setup(booster, iteration_range, clf_model.coef_.T, clf_model.intercept_,
+                    clf_model.classes_, classifier_mode(clf_model), FEATURE_COLS)
+
+    @classmethod
+    def from_arrays(cls, booster, coef, intercept, classes, mode="multinomial",
+                    feature_names=FEATURE_COLS, iteration_range=(0, 0)):
+        """
+        Predictor built from a raw XGBoost booster and the logistic regression arrays
+        (coef: features x classes), without any pickle (see model_registry.py).
+        """
+        predictor = cls.__new__(cls)
+        predictor._setup(booster, tuple(iteration_range), coef, intercept, classes, mode, feature_names)
+        return predictor
+
+    def _setup(self, booster, iteration_range, coef, intercept, classes, mode, feature_names):
+        self.feature_names = list(feature_names)
+        self.classes = np.asarray(classes)
+        self._booster = booster
+        self._iteration_range = iteration_range
+        self._scorer = LogisticScorer(coef, intercept, classes, mode)
+
+    def warm_up(self):
+        """
+        One throw-away prediction: the first XGBoost predict of a process is much slower
+        (lazy initialization inside the library), better pay it before the first user.
+        """
+        self.predict(np.zeros(len(self.feature_names)))
+        return self
+
+    def _fill_row(self, features):
+        """
+        (1, n_features) array of a dict (feature name -> value) or a vector of the 10 features.
+
+        A new array per call (no shared buffer): concurrent calls cannot overwrite
+        each other's row.
+        """
+        n_features = len(self.feature_names)
+        if isinstance(features, dict):
+            return np.array([[features[name] for name in self.feature_names]], dtype=np.float64)
+        values = np.asarray(features, dtype=np.float64).reshape(-1)
+        if values.shape[0] != n_features:
+            raise ValueError(f"Expected {n_features} features, got {values.shape[0]}.")
+        return values.reshape(1, n_features).copy()
+
+    def predict_rating(self, features):
+        """Predicted overall rating of one player"""
+        row = self._fill_row(features)
+        return float(self._booster.inplace_predict(row, iteration_range=self._iteration_range)[0])
+
+    def predict_proba(self, features):
+        """Class probabilities of one player (same order as self.classes)"""
+        return self._scorer.predict_proba(self._fill_row(features)[0])
+
+    def predict_batch(self, rows):
+        """
+        Vectorized prediction for several players at once (n x 10 array, FEATURE_COLS order).
+
+        Returns (ratings, probabilities), with one row of probabilities per player.
+        """
+        rows = np.ascontiguousarray(rows, dtype=np.float64)
+        if rows.ndim != 2 or rows.shape[1] != len(self.feature_names):
+            raise ValueError(f"Expected an array of shape (n, {len(self.feature_names)}), got {rows.shape}.")
+        ratings = self._booster.inplace_predict(rows, iteration_range=self._iteration_range)
+        return ratings, self._scorer.predict_proba(rows)
+
+    def predict(self, features):
+        """
+        Predict everything for one player in a single call.
+
+        Returns (rating, future_class, probabilities).
+        """
+        row = self._fill_row(features)
+        rating = float(self._booster.inplace_predict(row, iteration_range=self._iteration_range)[0])
+        probabilities = self._scorer.predict_proba(row[0])
+        future_class = self.classes[int(probabilities.argmax())]
+        return rating, future_class, probabilities
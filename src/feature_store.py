@@ -0,0 +1,320 @@
+# src/feature_store.py
+
+"""
+Feature store: the training matrices of the ML scripts, precomputed and versioned.
+
+ml_analysis.py, training_pipeline.py, tuning.py and incremental_training.py all
+rebuilt the same X / y from the players table (column selection, dropna on the
+features and targets, future_class labels). Here they are materialized once, as
+memory-mapped .npy files, for each (CSV content, feature definition) pair:
+
+    models/feature_store/<CSV sha256[:12]>-<definition sha256[:12]>/
+        manifest.json          source CSV fingerprint, feature definition, row count
+        <feature>.npy          one file per feature of FEATURE_COLS, dtype of the loaded table
+        matrix.npy             the same features as one float64 matrix (rows x features)
+        overall_rating.npy, potential.npy
+        future_class.npy       int8 codes of labels.FUTURE_CLASSES
+        row_ids.npy            row of each sample in the players table
+
+    python src/feature_store.py build        # data/fifa_players.csv, if missing
+    python src/feature_store.py list
+    python src/feature_store.py prune        # delete the versions other than the current one
+
+    features = open_features()               # FeatureSet of the current version, built on first use
+    X, y = features.frame(), features.target("overall_rating")
+    X_np = features.matrix                   # float64, for NumPy / scikit-learn code
+
+Every array is opened with np.load(mmap_mode="r"), so opening a version is instant
+and the DataFrames / arrays are read-only views of the files: nothing is copied
+before a split or a fit actually reads the rows. The definition covers the feature
+columns, the dropna columns and the future_class thresholds: changing any of them,
+or the CSV content, gives a new version (the older ones stay until pruned).
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from config import DATA_PATH, FEATURE_COLS, MODELS_DIR
+from data_loader import file_sha256, load_players
+from labels import (FUTURE_CLASSES, HIGH_GROWTH_GAP, IMPROVE_GAP, STABLE_GAP, YOUNG_MAX_AGE,
+                    build_future_labels)
+
+
+FEATURE_STORE_DIR = os.path.join(MODELS_DIR, "feature_store")
+MANIFEST_FILE = "manifest.json"
+FORMAT_VERSION = 1
+
+TARGET_COLS = ["overall_rating", "potential"]
+
+# Rows with a missing value in one of these columns are removed (like ml_analysis)
+REQUIRED_COLS = list(dict.fromkeys(FEATURE_COLS + TARGET_COLS + ["age"]))
+
+
+# ---------- Versions ----------
+
+def feature_definition():
+    """Everything the matrices depend on besides the CSV (part of the version key)"""
+    return {
+        "format_version": FORMAT_VERSION,
+        "features": FEATURE_COLS,
+        "targets": TARGET_COLS,
+        "required": REQUIRED_COLS,
+        "future_class": {
+            "classes": FUTURE_CLASSES,
+            "high_growth_gap": HIGH_GROWTH_GAP,
+            "young_max_age": YOUNG_MAX_AGE,
+            "improve_gap": IMPROVE_GAP,
+            "stable_gap": STABLE_GAP,
+        },
+    }
+
+
+def definition_hash(definition):
+    return hashlib.sha256(json.dumps(definition, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def version_name(data_sha256, definition):
+    return f"{data_sha256[:12]}-{definition_hash(definition)[:12]}"
+
+
+def _source_info(csv_path):
+    stat = os.stat(csv_path)
+    return {"path": os.path.abspath(csv_path), "size": stat.st_size, "mtime": stat.st_mtime}
+
+
+def _read_manifest(version_dir):
+    try:
+        with open(os.path.join(version_dir, MANIFEST_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(version_dir, manifest):
+    tmp_path = os.path.join(version_dir, MANIFEST_FILE + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(version_dir, MANIFEST_FILE))
+
+
+def _versions(store_dir):
+    """(version directory, manifest) of every complete version of the store"""
+    if not os.path.isdir(store_dir):
+        return []
+    versions = []
+    for name in sorted(os.listdir(store_dir)):
+        version_dir = os.path.join(store_dir, name)
+        manifest = _read_manifest(version_dir) if ".tmp-" not in name else None
+        if manifest is not None:
+            versions.append((version_dir, manifest))
+    return versions
+
+
+# ---------- Build ----------
+
+def build_features(df, store_dir=FEATURE_STORE_DIR, source=None, definition=None):
+    """
+    Materialize the training matrices of the players table `df` as a new version.
+
+    `source` is the fingerprint of the CSV (path, size, mtime, sha256), the sha256
+    being part of the version name. Returns the version directory.
+    """
+    definition = definition or feature_definition()
+    for c in definition["required"]:
+        if c not in df.columns:
+            raise ValueError(f"Column '{c}' was not found in the CSV.")
+    source = source or {}
+    data_hash = source.get("sha256") or hashlib.sha256(
+        pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()).hexdigest()
+
+    start = time.perf_counter()
+    df_clean = df.dropna(subset=definition["required"])
+    labels = build_future_labels(df_clean, **{key: value for key, value in definition["future_class"].items()
+                                              if key != "classes"})
+    classes = definition["future_class"]["classes"]
+
+    version_dir = os.path.join(store_dir, version_name(data_hash, definition))
+    tmp_dir = f"{version_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    try:
+        features = definition["features"]
+        for col in features:
+            np.save(os.path.join(tmp_dir, f"{col}.npy"), df_clean[col].to_numpy())
+        np.save(os.path.join(tmp_dir, "matrix.npy"),
+                np.ascontiguousarray(df_clean[features].to_numpy(dtype=np.float64)))
+        for col in definition["targets"]:
+            np.save(os.path.join(tmp_dir, f"{col}.npy"), df_clean[col].to_numpy())
+        codes = pd.Categorical(labels, categories=classes).codes.astype(np.int8)
+        np.save(os.path.join(tmp_dir, "future_class.npy"), codes)
+        np.save(os.path.join(tmp_dir, "row_ids.npy"), df.index.get_indexer(df_clean.index).astype(np.int64))
+
+        _write_manifest(tmp_dir, {
+            "format_version": FORMAT_VERSION,
+            "version": os.path.basename(version_dir),
+            "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "build_seconds": round(time.perf_counter() - start, 3),
+            "source": dict(source, sha256=data_hash),
+            "definition": definition,
+            "n_rows": len(df_clean),
+            "n_source_rows": len(df),
+        })
+        shutil.rmtree(version_dir, ignore_errors=True)
+        os.replace(tmp_dir, version_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return version_dir
+
+
+def build_from_csv(csv_path=DATA_PATH, store_dir=FEATURE_STORE_DIR, definition=None):
+    source = _source_info(csv_path)
+    source["sha256"] = file_sha256(csv_path)
+    return build_features(load_players(csv_path), store_dir, source, definition)
+
+
+# ---------- Read ----------
+
+class FeatureSet:
+    """One version of the feature store, memory-mapped (read-only)"""
+
+    def __init__(self, version_dir):
+        self.manifest = _read_manifest(version_dir)
+        if self.manifest is None:
+            raise FileNotFoundError(f"No feature set found in {version_dir}")
+        if self.manifest.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported feature store format {self.manifest.get('format_version')}.")
+        self.version_dir = version_dir
+        self.version = self.manifest["version"]
+        definition = self.manifest["definition"]
+        self.feature_names = definition["features"]
+        self.classes = definition["future_class"]["classes"]
+
+        def load(name):
+            # Plain ndarray views of the memory maps (they pickle / slice like any array)
+            return np.asarray(np.load(os.path.join(version_dir, f"{name}.npy"), mmap_mode="r", allow_pickle=False))
+
+        self.columns = {col: load(col) for col in self.feature_names}
+        self.matrix = load("matrix")
+        self.targets = {col: load(col) for col in definition["targets"]}
+        self.future_class_codes = load("future_class")
+        self.row_ids = load("row_ids")
+
+    def __len__(self):
+        return self.manifest["n_rows"]
+
+    @property
+    def overall_rating(self):
+        return self.targets["overall_rating"]
+
+    @property
+    def potential(self):
+        return self.targets["potential"]
+
+    @property
+    def future_class(self):
+        """future_class labels (object array, like labels.build_future_labels)"""
+        return np.array(self.classes, dtype=object)[self.future_class_codes]
+
+    def frame(self):
+        """The features as a DataFrame (dtypes of the players table), indexed by row id, without copy"""
+        return pd.DataFrame(self.columns, index=pd.Index(self.row_ids), copy=False)
+
+    def target(self, name):
+        """A target as a Series aligned with frame() ("overall_rating", "potential" or "future_class")"""
+        values = self.future_class if name == "future_class" else self.targets[name]
+        return pd.Series(values, index=pd.Index(self.row_ids), name=name, copy=False)
+
+
+def open_features(csv_path=DATA_PATH, store_dir=FEATURE_STORE_DIR, rebuild=False):
+    """
+    The FeatureSet of `csv_path` with the current feature definition, built first if
+    this version does not exist yet.
+
+    A version built from the same file (same size and mtime) is found without reading
+    the CSV; otherwise the CSV sha256 names the version, so a copied or touched file
+    reuses the existing matrices.
+    """
+    definition = feature_definition()
+    current = _source_info(csv_path)
+    if not rebuild:
+        for version_dir, manifest in _versions(store_dir):
+            source = manifest.get("source") or {}
+            if manifest.get("definition") == definition and source.get("path") == current["path"] \
+                    and (source.get("size"), source.get("mtime")) == (current["size"], current["mtime"]):
+                return FeatureSet(version_dir)
+
+    data_hash = file_sha256(csv_path)
+    version_dir = os.path.join(store_dir, version_name(data_hash, definition))
+    manifest = _read_manifest(version_dir)
+    if rebuild or manifest is None or manifest.get("format_version") != FORMAT_VERSION:
+        build_features(load_players(csv_path), store_dir, dict(current, sha256=data_hash), definition)
+    else:
+        # Same content: remember the new path / mtime so the next lookup is cheap again
+        manifest["source"] = dict(current, sha256=data_hash)
+        try:
+            _write_manifest(version_dir, manifest)
+        except OSError:
+            pass
+    return FeatureSet(version_dir)
+
+
+def list_versions(store_dir=FEATURE_STORE_DIR):
+    """One row per version of the store"""
+    rows = []
+    for version_dir, manifest in _versions(store_dir):
+        size = sum(entry.stat().st_size for entry in os.scandir(version_dir) if entry.is_file())
+        rows.append({
+            "version": os.path.basename(version_dir),
+            "built_at": manifest.get("built_at"),
+            "rows": manifest.get("n_rows"),
+            "source": (manifest.get("source") or {}).get("path"),
+            "size_mb": round(size / 1e6, 2),
+        })
+    return pd.DataFrame(rows, columns=["version", "built_at", "rows", "source", "size_mb"])
+
+
+def prune(keep, store_dir=FEATURE_STORE_DIR):
+    """Delete every version but the ones named in `keep`, returns the deleted names"""
+    deleted = []
+    for version_dir, _ in _versions(store_dir):
+        name = os.path.basename(version_dir)
+        if name not in keep:
+            shutil.rmtree(version_dir, ignore_errors=True)
+            deleted.append(name)
+    return deleted
+
+
+# ---------- CLI ----------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Versioned, memory-mapped training matrices")
+    parser.add_argument("command", choices=["build", "list", "prune"])
+    parser.add_argument("--data", default=DATA_PATH, help="Players CSV")
+    parser.add_argument("--store-dir", default=FEATURE_STORE_DIR)
+    parser.add_argument("--rebuild", action="store_true", help="Build the version again even if it exists")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        start = time.perf_counter()
+        features = open_features(args.data, args.store_dir, rebuild=args.rebuild)
+        print(f"✅ Feature set {features.version}: {len(features):,d} rows x {len(features.feature_names)} "
+              f"features in {time.perf_counter() - start:.2f} s -> {features.version_dir}")
+    elif args.command == "list":
+        versions = list_versions(args.store_dir)
+        print(versions.to_string(index=False) if len(versions) else f"No feature set in {args.store_dir}")
+    else:
+        current = open_features(args.data, args.store_dir)
+        deleted = prune({current.version}, args.store_dir)
+        print(f"✅ {len(deleted)} version(s) deleted, {current.version} kept")
+
+
+if __name__ == "__main__":
+    main()
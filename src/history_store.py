@@ -0,0 +1,452 @@
+# src/history_store.py
+
+"""
+Analysis history stored in an embedded SQLite database (data/history.db).
+
+It replaces the append-only data/history.csv, which had to be re-read entirely on
+every Streamlit rerun:
+- WAL journal mode + busy timeout: several sessions can save players at the same
+  time, and readers never block writers.
+- Indexes on player_name, date_added, predicted_future_class and the predicted
+  rating, used by the paginated, filtered and sorted history view.
+- The four dashboard metrics (count, average rating, average age, future superstars)
+  come from aggregate tables kept up to date by triggers, so reading them costs
+  the same with 10 rows or 10 million rows. The averages are taken over the rows
+  where the value is present (same as AVG() in SQL).
+- The existing history.csv is imported once, the first time the database is created.
+"""
+
+import csv
+import os
+import sqlite3
+
+import pandas as pd
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+
+HISTORY_DB_PATH = os.path.join(PROJECT_ROOT, "data", "history.db")
+HISTORY_CSV_PATH = os.path.join(PROJECT_ROOT, "data", "history.csv")
+
+# Columns of the history, in the order of the old history.csv, with their SQLite type
+HISTORY_COLUMNS = {
+    "player_name": "TEXT",
+    "age": "INTEGER",
+    "height_cm": "REAL",
+    "weight_kgs": "REAL",
+    "finishing": "INTEGER",
+    "dribbling": "INTEGER",
+    "short_passing": "INTEGER",
+    "acceleration": "INTEGER",
+    "sprint_speed": "INTEGER",
+    "stamina": "INTEGER",
+    "strength": "INTEGER",
+    "predicted_overall_rating": "REAL",
+    "predicted_future_class": "TEXT",
+    "date_added": "TEXT",
+}
+
+# Python conversion for each SQLite type (also turns numpy scalars into plain Python values)
+_CONVERTERS = {"TEXT": str, "INTEGER": int, "REAL": float}
+
+# Columns the history view can be sorted on (all indexed, "id" = order of addition)
+SORTABLE_COLUMNS = ["id", "date_added", "player_name", "predicted_overall_rating"]
+
+# Seconds a writer waits for another session's write to finish before failing
+BUSY_TIMEOUT_S = 10
+
+# Version of the aggregate tables and triggers (PRAGMA user_version of the database);
+# an older database gets them rebuilt from the history table when it is opened
+SCHEMA_VERSION = 3
+
+# Key of history_class_counts for the rows without a predicted class. SQLite does not
+# make NULL keys conflict, so NULL is stored as '' (never a class: _to_row turns '' into NULL)
+NO_CLASS = ""
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    {", ".join(f"{name} {sql_type}" for name, sql_type in HISTORY_COLUMNS.items())}
+);
+CREATE INDEX IF NOT EXISTS idx_history_player_name ON history(player_name);
+CREATE INDEX IF NOT EXISTS idx_history_date_added ON history(date_added);
+CREATE INDEX IF NOT EXISTS idx_history_future_class ON history(predicted_future_class);
+CREATE INDEX IF NOT EXISTS idx_history_rating ON history(predicted_overall_rating);
+
+-- Small key/value table (e.g. to remember that history.csv was imported)
+CREATE TABLE IF NOT EXISTS history_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Aggregate tables and the triggers that maintain them, one statement per item
+# (run inside the transaction of _upgrade, after the old versions were dropped)
+_AGGREGATES_SCHEMA = [
+    """
+-- Running totals used by the dashboard metrics (a single row); n_rating / n_age
+-- count the rows where the value is not NULL and are the divisors of the averages
+CREATE TABLE history_totals (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    n_players INTEGER NOT NULL,
+    n_rating INTEGER NOT NULL,
+    sum_rating REAL NOT NULL,
+    n_age INTEGER NOT NULL,
+    sum_age REAL NOT NULL
+)""",
+    """
+INSERT INTO history_totals
+SELECT 1, COUNT(*), COUNT(predicted_overall_rating), COALESCE(SUM(predicted_overall_rating), 0.0),
+       COUNT(age), COALESCE(SUM(age), 0.0)
+  FROM history""",
+    """
+-- Number of players per predicted future class (NULL counted under NO_CLASS)
+CREATE TABLE history_class_counts (
+    predicted_future_class TEXT NOT NULL PRIMARY KEY,
+    n_players INTEGER NOT NULL
+)""",
+    f"""
+INSERT INTO history_class_counts
+SELECT COALESCE(predicted_future_class, '{NO_CLASS}'), COUNT(*) FROM history
+ GROUP BY COALESCE(predicted_future_class, '{NO_CLASS}')""",
+    f"""
+CREATE TRIGGER history_after_insert AFTER INSERT ON history
+BEGIN
+    UPDATE history_totals
+       SET n_players = n_players + 1,
+           n_rating = n_rating + (NEW.predicted_overall_rating IS NOT NULL),
+           sum_rating = sum_rating + COALESCE(NEW.predicted_overall_rating, 0),
+           n_age = n_age + (NEW.age IS NOT NULL),
+           sum_age = sum_age + COALESCE(NEW.age, 0)
+     WHERE id = 1;
+    INSERT INTO history_class_counts VALUES (COALESCE(NEW.predicted_future_class, '{NO_CLASS}'), 1)
+        ON CONFLICT(predicted_future_class) DO UPDATE SET n_players = n_players + 1;
+END""",
+    f"""
+CREATE TRIGGER history_after_delete AFTER DELETE ON history
+BEGIN
+    UPDATE history_totals
+       SET n_players = n_players - 1,
+           n_rating = n_rating - (OLD.predicted_overall_rating IS NOT NULL),
+           sum_rating = sum_rating - COALESCE(OLD.predicted_overall_rating, 0),
+           n_age = n_age - (OLD.age IS NOT NULL),
+           sum_age = sum_age - COALESCE(OLD.age, 0)
+     WHERE id = 1;
+    UPDATE history_class_counts SET n_players = n_players - 1
+     WHERE predicted_future_class = COALESCE(OLD.predicted_future_class, '{NO_CLASS}');
+END""",
+]
+
+
+class HistoryStore:
+    """
+    Access to the history database.
+
+    A new SQLite connection is opened for each operation, so one HistoryStore can be
+    shared by all the Streamlit sessions (threads) without locking on our side.
+    """
+
+    def __init__(self, db_path=HISTORY_DB_PATH, csv_path=HISTORY_CSV_PATH):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        conn = self._connect()
+        try:
+            # WAL is a persistent property of the database file
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._upgrade(conn)
+        finally:
+            conn.close()
+
+        if csv_path and os.path.exists(csv_path):
+            self.migrate_csv(csv_path)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_S, isolation_level=None)
+        conn.execute("PRAGMA synchronous=NORMAL")  # safe with WAL, much faster commits
+        return conn
+
+    @staticmethod
+    def _upgrade(conn):
+        """
+        (Re)create the aggregate tables and triggers if the database is older than
+        SCHEMA_VERSION, their values recomputed from the history table (one scan, once).
+        """
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+        try:
+            # Checked again under the write lock: another session may have upgraded it
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                conn.execute("DROP TRIGGER IF EXISTS history_after_insert")
+                conn.execute("DROP TRIGGER IF EXISTS history_after_delete")
+                conn.execute("DROP TABLE IF EXISTS history_totals")
+                conn.execute("DROP TABLE IF EXISTS history_class_counts")
+                for statement in _AGGREGATES_SCHEMA:
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _to_row(record):
+        """dict -> tuple of values in HISTORY_COLUMNS order, converted to plain Python types"""
+        row = []
+        for name, sql_type in HISTORY_COLUMNS.items():
+            value = record.get(name)
+            if value is None or value == "" or (isinstance(value, float) and value != value):
+                row.append(None)
+            else:
+                row.append(_CONVERTERS[sql_type](value))
+        return tuple(row)
+
+    def _insert_many(self, conn, records):
+        placeholders = ", ".join("?" for _ in HISTORY_COLUMNS)
+        conn.executemany(
+            f"INSERT INTO history ({', '.join(HISTORY_COLUMNS)}) VALUES ({placeholders})",
+            (self._to_row(record) for record in records),
+        )
+
+    def migrate_csv(self, csv_path):
+        """
+        Import the old history.csv (only once: the import is recorded in history_meta).
+
+        Returns the number of imported rows (0 if it was already done).
+        """
+        conn = self._connect()
+        try:
+            # BEGIN IMMEDIATE takes the write lock now: two sessions starting at the
+            # same time cannot both import the file.
+            conn.execute("BEGIN IMMEDIATE")
+            done = conn.execute("SELECT value FROM history_meta WHERE key = 'csv_migrated'").fetchone()
+            if done:
+                conn.execute("ROLLBACK")
+                return 0
+
+            with open(csv_path, newline="", encoding="utf-8") as f:
+                records = list(csv.DictReader(f))
+            self._insert_many(conn, records)
+            conn.execute("INSERT INTO history_meta VALUES ('csv_migrated', ?)", (os.path.abspath(csv_path),))
+            conn.execute("COMMIT")
+            return len(records)
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def add_player(self, record):
+        """Save one analysed player (dict with the HISTORY_COLUMNS keys), returns its id"""
+        return self.add_players([record])
+
+    def add_players(self, records):
+        """Save several players in one transaction, returns the id of the last one"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            self._insert_many(conn, records)
+            last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            conn.execute("COMMIT")
+            return last_id
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def stats(self):
+        """
+        The four dashboard metrics, read from the aggregate tables (constant time).
+
+        Returns total_players, average_rating, average_age, future_superstars.
+        """
+        conn = self._connect()
+        try:
+            n_players, n_rating, sum_rating, n_age, sum_age = conn.execute(
+                "SELECT n_players, n_rating, sum_rating, n_age, sum_age FROM history_totals WHERE id = 1"
+            ).fetchone()
+            superstars = conn.execute(
+                "SELECT n_players FROM history_class_counts WHERE predicted_future_class = 'high_growth'"
+            ).fetchone()
+        finally:
+            conn.close()
+
+        return {
+            "total_players": n_players,
+            "average_rating": sum_rating / n_rating if n_rating else 0.0,
+            "average_age": sum_age / n_age if n_age else 0.0,
+            "future_superstars": superstars[0] if superstars else 0,
+        }
+
+    @staticmethod
+    def _where(player_name=None, future_class=None):
+        """SQL WHERE clause + parameters for the history filters"""
+        clauses, params = [], []
+        if player_name:
+            clauses.append("player_name LIKE ?")
+            params.append(f"%{player_name}%")
+        if future_class:
+            clauses.append("predicted_future_class = ?")
+            params.append(future_class)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def count(self, player_name=None, future_class=None):
+        """Number of players matching the filters (constant time without a name filter)"""
+        if not player_name:
+            if not future_class:
+                return self.stats()["total_players"]
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT n_players FROM history_class_counts WHERE predicted_future_class = ?",
+                    (future_class,),
+                ).fetchone()
+            finally:
+                conn.close()
+            return row[0] if row else 0
+
+        where, params = self._where(player_name, future_class)
+        conn = self._connect()
+        try:
+            return conn.execute(f"SELECT COUNT(*) FROM history{where}", params).fetchone()[0]
+        finally:
+            conn.close()
+
+    def page(self, offset=0, limit=50, player_name=None, future_class=None,
+             sort_by="id", descending=True):
+        """
+        One page of the history, filtered and sorted by the database.
+
+        player_name keeps the names containing the given text (case-insensitive),
+        future_class keeps one predicted class. sort_by must be one of SORTABLE_COLUMNS.
+        """
+        if sort_by not in SORTABLE_COLUMNS:
+            raise ValueError(f"Cannot sort the history by '{sort_by}', use one of {SORTABLE_COLUMNS}.")
+
+        where, params = self._where(player_name, future_class)
+        order = "DESC" if descending else "ASC"
+        conn = self._connect()
+        try:
+            return pd.read_sql_query(
+                f"SELECT {', '.join(HISTORY_COLUMNS)} FROM history{where} "
+                f"ORDER BY {sort_by} {order}, id {order} LIMIT ? OFFSET ?",
+                conn, params=params + [limit, offset],
+            )
+        finally:
+            conn.close()
+
+    def rows_since(self, last_id, columns=None):
+        """Rows added after the row `last_id` (primary key lookup), with their id, oldest first"""
+        columns = columns or list(HISTORY_COLUMNS)
+        conn = self._connect()
+        try:
+            return pd.read_sql_query(
+                f"SELECT id, {', '.join(columns)} FROM history WHERE id > ? ORDER BY id",
+                conn, params=(last_id,),
+            )
+        finally:
+            conn.close()
+
+    def snapshot(self):
+        """
+        Totals, per-class counts and last row id, read in one consistent transaction.
+
+        Used to seed HistoryAggregates without scanning the history.
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN")
+            n_players, n_rating, sum_rating, n_age, sum_age = conn.execute(
+                "SELECT n_players, n_rating, sum_rating, n_age, sum_age FROM history_totals WHERE id = 1"
+            ).fetchone()
+            # Players without a class are left out, like value_counts() in HistoryAggregates.update
+            class_counts = dict(conn.execute(
+                "SELECT predicted_future_class, n_players FROM history_class_counts "
+                "WHERE n_players > 0 AND predicted_future_class <> ?", (NO_CLASS,)
+            ).fetchall())
+            last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM history").fetchone()[0]
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        return {"n_players": n_players, "n_rating": n_rating, "sum_rating": sum_rating,
+                "n_age": n_age, "sum_age": sum_age, "class_counts": class_counts, "last_id": last_id}
+
+    def recent(self, limit=100):
+        """The `limit` most recently added players, newest first, as a DataFrame"""
+        conn = self._connect()
+        try:
+            return pd.read_sql_query(
+                f"SELECT {', '.join(HISTORY_COLUMNS)} FROM history ORDER BY id DESC LIMIT ?",
+                conn, params=(limit,),
+            )
+        finally:
+            conn.close()
+
+
+class HistoryAggregates:
+    """
+    Running aggregates of the history, kept by each session.
+
+    They are seeded once from HistoryStore.snapshot(), then refresh() only reads the
+    rows added since the last seen id and updates the sums in O(new rows).
+
+        aggregates = HistoryAggregates()
+        aggregates.refresh(store)
+        aggregates.average_rating
+    """
+
+    def __init__(self):
+        self.last_id = None
+        self.n_players = 0
+        self.n_rating = 0  # rows with a rating / an age: divisors of the averages
+        self.sum_rating = 0.0
+        self.n_age = 0
+        self.sum_age = 0.0
+        self.class_counts = {}
+
+    def refresh(self, store):
+        """Bring the aggregates up to date, returns the number of new rows seen"""
+        if self.last_id is None:
+            snapshot = store.snapshot()
+            self.last_id = snapshot["last_id"]
+            self.n_players = snapshot["n_players"]
+            self.n_rating = snapshot["n_rating"]
+            self.sum_rating = snapshot["sum_rating"]
+            self.n_age = snapshot["n_age"]
+            self.sum_age = snapshot["sum_age"]
+            self.class_counts = snapshot["class_counts"]
+            return self.n_players
+
+        new_rows = store.rows_since(
+            self.last_id, columns=["age", "predicted_overall_rating", "predicted_future_class"]
+        )
+        self.update(new_rows)
+        return len(new_rows)
+
+    def update(self, new_rows):
+        """Add a DataFrame of new rows (with an 'id' column) to the aggregates"""
+        if new_rows.empty:
+            return
+        self.last_id = int(new_rows["id"].max())
+        self.n_players += len(new_rows)
+        self.n_rating += int(new_rows["predicted_overall_rating"].count())
+        self.sum_rating += float(new_rows["predicted_overall_rating"].sum())
+        self.n_age += int(new_rows["age"].count())
+        self.sum_age += float(new_rows["age"].sum())
+        for future_class, n in new_rows["predicted_future_class"].value_counts().items():
+            self.class_counts[future_class] = self.class_counts.get(future_class, 0) + int(n)
+
+    @property
+    def average_rating(self):
+        return self.sum_rating / self.n_rating if self.n_rating else 0.0
+
+    @property
+    def average_age(self):
+        return self.sum_age / self.n_age if self.n_age else 0.0
@@ -0,0 +1,338 @@
+# src/incremental_training.py
+
+"""
+Incremental retraining of the two models when newly labelled players arrive.
+
+ml_analysis.main() always retrains both models from scratch on the full CSV.
+When only a few new labelled rows arrive (players whose real overall_rating and
+potential are now known), this script updates the saved models instead:
+- the XGBoost regressor continues boosting from models/regression_model.pkl
+  (a few extra trees fitted on the new rows + a replay sample of the old data),
+- the logistic regression is refreshed with warm_start (the optimizer starts from
+  the saved coefficients, so it converges in a few iterations).
+
+Policy (choose_strategy):
+- "retrain" (from scratch on old + new rows) when there is no saved model, when the
+  new rows are a large part of the data, when the booster already has too many trees,
+  or when the new rows contain a future class the classifier does not know,
+- "continue" otherwise.
+
+Gate: the candidate models replace the pickles only if they are not worse than the
+current ones on a holdout: for each model, its ml_analysis test split (30 % for the
+regressor, 20 % stratified for the classifier) + a part of the new rows. Each model is
+trained on all the other old rows, like in ml_analysis.
+The pickles are replaced atomically (temp file + os.replace), the previous ones are
+kept as *.prev.pkl, and the new models are published as a new registry version.
+
+    python src/incremental_training.py data/new_players.csv
+"""
+
+import argparse
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+import joblib
+
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import mean_squared_error, accuracy_score
+
+from feature_store import open_features
+from labels import build_future_labels
+from model_registry import publish
+from ml_analysis import (DATA_PATH, FEATURE_COLS, MODELS_DIR, build_classifier,
+                         build_regressor)
+
+
+REGRESSION_MODEL_FILE = "regression_model.pkl"
+CLASSIFICATION_MODEL_FILE = "classification_model.pkl"
+
+TARGET_COLS = ["overall_rating", "potential"]
+
+# Retrain-or-continue policy
+MAX_NEW_FRACTION = 0.3       # more new rows than that (vs old rows) -> retrain from scratch
+MAX_BOOSTED_ROUNDS = 400     # booster bigger than that -> retrain from scratch
+CONTINUE_ROUNDS = 20         # trees added to the booster by one "continue" run
+WARM_START_MAX_ITER = 200    # iterations of the warm-started logistic regression
+
+# Share of the new rows kept for the holdout gate
+NEW_HOLDOUT_SIZE = 0.2
+
+# Holdout gate: the candidate may be at most this much worse than the current model
+RMSE_TOLERANCE = 0.01        # relative
+ACCURACY_TOLERANCE = 0.005   # absolute
+
+RANDOM_STATE = 42
+
+
+# ---------- Data ----------
+
+def prepare_labelled(df):
+    """Rows usable for training: complete features/targets, with their future class"""
+    for c in FEATURE_COLS + TARGET_COLS:
+        if c not in df.columns:
+            raise ValueError(f"Column '{c}' was not found in the new data.")
+    df_clean = df.dropna(subset=FEATURE_COLS + TARGET_COLS)
+    X = df_clean[FEATURE_COLS].astype(np.float64).reset_index(drop=True)
+    y_reg = df_clean["overall_rating"].to_numpy(dtype=np.float64)
+    y_cls = build_future_labels(df_clean)
+    return X, y_reg, y_cls
+
+
+def split_indices(y_cls):
+    """
+    Row indices of the train / holdout splits of ml_analysis, one pair per model:
+    - regressor : test_size=0.3, random_state=42
+    - classifier: test_size=0.2, random_state=42, stratified on the future class
+
+    Returns ((reg_train, reg_holdout), (cls_train, cls_holdout)).
+    """
+    rows = np.arange(len(y_cls))
+    reg_indices = train_test_split(rows, test_size=0.3, random_state=RANDOM_STATE)
+    cls_indices = train_test_split(rows, test_size=0.2, random_state=RANDOM_STATE, stratify=y_cls)
+    return tuple(reg_indices), tuple(cls_indices)
+
+
+def split_base(X, y_reg, y_cls):
+    """
+    Train / holdout splits of the original dataset, one per model.
+
+    They are the test splits of ml_analysis (see split_indices), so neither current
+    model was trained on its holdout, and a retrain uses the same old rows as ml_analysis.
+
+    Returns (reg_split, cls_split), each (X_train, y_train, X_holdout, y_holdout).
+    """
+    (reg_train, reg_test), (cls_train, cls_test) = split_indices(y_cls)
+    reg_split = (X.iloc[reg_train], y_reg[reg_train], X.iloc[reg_test], y_reg[reg_test])
+    cls_split = (X.iloc[cls_train], y_cls[cls_train], X.iloc[cls_test], y_cls[cls_test])
+    return reg_split, cls_split
+
+
+def split_new(X, y_reg, y_cls, holdout_size=NEW_HOLDOUT_SIZE):
+    """Keep a part of the new rows for the holdout (none if there are too few of them)"""
+    n_holdout = int(len(X) * holdout_size)
+    if n_holdout == 0:
+        return X, y_reg, y_cls, X.iloc[:0], y_reg[:0], y_cls[:0]
+    idx_train, idx_test = train_test_split(np.arange(len(X)), test_size=n_holdout, random_state=RANDOM_STATE)
+    return (X.iloc[idx_train], y_reg[idx_train], y_cls[idx_train],
+            X.iloc[idx_test], y_reg[idx_test], y_cls[idx_test])
+
+
+# ---------- Policy ----------
+
+def choose_strategy(reg_model, clf_model, n_old, n_new, new_classes,
+                    max_new_fraction=MAX_NEW_FRACTION, max_boosted_rounds=MAX_BOOSTED_ROUNDS):
+    """
+    Decide between "continue" and "retrain".
+
+    Returns (strategy, reason).
+    """
+    if reg_model is None or clf_model is None:
+        return "retrain", "no saved model"
+    if n_old == 0 or n_new / n_old > max_new_fraction:
+        return "retrain", f"{n_new} new rows for {n_old} old rows (more than {max_new_fraction:.0%})"
+    n_rounds = reg_model.get_booster().num_boosted_rounds()
+    if n_rounds + CONTINUE_ROUNDS > max_boosted_rounds:
+        return "retrain", f"booster already has {n_rounds} trees (limit {max_boosted_rounds})"
+    unknown = sorted(set(new_classes) - set(clf_model.classes_))
+    if unknown:
+        return "retrain", f"new future classes {unknown} unknown to the classifier"
+    return "continue", f"{n_new} new rows, booster has {n_rounds} trees"
+
+
+# ---------- Training ----------
+
+def continue_training(reg_model, clf_model, X_reg, y_reg, X_cls, y_cls, rounds=CONTINUE_ROUNDS,
+                      max_iter=WARM_START_MAX_ITER):
+    """
+    Candidate models updated from the saved ones.
+
+    The saved models are not modified (the booster is copied by XGBoost, the
+    classifier is cloned through its coefficients).
+    """
+    reg_candidate = build_regressor()
+    reg_candidate.set_params(n_estimators=rounds)
+    reg_candidate.fit(X_reg, y_reg, xgb_model=reg_model.get_booster())
+
+    clf_candidate = build_classifier()
+    clf_candidate.set_params(warm_start=True, max_iter=max_iter)
+    # warm_start reuses coef_ / intercept_ as the starting point of the optimizer
+    clf_candidate.classes_ = clf_model.classes_
+    clf_candidate.coef_ = clf_model.coef_.copy()
+    clf_candidate.intercept_ = clf_model.intercept_.copy()
+    clf_candidate.fit(X_cls, y_cls)
+    return reg_candidate, clf_candidate
+
+
+def retrain(X_reg, y_reg, X_cls, y_cls):
+    """Candidate models trained from scratch (same settings as ml_analysis)"""
+    reg_candidate = build_regressor()
+    reg_candidate.fit(X_reg, y_reg)
+    clf_candidate = build_classifier()
+    clf_candidate.fit(X_cls, y_cls)
+    return reg_candidate, clf_candidate
+
+
+def replay_sample(X, y, n_rows, random_state=RANDOM_STATE):
+    """Random sample of the old training rows, mixed with the new rows when continuing"""
+    n_rows = min(n_rows, len(X))
+    idx = np.random.default_rng(random_state).choice(len(X), size=n_rows, replace=False)
+    return X.iloc[idx], y[idx]
+
+
+# ---------- Gate ----------
+
+def evaluate(reg_model, clf_model, X_reg, y_reg, X_cls, y_cls):
+    """Holdout metrics of a pair of models (each on its own holdout)"""
+    rmse = float(np.sqrt(mean_squared_error(y_reg, reg_model.predict(X_reg))))
+    accuracy = float(accuracy_score(y_cls, clf_model.predict(X_cls)))
+    return {"rmse": rmse, "accuracy": accuracy}
+
+
+def passes_gate(current, candidate, rmse_tolerance=RMSE_TOLERANCE, accuracy_tolerance=ACCURACY_TOLERANCE):
+    """The candidate must not be worse than the current models (within the tolerances)"""
+    if current is None:
+        return True
+    return (candidate["rmse"] <= current["rmse"] * (1 + rmse_tolerance)
+            and candidate["accuracy"] >= current["accuracy"] - accuracy_tolerance)
+
+
+def save_model_atomic(model, path, keep_previous=True):
+    """
+    Replace a pickle without ever exposing a half-written file.
+
+    The application (and its prediction cache fingerprint) only sees the old file
+    or the new one.
+    """
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    joblib.dump(model, tmp_path)
+    if keep_previous and os.path.exists(path):
+        shutil.copy2(path, path.replace(".pkl", ".prev.pkl"))
+    os.replace(tmp_path, path)
+
+
+def _load_model(path):
+    return joblib.load(path) if os.path.exists(path) else None
+
+
+# ---------- Driver ----------
+
+def update_models(new_df, data_path=DATA_PATH, models_dir=MODELS_DIR, force=None, dry_run=False,
+                  rounds=CONTINUE_ROUNDS):
+    """
+    Update the saved models with newly labelled players.
+
+    force = None / "continue" / "retrain" overrides the policy.
+    Returns a report dict (strategy, reason, metrics, accepted, timings).
+    """
+    reg_path = os.path.join(models_dir, REGRESSION_MODEL_FILE)
+    clf_path = os.path.join(models_dir, CLASSIFICATION_MODEL_FILE)
+    reg_model, clf_model = _load_model(reg_path), _load_model(clf_path)
+
+    features = open_features(data_path)
+    X_old = pd.DataFrame(features.matrix, columns=features.feature_names, copy=False)
+    y_old_reg, y_old_cls = features.overall_rating.astype(np.float64), features.future_class
+    X_new, y_new_reg, y_new_cls = prepare_labelled(new_df)
+    if len(X_new) == 0:
+        raise ValueError("The new data has no complete labelled row.")
+
+    (X_reg_train, y_reg_train, X_reg_hold, y_reg_hold), (X_cls_train, y_cls_train, X_cls_hold, y_cls_hold) = \
+        split_base(X_old, y_old_reg, y_old_cls)
+    X_new_train, y_new_train_reg, y_new_train_cls, X_new_hold, y_new_hold_reg, y_new_hold_cls = \
+        split_new(X_new, y_new_reg, y_new_cls)
+
+    # Holdout of each model: its old test split + the new holdout rows
+    X_reg_hold = pd.concat([X_reg_hold, X_new_hold], ignore_index=True)
+    y_reg_hold = np.concatenate([y_reg_hold, y_new_hold_reg])
+    X_cls_hold = pd.concat([X_cls_hold, X_new_hold], ignore_index=True)
+    y_cls_hold = np.concatenate([y_cls_hold, y_new_hold_cls])
+
+    strategy, reason = choose_strategy(reg_model, clf_model, len(X_old), len(X_new), np.unique(y_new_cls))
+    if force is not None:
+        if force == "continue" and (reg_model is None or clf_model is None):
+            raise ValueError("Cannot continue training: no saved model in " + models_dir)
+        strategy, reason = force, "forced"
+
+    start = time.perf_counter()
+    if strategy == "continue":
+        # New rows + the same number of old rows, so the extra trees do not forget the old data
+        X_replay_reg, y_replay_reg = replay_sample(X_reg_train, y_reg_train, len(X_new_train))
+        X_replay_cls, y_replay_cls = replay_sample(X_cls_train, y_cls_train, len(X_new_train))
+        X_reg_train = pd.concat([X_new_train, X_replay_reg], ignore_index=True)
+        y_reg_train = np.concatenate([y_new_train_reg, y_replay_reg])
+        X_cls_train = pd.concat([X_new_train, X_replay_cls], ignore_index=True)
+        y_cls_train = np.concatenate([y_new_train_cls, y_replay_cls])
+        reg_candidate, clf_candidate = continue_training(
+            reg_model, clf_model, X_reg_train, y_reg_train, X_cls_train, y_cls_train, rounds=rounds)
+    else:
+        # All the old rows outside each model's holdout (the ml_analysis training sets) + the new rows
+        X_reg_train = pd.concat([X_reg_train, X_new_train], ignore_index=True)
+        y_reg_train = np.concatenate([y_reg_train, y_new_train_reg])
+        X_cls_train = pd.concat([X_cls_train, X_new_train], ignore_index=True)
+        y_cls_train = np.concatenate([y_cls_train, y_new_train_cls])
+        reg_candidate, clf_candidate = retrain(X_reg_train, y_reg_train, X_cls_train, y_cls_train)
+    train_time = time.perf_counter() - start
+
+    current = None
+    if reg_model is not None and clf_model is not None:
+        current = evaluate(reg_model, clf_model, X_reg_hold, y_reg_hold, X_cls_hold, y_cls_hold)
+    candidate = evaluate(reg_candidate, clf_candidate, X_reg_hold, y_reg_hold, X_cls_hold, y_cls_hold)
+    accepted = passes_gate(current, candidate)
+
+    version = None
+    if accepted and not dry_run:
+        os.makedirs(models_dir, exist_ok=True)
+        save_model_atomic(reg_candidate, reg_path)
+        save_model_atomic(clf_candidate, clf_path)
+        version = publish(reg_candidate, clf_candidate, registry_dir=os.path.join(models_dir, "registry"),
+                          metrics={"rmse": candidate["rmse"], "accuracy": candidate["accuracy"]},
+                          source=f"incremental_training.py ({strategy})")
+
+    return {
+        "strategy": strategy,
+        "reason": reason,
+        "n_new": len(X_new),
+        "n_train": (len(X_reg_train), len(X_cls_train)),
+        "n_holdout": (len(X_reg_hold), len(X_cls_hold)),
+        "boosted_rounds": reg_candidate.get_booster().num_boosted_rounds(),
+        "train_time": train_time,
+        "current": current,
+        "candidate": candidate,
+        "accepted": accepted,
+        "saved": accepted and not dry_run,
+        "version": version,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Update the saved models with newly labelled players")
+    parser.add_argument("new_data", help="CSV of new players with overall_rating and potential")
+    parser.add_argument("--force", choices=["continue", "retrain"], help="Skip the retrain-or-continue policy")
+    parser.add_argument("--rounds", type=int, default=CONTINUE_ROUNDS, help="Trees added when continuing")
+    parser.add_argument("--dry-run", action="store_true", help="Evaluate the candidate without saving it")
+    args = parser.parse_args(argv)
+
+    report = update_models(pd.read_csv(args.new_data), force=args.force, dry_run=args.dry_run,
+                           rounds=args.rounds)
+
+    print(f"Strategy: {report['strategy']} ({report['reason']})")
+    print(f"New labelled rows: {report['n_new']} | training rows (regressor / classifier): "
+          f"{report['n_train'][0]} / {report['n_train'][1]} | holdout rows: "
+          f"{report['n_holdout'][0]} / {report['n_holdout'][1]}")
+    print(f"Training time: {report['train_time']:.2f} s | booster trees: {report['boosted_rounds']}")
+    if report["current"] is not None:
+        print(f"Current models   : RMSE {report['current']['rmse']:.3f} | accuracy {report['current']['accuracy']:.3f}")
+    print(f"Candidate models : RMSE {report['candidate']['rmse']:.3f} | accuracy {report['candidate']['accuracy']:.3f}")
+
+    if not report["accepted"]:
+        print("❌ Candidate rejected by the holdout gate, the saved models are unchanged.")
+    elif report["saved"]:
+        print(f"✅ Models replaced in: {MODELS_DIR} (registry version {report['version']})")
+    else:
+        print("✅ Candidate accepted (dry run, nothing saved).")
+
+
+if __name__ == "__main__":
+    main()
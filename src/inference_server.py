@@ -0,0 +1,396 @@
+# src/inference_server.py
+
+"""
+Local HTTP inference service for the two models (standard library only: asyncio).
+
+    python src/inference_server.py --port 8765
+
+Endpoints (JSON in, JSON out):
+- POST /predict               rating + future class + probabilities
+- POST /predict/rating        predicted overall rating only
+- POST /predict/future_class  future class + probabilities only
+  body: one player {"age": 20, "height_cm": 175, ...} or a list of players
+- GET  /metrics               queue depth, batch sizes, latency histograms
+- GET  /health
+
+Micro-batching: every request puts its players in a queue. A single batching task
+takes what is waiting, keeps collecting for at most `max_wait_ms` (or until
+`max_batch_size` players), and scores the whole batch with one vectorized call
+(FastPredictor.predict_batch). Under load, concurrent requests share one model call
+instead of paying one call each; an isolated request waits at most max_wait_ms.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from model_registry import load_serving_predictor
+from config import MODELS_DIR
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+MAX_BATCH_SIZE = 256         # players per model call
+MAX_WAIT_MS = 2.0            # time a batch waits for more requests
+MAX_BODY_BYTES = 1_000_000
+
+# Upper bounds of the latency histogram buckets, in milliseconds (+ overflow bucket)
+LATENCY_BUCKETS_MS = (0.25, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+# Upper bounds of the batch size histogram buckets
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class Histogram:
+    """Fixed-bucket histogram (count per bucket, sum, max) with approximate percentiles"""
+
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        i = 0
+        while i < len(self.bounds) and value > self.bounds[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, q):
+        """Upper bound of the bucket containing the q-th percentile"""
+        if self.count == 0:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for bound, count in zip(self.bounds + (self.max,), self.counts):
+            seen += count
+            if seen >= rank:
+                return float(bound)
+        return float(self.max)
+
+    def to_dict(self):
+        labels = [f"<={b}" for b in self.bounds] + [f">{self.bounds[-1]}"]
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "max": self.max,
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class MicroBatcher:
+    """
+    Coalesces the players of concurrent requests into vectorized model calls.
+
+        batcher = MicroBatcher(predictor)
+        await batcher.start()
+        ratings, probabilities = await batcher.submit(rows)   # rows: n x 10 array
+    """
+
+    def __init__(self, predictor, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        self.predictor = predictor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = None
+        self._task = None
+        # Model calls run in one background thread so the event loop keeps reading requests
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="predict")
+
+        self.queued_players = 0
+        self.max_queued_players = 0
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.predict_latency = Histogram(LATENCY_BUCKETS_MS)
+        self.queue_wait = Histogram(LATENCY_BUCKETS_MS)
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=True)
+
+    async def submit(self, rows):
+        """Score an (n x 10) array; resolves when its batch has been predicted"""
+        future = asyncio.get_running_loop().create_future()
+        self.queued_players += len(rows)
+        self.max_queued_players = max(self.max_queued_players, self.queued_players)
+        self._queue.put_nowait((rows, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self):
+        """First waiting request, then everything arriving within max_wait (up to max_batch_size)"""
+        batch = [await self._queue.get()]
+        size = len(batch[0][0])
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while size < self.max_batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            batch.append(item)
+            size += len(item[0])
+        return batch, size
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch, size = await self._collect()
+            self.queued_players -= size
+            start = time.perf_counter()
+            for _, _, queued_at in batch:
+                self.queue_wait.observe((start - queued_at) * 1000)
+
+            rows = batch[0][0] if len(batch) == 1 else np.concatenate([item[0] for item in batch])
+            try:
+                ratings, probabilities = await loop.run_in_executor(
+                    self._executor, self.predictor.predict_batch, rows)
+            except Exception as exc:  # the error goes back to every request of the batch
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            self.predict_latency.observe((time.perf_counter() - start) * 1000)
+            self.batch_sizes.observe(size)
+
+            offset = 0
+            for item_rows, future, _ in batch:
+                n = len(item_rows)
+                if not future.done():
+                    future.set_result((ratings[offset:offset + n], probabilities[offset:offset + n]))
+                offset += n
+
+
+class InferenceServer:
+    """Minimal HTTP/1.1 server (keep-alive, JSON bodies) in front of a MicroBatcher"""
+
+    def __init__(self, predictor, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        self.predictor = predictor
+        self.batcher = MicroBatcher(predictor, max_batch_size, max_wait_ms)
+        self.request_latency = Histogram(LATENCY_BUCKETS_MS)
+        self.requests = 0
+        self.errors = 0
+        self.started_at = time.time()
+        self._server = None
+        self._connections = set()
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        await self.batcher.start()
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            # Idle keep-alive connections are not closed by the server: their handlers see EOF
+            for writer in list(self._connections):
+                writer.close()
+            await self._server.wait_closed()
+        await self.batcher.stop()
+
+    # ---------- HTTP ----------
+
+    async def _handle_connection(self, reader, writer):
+        self._connections.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._send(writer, 400, {"error": "Malformed request line."}, keep_alive=False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                    if length < 0:
+                        raise ValueError
+                except ValueError:
+                    # The body cannot be framed: answer, then drop the connection
+                    await self._send(writer, 400, {"error": "Invalid Content-Length header."}, keep_alive=False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._send(writer, 413, {"error": "Request body too large."}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and version.upper() == "HTTP/1.1")
+                status, payload = await self._dispatch(method.upper(), path.split("?", 1)[0], body)
+                await self._send(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    @staticmethod
+    async def _send(writer, status, payload, keep_alive):
+        try:
+            # NaN / Infinity are not valid JSON: never send them to a client
+            body = json.dumps(payload, allow_nan=False).encode()
+        except ValueError:
+            status = 500
+            body = json.dumps({"error": "The response contains a non-finite number."}).encode()
+        head = (f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def _dispatch(self, method, path, body):
+        if path == "/health":
+            return 200, {"status": "ok"}
+        if path == "/metrics":
+            return 200, self.metrics()
+        if path not in ("/predict", "/predict/rating", "/predict/future_class"):
+            return 404, {"error": f"Unknown endpoint '{path}'."}
+        if method != "POST":
+            return 405, {"error": "Use POST for the predict endpoints."}
+
+        start = time.perf_counter()
+        self.requests += 1
+        try:
+            players, single = self._parse_players(body)
+            ratings, probabilities = await self.batcher.submit(players)
+        except ValueError as exc:
+            self.errors += 1
+            return 400, {"error": str(exc)}
+        except Exception as exc:
+            self.errors += 1
+            return 500, {"error": str(exc)}
+
+        if not (np.isfinite(ratings).all() and np.isfinite(probabilities).all()):
+            self.errors += 1
+            return 500, {"error": "The model returned a non-finite prediction."}
+        results = self._format(path, ratings, probabilities)
+        self.request_latency.observe((time.perf_counter() - start) * 1000)
+        return 200, results[0] if single else results
+
+    def _parse_players(self, body):
+        """JSON body -> (n x 10 array in FEATURE_COLS order, single player?)"""
+        try:
+            data = json.loads(body or b"null")
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"Invalid JSON body: {exc}.")
+        single = isinstance(data, dict)
+        players = [data] if single else data
+        if not isinstance(players, list) or not players or not all(isinstance(p, dict) for p in players):
+            raise ValueError("The body must be a player object or a non-empty list of player objects.")
+
+        rows = np.empty((len(players), len(self.predictor.feature_names)), dtype=np.float64)
+        for i, player in enumerate(players):
+            for j, name in enumerate(self.predictor.feature_names):
+                if name not in player:
+                    raise ValueError(f"Feature '{name}' is missing for player {i}.")
+                try:
+                    rows[i, j] = float(player[name])
+                except (TypeError, ValueError):
+                    raise ValueError(f"Feature '{name}' of player {i} is not a number.")
+                if not np.isfinite(rows[i, j]):
+                    # json.loads accepts NaN / Infinity, the models don't
+                    raise ValueError(f"Feature '{name}' of player {i} is not a finite number.")
+        return rows, single
+
+    def _format(self, path, ratings, probabilities):
+        classes = [str(c) for c in self.predictor.classes]
+        results = []
+        for rating, proba in zip(ratings, probabilities):
+            result = {}
+            if path != "/predict/future_class":
+                result["overall_rating"] = float(rating)
+            if path != "/predict/rating":
+                result["future_class"] = classes[int(proba.argmax())]
+                result["probabilities"] = dict(zip(classes, map(float, proba)))
+            results.append(result)
+        return results
+
+    def metrics(self):
+        batcher = self.batcher
+        return {
+            "uptime_s": time.time() - self.started_at,
+            "requests": self.requests,
+            "errors": self.errors,
+            "queue_depth": batcher.queued_players,
+            "max_queue_depth": batcher.max_queued_players,
+            "batch_size": batcher.batch_sizes.to_dict(),
+            "queue_wait_ms": batcher.queue_wait.to_dict(),
+            "predict_latency_ms": batcher.predict_latency.to_dict(),
+            "request_latency_ms": self.request_latency.to_dict(),
+        }
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, models_dir=MODELS_DIR,
+                max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+    # Models loaded once for the life of the server (active registry version, else the .pkl files)
+    predictor = load_serving_predictor(models_dir, os.path.join(models_dir, "registry"))
+    server = InferenceServer(predictor, max_batch_size, max_wait_ms)
+    await server.start(host, port)
+    print(f"Inference server listening on http://{host}:{port} "
+          f"(batches of up to {max_batch_size} players, {max_wait_ms} ms max wait)", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local HTTP inference server with micro-batching")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--models-dir", default=MODELS_DIR)
+    parser.add_argument("--max-batch-size", type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args.host, args.port, os.path.abspath(args.models_dir),
+                          args.max_batch_size, args.max_wait_ms))
+    except KeyboardInterrupt:
+        print("\nServer stopped.")
+
+
+if __name__ == "__main__":
+    main()
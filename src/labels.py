@@ -0,0 +1,86 @@
+# src/labels.py
+
+"""
+The 'future_class' label of the classifier: its classes, thresholds and the functions
+computing it from overall_rating, potential and age.
+
+Only NumPy is needed, so the feature store, the benchmarks and the other light
+scripts get the labels without importing the training stack of ml_analysis.py
+(scikit-learn, XGBoost, matplotlib), which re-exports them.
+"""
+
+import numpy as np
+
+
+# Possible values of the 'future_class' label, from best to worst trajectory
+FUTURE_CLASSES = ["high_growth", "likely_improve", "stable", "decline"]
+
+# Default thresholds of the 'future_class' label (gap = potential - overall_rating)
+HIGH_GROWTH_GAP = 10   # minimum gap for "high_growth"...
+YOUNG_MAX_AGE = 23     # ...only for players up to this age
+IMPROVE_GAP = 4        # minimum gap for "likely_improve"
+STABLE_GAP = -2        # minimum gap for "stable", below is "decline"
+
+
+def build_future_label(row, high_growth_gap=HIGH_GROWTH_GAP, improve_gap=IMPROVE_GAP,
+                       stable_gap=STABLE_GAP, young_max_age=YOUNG_MAX_AGE):
+    """
+    Creates a 'future_class' label based on the difference between potential and overall rating,
+    while also considering age.
+
+    Logic:
+    - Young players (≤ 23) with large potential jump (≥ 10) are considered "high growth".
+    - Decent potential improvement (≥ 4) becomes "likely_improve".
+    - Small difference (≥ -2) is considered "stable".
+    - Negative progression suggests "decline".
+
+    This classification helps predict a career trajectory rather than a numeric value.
+    Works on one row; use build_future_labels() to label a whole DataFrame.
+    """
+    overall = row["overall_rating"]
+    potential = row["potential"]
+    age = row["age"]
+
+    gap = potential - overall  # Improvement margin
+
+    if gap >= high_growth_gap and age <= young_max_age:
+        return "high_growth"
+    elif gap >= improve_gap:
+        return "likely_improve"
+    elif gap >= stable_gap:
+        return "stable"
+    else:
+        return "decline"
+
+
+def build_future_labels(df, high_growth_gap=HIGH_GROWTH_GAP, improve_gap=IMPROVE_GAP,
+                        stable_gap=STABLE_GAP, young_max_age=YOUNG_MAX_AGE):
+    """
+    Vectorized version of build_future_label: labels every row of `df` at once.
+
+    The conditions are evaluated on whole columns with np.select (first matching
+    condition wins, like the if/elif chain), so there is no Python call per row.
+    The result is identical to df.apply(build_future_label, axis=1), including
+    rows with missing values, which end up as "decline" in both versions.
+
+    Returns a NumPy array of labels (dtype object) aligned with `df`.
+    """
+    overall = df["overall_rating"].to_numpy()
+    potential = df["potential"].to_numpy()
+    age = df["age"].to_numpy()
+
+    # At least int16, so small integer dtypes (int8 ratings) cannot overflow
+    gap_dtype = np.promote_types(np.result_type(potential, overall), np.int16)
+    gap = np.subtract(potential, overall, dtype=gap_dtype)
+
+    class_codes = np.select(
+        [
+            (gap >= high_growth_gap) & (age <= young_max_age),
+            gap >= improve_gap,
+            gap >= stable_gap,
+        ],
+        [0, 1, 2],
+        default=3,
+    ).astype(np.int8)
+
+    return np.array(FUTURE_CLASSES, dtype=object)[class_codes]
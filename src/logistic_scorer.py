@@ -0,0 +1,115 @@
+# src/logistic_scorer.py
+
+"""
+NumPy-only scorer for the future_class logistic regression.
+
+A fitted LogisticRegression is just a coefficient matrix, an intercept vector and the
+class labels: scoring is one matrix product + softmax. sklearn's predict_proba adds
+input validation, feature-name checks and DataFrame conversions on every call, which
+dominates the cost for one row and is still noticeable on big batches.
+
+LogisticScorer copies coef_ / intercept_ / classes_ out of the fitted model into
+contiguous float64 arrays and scores with NumPy alone:
+
+    scorer = LogisticScorer.from_model(clf_model)
+    proba = scorer.predict_proba(X)        # X: (n, 10) or one row of 10 features
+    labels = scorer.predict(X)
+
+The probabilities are the same as clf_model.predict_proba(X) up to float rounding.
+"""
+
+import numpy as np
+
+
+def classifier_mode(clf_model):
+    """How the logistic regression turns scores into probabilities: multinomial / ovr / binary"""
+    if clf_model.coef_.shape[0] == 1:
+        return "binary"
+    if getattr(clf_model, "multi_class", "auto") == "ovr":
+        return "ovr"
+    return "multinomial"
+
+
+class LogisticScorer:
+    """
+    Compiled logistic regression (features x classes coefficients + intercept).
+
+    mode:
+    - "multinomial" -> softmax of the scores (sklearn's default with lbfgs),
+    - "ovr"         -> one sigmoid per class, normalized to sum to 1,
+    - "binary"      -> one score column, probabilities [1 - p, p].
+    """
+
+    def __init__(self, coef, intercept, classes, mode="multinomial"):
+        self.coef = np.ascontiguousarray(coef, dtype=np.float64)
+        self.intercept = np.ascontiguousarray(intercept, dtype=np.float64).reshape(-1)
+        self.classes = np.asarray(classes)
+        self.mode = mode
+        if self.coef.shape[1] != self.intercept.shape[0]:
+            raise ValueError(f"coef has {self.coef.shape[1]} score columns but intercept has "
+                             f"{self.intercept.shape[0]} values.")
+        expected_columns = 1 if mode == "binary" else len(self.classes)
+        if self.coef.shape[1] != expected_columns:
+            raise ValueError(f"A {mode} model over {len(self.classes)} classes needs {expected_columns} "
+                             f"score columns, got {self.coef.shape[1]}.")
+        self.n_features = self.coef.shape[0]
+
+    @classmethod
+    def from_model(cls, clf_model):
+        """Scorer built from a fitted sklearn LogisticRegression"""
+        return cls(clf_model.coef_.T, clf_model.intercept_, clf_model.classes_, classifier_mode(clf_model))
+
+    def _as_rows(self, X):
+        rows = np.asarray(X, dtype=np.float64)
+        if rows.ndim == 1:
+            rows = rows.reshape(1, -1)
+        if rows.ndim != 2 or rows.shape[1] != self.n_features:
+            raise ValueError(f"Expected rows of {self.n_features} features, got an array of shape {rows.shape}.")
+        return np.ascontiguousarray(rows)
+
+    def _scores_to_proba(self, scores):
+        """Turn the raw scores into probabilities, in place when possible"""
+        if self.mode == "multinomial":
+            # Softmax, shifted by the row max for numerical stability
+            scores -= scores.max(axis=1, keepdims=True)
+            np.exp(scores, out=scores)
+            scores /= scores.sum(axis=1, keepdims=True)
+            return scores
+        # Sigmoid
+        np.negative(scores, out=scores)
+        np.exp(scores, out=scores)
+        scores += 1.0
+        np.reciprocal(scores, out=scores)
+        if self.mode == "binary":
+            return np.hstack([1.0 - scores, scores])
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
+
+    def predict_proba(self, X):
+        """
+        Class probabilities (columns in the order of self.classes).
+
+        X is one row (1-D, returns 1-D) or a batch (2-D, returns n x classes).
+        """
+        single = np.ndim(X) == 1
+        # No shared buffer: the scorer can be used from several threads at once
+        scores = self._as_rows(X) @ self.coef
+        scores += self.intercept
+        proba = self._scores_to_proba(scores)
+        return proba[0] if single else proba
+
+    def predict(self, X):
+        """
+        Most probable class of each row, like sklearn's predict().
+
+        The softmax / sigmoid never changes which score is the largest, so the raw
+        scores are enough (no exp needed).
+        """
+        single = np.ndim(X) == 1
+        scores = self._as_rows(X) @ self.coef
+        scores += self.intercept
+        if self.mode == "binary":
+            labels = self.classes[(scores[:, 0] > 0).astype(np.intp)]
+        else:
+            labels = self.classes[scores.argmax(axis=1)]
+        return labels[0] if single else labels
@@ -21,99 +21,75 @@ from sklearn.linear_model import LogisticRegression
 # mean_squared_error : metric to evaluate regression model accuracy (how far predictions are from real values)
 # r2_score : metric indicating proportion of explained variance (quality of regression predictions)
 # classification_report : generates precision/recall/F1 for classification tasks
-from sklearn.metrics import mean_squared_error, r2_score, classification_report
+# accuracy_score : share of correct class predictions (stored with the models in the registry)
+from sklearn.metrics import mean_squared_error, r2_score, classification_report, accuracy_score
 
 # xgboost : powerful library for gradient boosting, used here for regression (predicting overall rating)
 import xgboost as xgb
 
+# open_features : cleaned feature matrix / targets, precomputed and memory-mapped (feature store)
+from feature_store import open_features
 
-# ---------- Clean relative paths ----------
+# publish : saves the trained models as a new version of the model registry
+from model_registry import publish
 
-# Determine the base directory of the project dynamically.
-# This ensures the script works even if run from different working directories.
-SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+# future_class label: classes, thresholds and labeling functions (lightweight module, re-exported here)
+from labels import (FUTURE_CLASSES, HIGH_GROWTH_GAP, YOUNG_MAX_AGE, IMPROVE_GAP, STABLE_GAP,
+                    build_future_label, build_future_labels)
 
-# Path to the CSV file containing FIFA player data
-DATA_PATH = os.path.join(PROJECT_ROOT, "data", "fifa_players.csv")
 
+# ---------- Clean relative paths ----------
 
-def build_future_label(row):
-    """
-    Creates a 'future_class' label based on the difference between potential and overall rating,
-    while also considering age.
+# Project paths and the feature list live in config.py (cheap to import for the app)
+from config import SCRIPT_DIR, PROJECT_ROOT, DATA_PATH, MODELS_DIR, FEATURE_COLS
 
-    Logic:
-    - Young players (≤ 23) with large potential jump (≥ 10) are considered "high growth".
-    - Decent potential improvement (≥ 4) becomes "likely_improve".
-    - Small difference (≥ -2) is considered "stable".
-    - Negative progression suggests "decline".
 
-    This classification helps predict a career trajectory rather than a numeric value.
+def build_regressor(**params):
     """
-    overall = row["overall_rating"]
-    potential = row["potential"]
-    age = row["age"]
+    XGBoost regressor predicting the overall rating (same settings for every training path).
+
+    `params` overrides the default hyperparameters (e.g. the ones found by tuning.py).
+    """
+    settings = dict(
+        n_estimators=100,        # Number of trees
+        learning_rate=0.1,       # Step size shrinkage
+        max_depth=5,             # Controls tree complexity
+        random_state=42          # Reproducibility
+    )
+    settings.update(params)
+    return xgb.XGBRegressor(**settings)
 
-    gap = potential - overall  # Improvement margin
 
-    if gap >= 10 and age <= 23:
-        return "high_growth"
-    elif gap >= 4:
-        return "likely_improve"
-    elif gap >= -2:
-        return "stable"
-    else:
-        return "decline"
+def build_classifier(**params):
+    """Multinomial logistic regression predicting the future class (`params` overrides the defaults)"""
+    settings = dict(
+        max_iter=1000,            # Increase iterations to ensure convergence
+        multi_class="multinomial" # Enables softmax classification
+    )
+    settings.update(params)
+    return LogisticRegression(**settings)
 
 
 def main():
-    # 1) Load dataset
+    # 1) Load the training matrices: the feature store keeps the cleaned features and
+    # targets of each CSV version (rows with a missing feature / target removed)
     print(f"Loading data from: {DATA_PATH}")
-    df = pd.read_csv(DATA_PATH)
+    features = open_features(DATA_PATH)
+    print(f"Feature set: {features.version}")
+
+    # Selected technical and physical attributes used as predictors
+    feature_cols = features.feature_names
 
     # Show first rows to validate structure
     print("=== Data preview ===")
-    print(df.head(), "\n")
-
-    # Show column types, non-null counts, memory usage, etc.
-    print("=== Column info ===")
-    print(df.info(), "\n")
+    print(features.frame().head(), "\n")
 
-    # Define target columns and feature list
-    target_overall = "overall_rating"
-    target_potential = "potential"
-    col_age = "age"
-
-    # Selected technical and physical attributes used as predictors
-    # These features are numerical and suitable for ML models.
-    feature_cols = [
-        "age",
-        "height_cm",
-        "weight_kgs",
-        "finishing",
-        "dribbling",
-        "short_passing",
-        "acceleration",
-        "sprint_speed",
-        "stamina",
-        "strength",
-    ]
-
-    # Ensure all required columns exist in the dataset
-    for c in feature_cols + [target_overall, target_potential, col_age]:
-        if c not in df.columns:
-            raise ValueError(f"Column '{c}' was not found in the CSV.")
-
-    # Remove rows containing missing values in essential columns
-    df_clean = df.dropna(subset=feature_cols + [target_overall, target_potential, col_age])
-
-    print(f"\nNumber of players after cleaning: {len(df_clean)}")
+    print(f"\nNumber of players after cleaning: {len(features)}")
 
     # 3) REGRESSION MODEL — predicting overall rating
     # Extract features and labels
-    X = df_clean[feature_cols]
-    y = df_clean[target_overall]
+    X = features.frame()
+    y = features.target("overall_rating")
 
     # Split the dataset into train and test sets
     # test_size=0.3 → 30% of data for evaluation
@@ -123,12 +99,7 @@ def main():
 
     # XGBoost is chosen because it handles nonlinear relationships
     # and typically gives superior performance compared to linear models.
-    reg_model = xgb.XGBRegressor(
-        n_estimators=100,        # Number of trees
-        learning_rate=0.1,       # Step size shrinkage
-        max_depth=5,             # Controls tree complexity
-        random_state=42          # Reproducibility
-    )
+    reg_model = build_regressor()
     reg_model.fit(X_train, y_train)
 
     # Predict overall ratings for the test set
@@ -174,14 +145,13 @@ def main():
     print(f"Plot 'reg_true_vs_pred.png' saved in: {out_path_plot}")
 
     # 4) CLASSIFICATION — predicting future class
-    df_clean["future_class"] = df_clean.apply(build_future_label, axis=1)
+    y_cls = features.target("future_class")
 
     print("\nFuture class distribution:")
-    print(df_clean["future_class"].value_counts(), "\n")
+    print(y_cls.value_counts(), "\n")
 
-    # Features and labels for the classification model
-    X_cls = df_clean[feature_cols]
-    y_cls = df_clean["future_class"]
+    # Features and labels for the classification model (labels built by build_future_labels)
+    X_cls = X
 
     # stratify=y_cls ensures all classes are represented proportionally
     Xc_train, Xc_test, yc_train, yc_test = train_test_split(
@@ -189,10 +159,7 @@ def main():
     )
 
     # Multinomial logistic regression → handles multi-class classification
-    clf = LogisticRegression(
-        max_iter=1000,            # Increase iterations to ensure convergence
-        multi_class="multinomial" # Enables softmax classification
-    )
+    clf = build_classifier()
     clf.fit(Xc_train, yc_train)
 
     yc_pred = clf.predict(Xc_test)
@@ -236,7 +203,7 @@ def main():
         print(f"  {cls:15s} -> {proba:.3f}")
 
     # Create output directory for models if needed
-    models_dir = os.path.join(PROJECT_ROOT, 'models')
+    models_dir = MODELS_DIR
     os.makedirs(models_dir, exist_ok=True)
     
     # Save trained models for later use
@@ -244,6 +211,14 @@ def main():
     joblib.dump(clf, os.path.join(models_dir, 'classification_model.pkl'))
     print("Models saved!")
 
+    # Also publish them as a new version of the model registry (used by the app)
+    version = publish(reg_model, clf, metrics={
+        "mse": float(mse),
+        "r2": float(r2),
+        "accuracy": float(accuracy_score(yc_test, yc_pred)),
+    }, source="ml_analysis.py")
+    print(f"Models published in the registry as version {version}")
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,292 @@
+# src/model_registry.py
+
+"""
+Versioned model registry (models/registry/), a safer and faster format than the .pkl files.
+
+Layout:
+
+    models/registry/
+        ACTIVE                      name of the version used by the app / server
+        v0001/
+            manifest.json           feature order, classes, metrics, file hashes
+            regressor.ubj           XGBoost booster in its native binary format (UBJSON)
+            classifier_coef.npy     logistic regression coefficients (features x classes)
+            classifier_intercept.npy
+
+Loading a version needs neither pickle nor scikit-learn: the booster is read by
+XGBoost, the coefficients with np.load(mmap_mode="r", allow_pickle=False), and every
+file is checked against the SHA-256 stored in the manifest. Versions are immutable
+(written in a temporary directory, then renamed); switching version only rewrites
+ACTIVE, and the application picks the change up on its next rerun. Publishing models
+identical to an existing version (same content hash) reuses that version.
+
+    python src/model_registry.py import-pickles     # current .pkl files -> new version
+    python src/model_registry.py list
+    python src/model_registry.py activate v0001
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+from config import FEATURE_COLS, MODELS_DIR
+from fast_predictor import FastPredictor
+from logistic_scorer import classifier_mode
+
+
+REGISTRY_DIR = os.path.join(MODELS_DIR, "registry")
+ACTIVE_FILE = "ACTIVE"
+MANIFEST_FILE = "manifest.json"
+FORMAT_VERSION = 1
+
+REGRESSOR_FILE = "regressor.ubj"
+COEF_FILE = "classifier_coef.npy"
+INTERCEPT_FILE = "classifier_intercept.npy"
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _content_hash(file_hashes):
+    """Hash of a version: hash of its (file name, file hash) pairs"""
+    digest = hashlib.sha256()
+    for name in sorted(file_hashes):
+        digest.update(f"{name}:{file_hashes[name]};".encode())
+    return digest.hexdigest()
+
+
+def _write_text_atomic(path, text):
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+# ---------- Versions ----------
+
+def list_versions(registry_dir=REGISTRY_DIR):
+    """Published versions, oldest first"""
+    if not os.path.isdir(registry_dir):
+        return []
+    return sorted(name for name in os.listdir(registry_dir)
+                  if name.startswith("v") and os.path.isfile(os.path.join(registry_dir, name, MANIFEST_FILE)))
+
+
+def active_version(registry_dir=REGISTRY_DIR):
+    """Version named in ACTIVE (None if the registry is empty)"""
+    try:
+        with open(os.path.join(registry_dir, ACTIVE_FILE), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def set_active(version, registry_dir=REGISTRY_DIR):
+    """Make `version` the one loaded by the application and the inference server"""
+    if version not in list_versions(registry_dir):
+        raise ValueError(f"Model version '{version}' was not found in {registry_dir}.")
+    _write_text_atomic(os.path.join(registry_dir, ACTIVE_FILE), version + "\n")
+
+
+def read_manifest(version, registry_dir=REGISTRY_DIR):
+    with open(os.path.join(registry_dir, version, MANIFEST_FILE), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def find_version(content_hash, registry_dir=REGISTRY_DIR):
+    """Published version with this content hash (None if there is none)"""
+    for version in list_versions(registry_dir):
+        if read_manifest(version, registry_dir)["content_hash"] == content_hash:
+            return version
+    return None
+
+
+def registry_fingerprint(registry_dir=REGISTRY_DIR):
+    """
+    Identifier of the active version ("<version>:<content hash>"), None without registry.
+
+    Cheap (two small file reads), so the app can check it on every rerun.
+    """
+    version = active_version(registry_dir)
+    if version is None:
+        return None
+    return f"{version}:{read_manifest(version, registry_dir)['content_hash'][:16]}"
+
+
+def publish(reg_model, clf_model, registry_dir=REGISTRY_DIR, metrics=None, source=None, activate=True):
+    """
+    Save a pair of trained models as a new registry version.
+
+    Models whose files are byte-identical to an already published version are not
+    stored again: that version is returned (and activated if needed) instead.
+
+    Returns the version name (v0001, v0002, ...).
+    """
+    import sklearn
+    import xgboost as xgb
+
+    os.makedirs(registry_dir, exist_ok=True)
+    tmp_dir = os.path.join(registry_dir, f".tmp-{os.getpid()}-{time.time_ns()}")
+    os.makedirs(tmp_dir)
+    try:
+        booster = reg_model.get_booster()
+        booster.save_model(os.path.join(tmp_dir, REGRESSOR_FILE))
+        try:
+            iteration_range = [0, booster.best_iteration + 1]
+        except AttributeError:
+            iteration_range = [0, 0]
+        np.save(os.path.join(tmp_dir, COEF_FILE), np.ascontiguousarray(clf_model.coef_.T, dtype=np.float64))
+        np.save(os.path.join(tmp_dir, INTERCEPT_FILE), np.asarray(clf_model.intercept_, dtype=np.float64))
+
+        file_hashes = {name: _file_sha256(os.path.join(tmp_dir, name))
+                       for name in (REGRESSOR_FILE, COEF_FILE, INTERCEPT_FILE)}
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "source": source,
+            "feature_names": list(booster.feature_names or FEATURE_COLS),
+            "regressor": {
+                "file": REGRESSOR_FILE,
+                "iteration_range": iteration_range,
+                "num_boosted_rounds": booster.num_boosted_rounds(),
+                "xgboost_version": xgb.__version__,
+            },
+            "classifier": {
+                "coef_file": COEF_FILE,
+                "intercept_file": INTERCEPT_FILE,
+                "classes": [str(c) for c in clf_model.classes_],
+                "mode": classifier_mode(clf_model),
+                "sklearn_version": sklearn.__version__,
+            },
+            "metrics": metrics or {},
+            "files": file_hashes,
+            "content_hash": _content_hash(file_hashes),
+        }
+
+        # Claim the next version name: renaming onto an existing version fails
+        while True:
+            # Checked again on every attempt: a concurrent publish may have stored the same models
+            version = find_version(manifest["content_hash"], registry_dir)
+            if version is not None:
+                shutil.rmtree(tmp_dir)
+                break
+            existing = list_versions(registry_dir)
+            version = f"v{int(existing[-1][1:]) + 1 if existing else 1:04d}"
+            manifest["version"] = version
+            with open(os.path.join(tmp_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2)
+            try:
+                os.rename(tmp_dir, os.path.join(registry_dir, version))
+                break
+            except OSError:
+                if not os.path.exists(os.path.join(registry_dir, version)):
+                    raise
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    if activate and active_version(registry_dir) != version:
+        set_active(version, registry_dir)
+    return version
+
+
+# ---------- Loading ----------
+
+def load_predictor(version=None, registry_dir=REGISTRY_DIR, verify=True):
+    """
+    FastPredictor for a registry version (the active one by default).
+
+    verify=True checks every file against the hashes of the manifest first.
+    """
+    import xgboost as xgb
+
+    version = version or active_version(registry_dir)
+    if version is None:
+        raise FileNotFoundError(f"No active model version in {registry_dir}.")
+    version_dir = os.path.join(registry_dir, version)
+    manifest = read_manifest(version, registry_dir)
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported model format {manifest.get('format_version')} for version '{version}'.")
+
+    if verify:
+        for name, expected in manifest["files"].items():
+            if _file_sha256(os.path.join(version_dir, name)) != expected:
+                raise ValueError(f"File '{name}' of model version '{version}' does not match its manifest hash.")
+
+    regressor, classifier = manifest["regressor"], manifest["classifier"]
+    booster = xgb.Booster()
+    booster.load_model(os.path.join(version_dir, regressor["file"]))
+    coef = np.load(os.path.join(version_dir, classifier["coef_file"]), mmap_mode="r", allow_pickle=False)
+    intercept = np.load(os.path.join(version_dir, classifier["intercept_file"]), mmap_mode="r", allow_pickle=False)
+
+    if coef.shape != (len(manifest["feature_names"]), len(classifier["classes"])):
+        raise ValueError(f"Coefficients of model version '{version}' have shape {coef.shape}, "
+                         f"expected {len(manifest['feature_names'])} features x {len(classifier['classes'])} classes.")
+
+    predictor = FastPredictor.from_arrays(booster, coef, intercept, classifier["classes"], classifier["mode"],
+                                          manifest["feature_names"], regressor["iteration_range"])
+    predictor.version = version
+    return predictor
+
+
+def load_serving_predictor(models_dir=MODELS_DIR, registry_dir=REGISTRY_DIR):
+    """Active registry version if there is one, otherwise the .pkl files of models_dir"""
+    if active_version(registry_dir) is not None:
+        return load_predictor(registry_dir=registry_dir)
+    return FastPredictor(models_dir)
+
+
+# ---------- CLI ----------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Versioned model registry")
+    parser.add_argument("--registry", default=REGISTRY_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_cmd = commands.add_parser("import-pickles", help="Publish the current .pkl models as a new version")
+    import_cmd.add_argument("--models-dir", default=MODELS_DIR)
+    import_cmd.add_argument("--no-activate", action="store_true")
+    commands.add_parser("list", help="List the versions")
+    activate_cmd = commands.add_parser("activate", help="Switch the active version")
+    activate_cmd.add_argument("version")
+    args = parser.parse_args(argv)
+
+    if args.command == "import-pickles":
+        import joblib
+        reg_model = joblib.load(os.path.join(args.models_dir, "regression_model.pkl"))
+        clf_model = joblib.load(os.path.join(args.models_dir, "classification_model.pkl"))
+        version = publish(reg_model, clf_model, args.registry, source="import of the .pkl files",
+                          activate=not args.no_activate)
+        print(f"✅ Published {version}" + ("" if args.no_activate else " (active)"))
+    elif args.command == "list":
+        active = active_version(args.registry)
+        versions = list_versions(args.registry)
+        if not versions:
+            print("No model version yet.")
+        for version in versions:
+            manifest = read_manifest(version, args.registry)
+            metrics = ", ".join(f"{k}={v:.4g}" for k, v in manifest["metrics"].items())
+            print(f"{'*' if version == active else ' '} {version}  {manifest['created_at']}  "
+                  f"{manifest['content_hash'][:12]}  {metrics or manifest['source'] or ''}")
+    elif args.command == "activate":
+        try:
+            set_active(args.version, args.registry)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print(f"✅ Active model version: {args.version}")
+
+
+if __name__ == "__main__":
+    main()
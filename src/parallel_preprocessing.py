@@ -0,0 +1,284 @@
+# src/parallel_preprocessing.py
+
+"""
+Multi-core version of the chunked preprocessing of preprocessing.py.
+
+The CSV is split in line-aligned byte ranges (data_loader.byte_ranges) that worker
+processes read on their own:
+
+- pass 1: each worker computes the partial statistics of its ranges
+  (preprocessing.partial_stats), merged by the parent into the global medians,
+  means, positions and dtypes, plus the number of rows of every range;
+- pass 2: the parent allocates a shared memory block per range (one array per
+  model matrix column, the dtypes being known from pass 1) and each worker cleans
+  and encodes its range straight into it. Only the block name goes through the
+  pipe to the worker, and only a row count comes back: the matrix is never pickled.
+
+    X, y = parallel_model_matrix("players.csv", workers=8)
+    for X, y in iter_parallel_model_matrix("players.csv", workers=8): # one range at a time, in file order
+        ...
+
+    python src/parallel_preprocessing.py data/synthetic_10m.csv data/synthetic_10m_matrix.parquet --workers 8
+    python src/parallel_preprocessing.py --compare       # real data: same matrix as data_analysis.py
+
+The result is the one of preprocessing.iter_model_matrix (column means summed in
+another order can differ in their last bit). At most 2 x workers blocks are in
+flight, so memory depends on the range size, not on the file size.
+"""
+
+import argparse
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from config import DATA_PATH
+from data_loader import FIFA_SCHEMA, byte_ranges, iter_players_csv, write_chunks
+from position_encoder import POSITION_VOCAB_PATH, PositionEncoder
+from preprocessing import (DEFAULT_CHUNK_SIZE, build_model_matrix, clean_players, finish_stats,
+                           merge_partial_stats, partial_stats, transform_chunk)
+
+
+# Target size of a byte range: a file is split in max(workers, size / RANGE_BYTES) ranges
+RANGE_BYTES = 64 << 20
+
+TARGET_COL = "overall_rating"
+
+# Rows parsed to find the columns / dtypes of the model matrix
+_LAYOUT_SAMPLE_ROWS = 1_000
+
+
+# ---------- Shared memory blocks ----------
+
+def _column_offsets(layout, n_rows):
+    """Byte offset of each column of a block, and the block size (8-byte aligned columns)"""
+    offsets, size = [], 0
+    for _, dtype in layout:
+        offsets.append(size)
+        size += -(-n_rows * np.dtype(dtype).itemsize // 8) * 8
+    return offsets, max(size, 1)
+
+
+def _block_arrays(shm, layout, n_rows):
+    """One array per column, backed by the shared memory block"""
+    offsets, _ = _column_offsets(layout, n_rows)
+    return [np.ndarray((n_rows,), dtype=dtype, buffer=shm.buf, offset=offset)
+            for (_, dtype), offset in zip(layout, offsets)]
+
+
+def _create_block(layout, n_rows):
+    _, size = _column_offsets(layout, n_rows)
+    return shared_memory.SharedMemory(create=True, size=size)
+
+
+def _release_block(shm):
+    shm.close()
+    shm.unlink()
+
+
+# ---------- Worker side ----------
+
+def _stats_range(path, start, stop, chunk_size, schema, sketch):
+    """Partial statistics of one byte range (pass 1)"""
+    return partial_stats(iter_players_csv(path, chunk_size, schema, start_byte=start, stop_byte=stop), sketch)
+
+
+def _transform_range(path, start, stop, chunk_size, schema, stats, encoder, block_name, layout, n_rows):
+    """Clean and encode one byte range into its shared memory block (pass 2), returns the row count"""
+    shm = shared_memory.SharedMemory(name=block_name)
+    try:
+        arrays = _block_arrays(shm, layout, n_rows)
+        row = 0
+        for chunk in iter_players_csv(path, chunk_size, schema, start_byte=start, stop_byte=stop):
+            X, y = transform_chunk(chunk, stats, encoder)
+            if row + len(X) > n_rows:
+                raise ValueError(f"{path} changed between the two passes (more rows in bytes {start}-{stop}).")
+            frame = X.assign(**{TARGET_COL: y})
+            if list(frame.columns) != [col for col, _ in layout]:
+                raise ValueError(f"Unexpected model matrix columns in bytes {start}-{stop} of {path}.")
+            for array, col in zip(arrays, frame.columns):
+                array[row:row + len(frame)] = frame[col].to_numpy()
+            row += len(frame)
+    finally:
+        arrays = None  # the views must be gone before the block is closed
+        shm.close()
+    return row
+
+
+# ---------- Driver side ----------
+
+def _model_matrix_layout(path, stats, encoder, schema):
+    """[(column, dtype)] of the model matrix followed by the target, from the first rows"""
+    sample = next(iter_players_csv(path, _LAYOUT_SAMPLE_ROWS, schema))
+    X, y = transform_chunk(sample, stats, encoder)
+    frame = X.assign(**{TARGET_COL: y})
+    for col, dtype in frame.dtypes.items():
+        if not isinstance(dtype, np.dtype) or dtype.kind not in "biuf":
+            raise ValueError(f"Model matrix column {col!r} is not numeric ({dtype}), it cannot be shared.")
+    return [(col, dtype.str) for col, dtype in frame.dtypes.items()]
+
+
+def _ensure_resource_tracker():
+    """
+    Start the shared memory tracker before forking the workers, so that they use the
+    parent's one: a tracker started by a worker would unlink the blocks it attached
+    to when that worker exits.
+    """
+    if os.name == "posix":
+        from multiprocessing import resource_tracker
+        resource_tracker.ensure_running()
+
+
+def iter_parallel_model_matrix(path=DATA_PATH, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, schema=FIFA_SCHEMA,
+                               encoder=None, sketch=False, range_bytes=RANGE_BYTES, timings=None):
+    """
+    Yield (X, y) for each byte range of the file, in file order, computed by `workers`
+    processes. Same arguments as preprocessing.iter_model_matrix (`sketch` like
+    fit_stats). `timings`, a dict, receives the duration of both passes.
+    """
+    workers = workers or os.cpu_count() or 1
+    n_parts = max(workers, math.ceil(os.path.getsize(path) / range_bytes))
+    ranges = byte_ranges(path, n_parts)
+    if not ranges:
+        raise ValueError(f"No rows were found in {path}.")
+
+    _ensure_resource_tracker()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        start = time.perf_counter()
+        partials = list(executor.map(_stats_range, *zip(*[(path, a, b, chunk_size, schema, sketch)
+                                                          for a, b in ranges])))
+        range_rows = [partial["n_rows"] for partial in partials]
+        merged = partials[0]
+        for partial in partials[1:]:
+            merge_partial_stats(merged, partial)
+        stats = finish_stats(merged)
+        encoder = encoder or PositionEncoder(stats["positions"])
+        layout = _model_matrix_layout(path, stats, encoder, schema)
+        if timings is not None:
+            timings["stats"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        pending = []  # (future, block, n_rows) in file order
+        next_range = 0
+        try:
+            while next_range < len(ranges) or pending:
+                # Keep every worker busy with one range ahead, the blocks of the others are freed
+                while next_range < len(ranges) and len(pending) < 2 * workers:
+                    (a, b), n_rows = ranges[next_range], range_rows[next_range]
+                    block = _create_block(layout, n_rows)
+                    try:
+                        future = executor.submit(_transform_range, path, a, b, chunk_size, schema, stats,
+                                                 encoder, block.name, layout, n_rows)
+                    except BaseException:
+                        _release_block(block)
+                        raise
+                    pending.append((future, block, n_rows))
+                    next_range += 1
+
+                future, block, n_rows = pending.pop(0)
+                try:
+                    if future.result() != n_rows:
+                        raise ValueError(f"{path} changed between the two passes.")
+                    # One copy out of the block, so it can be freed before the caller uses the rows
+                    arrays = _block_arrays(block, layout, n_rows)
+                    frame = pd.DataFrame({col: array.copy() for (col, _), array in zip(layout, arrays)})
+                finally:
+                    arrays = None
+                    _release_block(block)
+                yield frame.drop(columns=TARGET_COL), frame[TARGET_COL]
+        finally:
+            for future, block, _ in pending:
+                future.cancel()
+            for future, block, _ in pending:
+                try:
+                    future.result()
+                except Exception:
+                    pass
+                _release_block(block)
+        if timings is not None:
+            timings["transform"] = time.perf_counter() - start
+
+
+def parallel_model_matrix(path=DATA_PATH, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, schema=FIFA_SCHEMA,
+                          encoder=None, sketch=False, range_bytes=RANGE_BYTES):
+    """(X, y) of the whole file, computed by `workers` processes"""
+    parts = list(iter_parallel_model_matrix(path, workers, chunk_size, schema, encoder, sketch, range_bytes))
+    X = pd.concat([X for X, _ in parts], ignore_index=True)
+    y = pd.concat([y for _, y in parts], ignore_index=True)
+    return X, y
+
+
+def parallel_preprocess_file(input_path, output_path, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                             schema=FIFA_SCHEMA, encoder=None, sketch=False, timings=None):
+    """
+    preprocessing.preprocess_file with `workers` processes: the model matrix of a players
+    CSV is written to a CSV or Parquet file. Returns the number of rows.
+    """
+    chunks = (X.assign(**{TARGET_COL: y})
+              for X, y in iter_parallel_model_matrix(input_path, workers, chunk_size, schema, encoder, sketch,
+                                                     timings=timings))
+    return write_chunks(chunks, output_path)
+
+
+# ---------- Check ----------
+
+def compare_with_in_memory(path=DATA_PATH, workers=None):
+    """
+    Largest difference between the parallel model matrix and the in-memory one of
+    data_analysis.py (clean_players + build_model_matrix on the whole table).
+    """
+    df = pd.concat(iter_players_csv(path, schema=FIFA_SCHEMA), ignore_index=True)
+    X_ref, y_ref = build_model_matrix(clean_players(df))
+    X, y = parallel_model_matrix(path, workers, range_bytes=max(os.path.getsize(path) // (2 * (workers or 2)), 1))
+    if list(X.columns) != list(X_ref.columns):
+        raise ValueError("The parallel model matrix has other columns than the in-memory one.")
+    gaps = {col: float(np.nanmax(np.abs(X[col].to_numpy(np.float64) - X_ref[col].to_numpy(np.float64)), initial=0))
+            for col in X.columns}
+    return {
+        "rows": (len(X), len(X_ref)),
+        "target_equal": bool((y.to_numpy() == y_ref.to_numpy()).all()),
+        "max_gap": max(gaps.values()),
+        "max_gap_col": max(gaps, key=gaps.get),
+    }
+
+
+# ---------- CLI ----------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Multi-core chunked preprocessing of a players CSV")
+    parser.add_argument("input", nargs="?", default=DATA_PATH, help="Players CSV")
+    parser.add_argument("output", nargs="?", help="Model matrix file (.csv or .parquet)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of worker processes")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--vocabulary", default=POSITION_VOCAB_PATH,
+                        help="Saved position vocabulary ('' = the positions found in the input)")
+    parser.add_argument("--sketch", action="store_true", help="Approximate medians (KLL sketch, bounded memory)")
+    parser.add_argument("--compare", action="store_true", help="Compare with the in-memory cleaning of the input")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        result = compare_with_in_memory(args.input, args.workers)
+        print(f"rows (parallel / in memory): {result['rows'][0]:,d} / {result['rows'][1]:,d}")
+        print(f"target equal: {result['target_equal']}")
+        print(f"largest feature gap: {result['max_gap']:.3g} ({result['max_gap_col']})")
+        return
+    if not args.output:
+        parser.error("the output file is required (or --compare)")
+
+    encoder = PositionEncoder.load(args.vocabulary) if args.vocabulary and os.path.exists(args.vocabulary) else None
+    timings = {}
+    start = time.perf_counter()
+    rows = parallel_preprocess_file(args.input, args.output, args.workers, args.chunk_size, encoder=encoder,
+                                    sketch=args.sketch, timings=timings)
+    elapsed = time.perf_counter() - start
+    print(f"✅ {rows:,d} rows preprocessed in {elapsed:.1f} s with {args.workers} workers -> {args.output}")
+    print(f"   pass 1 (stats) {timings['stats']:.1f} s, pass 2 (clean + encode) {timings['transform']:.1f} s, "
+          f"{rows / elapsed:,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# src/position_encoder.py
+
+"""
+One-hot / multi-hot encoding of the 'positions' column with a fixed vocabulary.
+
+pd.get_dummies only creates a column for the positions present in the frame it is
+given, so a batch without any "LWB" player gets one column less than the training
+matrix. PositionEncoder keeps the list of positions (the vocabulary) and always
+returns one column per position, in the same order:
+
+    encoder = PositionEncoder.fit(df["positions"])          # sorted main positions
+    encoder.save()                                           # models/position_vocabulary.json
+    encoder = PositionEncoder.load()
+    matrix = encoder.transform(batch["positions"])           # uint8, n x len(vocabulary)
+    frame = encoder.to_frame(batch["positions"])             # pos_<position> columns
+
+- one-hot (default): the main position, i.e. the first of the list ("ST,LW" -> ST),
+- multi_hot=True: every listed position ("ST,LW" -> ST and LW).
+
+The distinct 'positions' strings (a few hundred) are encoded once with vectorized
+string operations and a categorical code lookup into a small uint8 matrix, then
+every player gets the row of its string (pd.factorize codes). A scipy CSR matrix
+is returned with sparse=True. A position outside the vocabulary, or a missing
+value, gives a row of zeros.
+
+    python src/position_encoder.py                 # rebuild the vocabulary from the real data
+    python src/position_encoder.py --multi-hot
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from config import DATA_PATH, MODELS_DIR
+
+
+POSITION_VOCAB_PATH = os.path.join(MODELS_DIR, "position_vocabulary.json")
+
+
+def _split_positions(positions):
+    """Series of lists of positions -> (row number, position) of every listed position"""
+    exploded = pd.Series(positions).reset_index(drop=True).str.split(",").explode().dropna()
+    return exploded.index.to_numpy(), exploded.str.strip()
+
+
+def main_positions(positions):
+    """First position of each 'positions' list ("ST, LW" -> "ST"), NaN stays NaN"""
+    return pd.Series(positions).str.split(",").str[0].str.strip()
+
+
+class PositionEncoder:
+    """Fixed position vocabulary -> uint8 one-hot (or multi-hot) matrix"""
+
+    def __init__(self, vocabulary, multi_hot=False, prefix="pos"):
+        vocabulary = [str(v) for v in vocabulary]
+        if len(set(vocabulary)) != len(vocabulary):
+            raise ValueError("The position vocabulary contains duplicates.")
+        self.vocabulary = vocabulary
+        self.multi_hot = multi_hot
+        self.prefix = prefix
+        self._categories = pd.CategoricalDtype(vocabulary)
+
+    @classmethod
+    def fit(cls, positions, multi_hot=False, prefix="pos"):
+        """Vocabulary of the positions found in `positions` (sorted, like get_dummies)"""
+        if multi_hot:
+            found = _split_positions(positions)[1].unique()
+        else:
+            found = main_positions(positions).dropna().unique()
+        return cls(sorted(found), multi_hot=multi_hot, prefix=prefix)
+
+    @property
+    def feature_names(self):
+        return [f"{self.prefix}_{position}" for position in self.vocabulary]
+
+    def _unique_matrix(self, unique_positions):
+        """uint8 rows of the distinct 'positions' strings (+ a row of zeros for the missing values)"""
+        if self.multi_hot:
+            rows, values = _split_positions(unique_positions)
+        else:
+            values = main_positions(unique_positions)
+            rows = np.arange(len(values))
+        codes = pd.Categorical(values, dtype=self._categories).codes
+        known = codes >= 0
+        matrix = np.zeros((len(unique_positions) + 1, len(self.vocabulary)), dtype=np.uint8)
+        matrix[rows[known], codes[known]] = 1
+        return matrix
+
+    def transform(self, positions, sparse=False):
+        """
+        Encode a column of 'positions' strings.
+
+        Returns a uint8 array of shape (n, len(vocabulary)), or a scipy.sparse CSR
+        matrix with sparse=True.
+        """
+        # A few hundred distinct strings for millions of players: encode each one once,
+        # then copy its row for every player (code -1 = missing -> last row, all zeros)
+        codes, uniques = pd.factorize(pd.Series(positions), sort=False)
+        matrix = self._unique_matrix(pd.Series(uniques, dtype=object))[codes]
+        if sparse:
+            from scipy import sparse as sp
+            return sp.csr_matrix(matrix)
+        return matrix
+
+    def to_frame(self, positions, index=None):
+        """transform() as a DataFrame with the pos_<position> columns"""
+        if index is None and isinstance(positions, pd.Series):
+            index = positions.index
+        return pd.DataFrame(self.transform(positions), columns=self.feature_names, index=index)
+
+    # ---------- Persistence ----------
+
+    def save(self, path=POSITION_VOCAB_PATH):
+        """Write the vocabulary as JSON (atomic replace)"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"vocabulary": self.vocabulary, "multi_hot": self.multi_hot, "prefix": self.prefix}, f, indent=2)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=POSITION_VOCAB_PATH):
+        with open(path, encoding="utf-8") as f:
+            spec = json.load(f)
+        return cls(spec["vocabulary"], multi_hot=spec.get("multi_hot", False), prefix=spec.get("prefix", "pos"))
+
+    @classmethod
+    def load_or_fit(cls, positions, path=POSITION_VOCAB_PATH):
+        """The saved vocabulary if there is one, otherwise fitted on `positions` and saved"""
+        if os.path.exists(path):
+            return cls.load(path)
+        encoder = cls.fit(positions)
+        encoder.save(path)
+        return encoder
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the position vocabulary from a players CSV")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--output", default=POSITION_VOCAB_PATH)
+    parser.add_argument("--multi-hot", action="store_true", help="Vocabulary of every listed position")
+    args = parser.parse_args(argv)
+
+    positions = pd.read_csv(args.data, usecols=["positions"])["positions"]
+    encoder = PositionEncoder.fit(positions, multi_hot=args.multi_hot)
+    encoder.save(args.output)
+    print(f"✅ {len(encoder.vocabulary)} positions saved in {args.output}: {', '.join(encoder.vocabulary)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# src/prediction_cache.py
+
+"""
+LRU cache of predictions, shared by all the sessions of the application.
+
+All the inputs of the application are bounded integer sliders, and scouts often
+re-analyse the same (or the same few) profiles. The cache keeps the last results
+keyed on:
+- the normalized feature vector (10 floats, in FEATURE_COLS order),
+- a fingerprint of the served models, so a retrained model never serves an old answer:
+  the active registry version (model_registry.registry_fingerprint), or
+  model_fingerprint() of the .pkl files when there is no registry.
+
+The predictions are computed outside the lock, so the predictor is called by several
+sessions at once: it must be thread-safe (FastPredictor is, it keeps no per-call
+state). A predictor that is not would store wrong results in the shared cache, served
+to every later session with the same input.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from config import FEATURE_COLS, MODELS_DIR
+
+
+MODEL_FILES = ("regression_model.pkl", "classification_model.pkl")
+
+# Default number of predictions kept in memory (a few hundred bytes each)
+DEFAULT_CACHE_SIZE = 4096
+
+
+def model_fingerprint(models_dir=MODELS_DIR, model_files=MODEL_FILES):
+    """
+    Cheap fingerprint of the model files (name, size and modification time).
+
+    It changes as soon as one of the .pkl files is replaced, without reading the files.
+    A missing file is part of the fingerprint too. Used when the models are served
+    from the .pkl files, i.e. when the registry has no active version.
+    """
+    digest = hashlib.sha256()
+    for file_name in model_files:
+        try:
+            stat = os.stat(os.path.join(models_dir, file_name))
+            digest.update(f"{file_name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        except FileNotFoundError:
+            digest.update(f"{file_name}:missing;".encode())
+    return digest.hexdigest()[:16]
+
+
+def normalize_features(features, feature_names=FEATURE_COLS):
+    """Turn a dict or a vector of features into a hashable tuple of floats (FEATURE_COLS order)"""
+    if isinstance(features, dict):
+        return tuple(float(features[name]) for name in feature_names)
+    return tuple(float(value) for value in np.asarray(features).reshape(-1))
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache in front of FastPredictor.predict() (or any thread-safe
+    predictor with the same predict() and feature_names).
+
+        cache = PredictionCache(max_size=4096)
+        rating, future_class, probabilities = cache.predict(predictor, features, fingerprint)
+
+    When the fingerprint changes (new models), the whole cache is dropped.
+    """
+
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1.")
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._fingerprint = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def predict(self, predictor, features, fingerprint):
+        """Cached predictor.predict(features)"""
+        key = normalize_features(features, predictor.feature_names)
+
+        with self._lock:
+            if fingerprint != self._fingerprint:
+                self._entries.clear()
+                self._fingerprint = fingerprint
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+            self.misses += 1
+
+        # Predict outside the lock so other sessions are not blocked (the predictor
+        # must be thread-safe, see the module docstring)
+        rating, future_class, probabilities = predictor.predict(key)
+        probabilities = np.array(probabilities)
+        probabilities.setflags(write=False)  # shared between sessions -> read-only
+        result = (rating, future_class, probabilities)
+
+        with self._lock:
+            if fingerprint == self._fingerprint:
+                self._entries[key] = result
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Hit / miss statistics of the cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
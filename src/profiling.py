@@ -0,0 +1,413 @@
+# src/profiling.py
+
+"""
+Single-pass, mergeable profiling of a players CSV of any size.
+
+data_analysis.py takes the imputation values (medians, means) from whole columns
+in memory. Here every column is summarized by small sketches, updated chunk by
+chunk, and the sketches of several chunks / processes are merged:
+
+- RunningMoments : count, mean and variance (Welford, merged with Chan's formula), min / max
+- QuantileSketch : KLL quantile sketch (medians, quartiles), rank error ~ 1.7 / k
+- DistinctCounter: HyperLogLog distinct count (nationality, club, ...), error ~ 1.04 / sqrt(2^p)
+- null counts
+
+    python src/profiling.py data/synthetic_10m.csv --workers 4
+    python src/profiling.py --check              # real data: compare with the exact in-memory values
+
+    profile = profile_file("players.csv", workers=4)       # DataProfile
+    profile.to_frame()                                      # one row per column
+    profile.imputation_values()                             # medians / means used by clean_players
+
+With workers > 1 the CSV is split in line-aligned byte ranges (data_loader.byte_ranges),
+each process profiles its range and the profiles are merged. Memory depends on
+the chunk size only: a sketch keeps a few KB whatever the number of rows.
+"""
+
+import argparse
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from config import DATA_PATH
+from data_loader import FIFA_SCHEMA, byte_ranges, iter_players_csv
+from preprocessing import MEDIAN_IMPUTED_COLS, ZERO_IMPUTED_COLS, clean_players
+
+
+DEFAULT_CHUNK_SIZE = 200_000
+
+# KLL accuracy: the rank of a returned quantile is off by about 1.7 / k of the rows
+DEFAULT_QUANTILE_K = 400
+
+# HyperLogLog registers: 2^12 (4 KB), standard error 1.6 %
+DEFAULT_HLL_PRECISION = 12
+
+
+# ---------- Sketches ----------
+
+class RunningMoments:
+    """Count, mean, variance, min and max of a stream of numbers (mergeable)"""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # sum of squared deviations from the mean
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values):
+        """Add an array of values (NaN ignored)"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        batch = RunningMoments()
+        batch.n = len(values)
+        batch.mean = float(values.mean())
+        batch.m2 = float(((values - batch.mean) ** 2).sum())
+        batch.min, batch.max = float(values.min()), float(values.max())
+        return self.merge(batch)
+
+    def merge(self, other):
+        """Chan et al.: combine the (n, mean, M2) of two disjoint sets"""
+        if other.n == 0:
+            return self
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta ** 2 * self.n * other.n / n
+        self.n = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self):
+        """Sample variance (ddof=1, like pandas)"""
+        return self.m2 / (self.n - 1) if self.n > 1 else math.nan
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+class QuantileSketch:
+    """
+    KLL quantile sketch (Karnin, Lang, Liberty 2016).
+
+    Items are kept in compactors: an item of level h stands for 2^h values. When the
+    sketch is full, a level is sorted and every other item (random start) moves up one
+    level. Lower levels get a smaller capacity (k * c^depth), so the sketch keeps
+    O(k) items. Two sketches merge by concatenating their levels and compacting.
+    """
+
+    def __init__(self, k=DEFAULT_QUANTILE_K, c=2 / 3, seed=None):
+        self.k = k
+        self.c = c
+        self.levels = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+
+    def _capacity(self, h):
+        depth = len(self.levels) - h - 1
+        return max(int(math.ceil(self.k * self.c ** depth)), 2)
+
+    def _compress(self):
+        while sum(len(level) for level in self.levels) > sum(self._capacity(h) for h in range(len(self.levels))):
+            for h, level in enumerate(self.levels):
+                if len(level) >= self._capacity(h):
+                    if h + 1 == len(self.levels):
+                        self.levels.append(np.empty(0))
+                    level = np.sort(level)
+                    # An odd item out stays at this level, the pairs are halved
+                    end = len(level) - len(level) % 2
+                    promoted = level[self.rng.integers(2):end:2]
+                    self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+                    self.levels[h] = level[end:]
+                    break
+
+    def update(self, values):
+        """Add an array of values (NaN ignored)"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self._compress()
+        return self
+
+    def merge(self, other):
+        for h, level in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[h] = np.concatenate([self.levels[h], level])
+        self._compress()
+        return self
+
+    @property
+    def n(self):
+        return sum(len(level) << h for h, level in enumerate(self.levels))
+
+    def quantile(self, q):
+        """Approximate q-quantile (0 <= q <= 1), NaN if the sketch is empty"""
+        items = np.concatenate(self.levels)
+        if len(items) == 0:
+            return math.nan
+        weights = np.concatenate([np.full(len(level), 1 << h, dtype=np.int64) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        cumulative = np.cumsum(weights[order])
+        rank = min(int(math.ceil(q * cumulative[-1])), cumulative[-1])
+        return float(items[order][np.searchsorted(cumulative, max(rank, 1))])
+
+    def median(self):
+        return self.quantile(0.5)
+
+
+def _hash_values(values):
+    """64-bit hash of each non-missing value (numbers as float64, so 3 == 3.0)"""
+    values = pd.Series(values).dropna()
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Hash the categories once, then look them up by code
+        category_hashes = pd.util.hash_pandas_object(values.cat.categories.to_series(), index=False).to_numpy()
+        return category_hashes[values.cat.codes.to_numpy()]
+    if pd.api.types.is_numeric_dtype(values.dtype):
+        values = values.astype(np.float64)
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+class DistinctCounter:
+    """HyperLogLog distinct count (mergeable: register-wise max)"""
+
+    def __init__(self, precision=DEFAULT_HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, values):
+        """Add a Series / array of values (missing values ignored)"""
+        hashes = _hash_values(values)
+        if len(hashes) == 0:
+            return self
+        p = np.uint64(self.precision)
+        index = (hashes >> (np.uint64(64) - p)).astype(np.intp)
+        rest = hashes & ((np.uint64(1) << (np.uint64(64) - p)) - np.uint64(1))
+        # Rank of the first 1 bit of the remaining 64 - p bits (64 - p + 1 if they are all 0)
+        bit_length = np.frexp(rest.astype(np.float64))[1]
+        rank = (64 - self.precision - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog counters of different precisions.")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int((self.registers == 0).sum())
+        if estimate <= 2.5 * m and zeros:
+            # Small cardinalities: linear counting is more accurate
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+# ---------- Profile of a table ----------
+
+class ColumnProfile:
+    """Sketches of one column (the numeric ones only if the column is numeric)"""
+
+    def __init__(self, name, quantile_k=DEFAULT_QUANTILE_K, hll_precision=DEFAULT_HLL_PRECISION, seed=None):
+        self.name = name
+        self.dtype = None
+        self.n_rows = 0
+        self.n_null = 0
+        self.moments = None
+        self.quantiles = None
+        self.distinct = DistinctCounter(hll_precision)
+        self._quantile_k = quantile_k
+        self._seed = seed
+
+    def update(self, values):
+        kind = "number" if pd.api.types.is_numeric_dtype(values.dtype) else "text"
+        self.dtype = kind if self.dtype in (None, kind) else "mixed"
+        self.n_rows += len(values)
+        self.n_null += int(values.isna().sum())
+        self.distinct.update(values)
+        if kind == "number":
+            if self.moments is None:
+                self.moments = RunningMoments()
+                self.quantiles = QuantileSketch(self._quantile_k, seed=self._seed)
+            numbers = values.to_numpy(dtype=np.float64, na_value=np.nan)
+            self.moments.update(numbers)
+            self.quantiles.update(numbers)
+        return self
+
+    def merge(self, other):
+        if self.dtype is None:
+            self.dtype = other.dtype
+        elif other.dtype not in (None, self.dtype):
+            self.dtype = "mixed"
+        self.n_rows += other.n_rows
+        self.n_null += other.n_null
+        self.distinct.merge(other.distinct)
+        if other.moments is not None:
+            if self.moments is None:
+                self.moments, self.quantiles = other.moments, other.quantiles
+            else:
+                self.moments.merge(other.moments)
+                self.quantiles.merge(other.quantiles)
+        return self
+
+
+class DataProfile:
+    """ColumnProfile of every column of a table, built chunk by chunk"""
+
+    def __init__(self, quantile_k=DEFAULT_QUANTILE_K, hll_precision=DEFAULT_HLL_PRECISION, seed=None):
+        self.quantile_k = quantile_k
+        self.hll_precision = hll_precision
+        self.seed = seed
+        self.n_rows = 0
+        self.columns = {}
+
+    def update(self, df):
+        """Add the rows of a DataFrame"""
+        self.n_rows += len(df)
+        for i, col in enumerate(df.columns):
+            if col not in self.columns:
+                seed = None if self.seed is None else [*np.atleast_1d(self.seed), i]
+                self.columns[col] = ColumnProfile(col, self.quantile_k, self.hll_precision, seed)
+            self.columns[col].update(df[col])
+        return self
+
+    def merge(self, other):
+        """Add the profile of other rows (e.g. another part of the file)"""
+        self.n_rows += other.n_rows
+        for col, profile in other.columns.items():
+            if col in self.columns:
+                self.columns[col].merge(profile)
+            else:
+                self.columns[col] = profile
+        return self
+
+    def to_frame(self):
+        """One row per column: type, nulls, distinct values, mean / std / min / quartiles / max"""
+        rows = []
+        for col, p in self.columns.items():
+            row = {"column": col, "type": p.dtype, "count": p.n_rows - p.n_null, "nulls": p.n_null,
+                   "distinct": p.distinct.count()}
+            if p.moments is not None and p.moments.n:
+                row.update(mean=p.moments.mean, std=p.moments.std, min=p.moments.min,
+                           p25=p.quantiles.quantile(0.25), median=p.quantiles.median(),
+                           p75=p.quantiles.quantile(0.75), max=p.moments.max)
+            rows.append(row)
+        return pd.DataFrame(rows).set_index("column")
+
+    def imputation_values(self):
+        """
+        Values preprocessing.clean_players / build_model_matrix would use on the whole file:
+        - medians: median of each MEDIAN_IMPUTED_COLS column (fills its missing values),
+        - means  : mean of each numeric column after that imputation (fills the rest).
+        Same formulas as preprocessing.fit_stats, with sketches instead of exact counts.
+        """
+        medians = {col: self.columns[col].quantiles.median() for col in MEDIAN_IMPUTED_COLS
+                   if col in self.columns and self.columns[col].quantiles is not None}
+        means = {}
+        for col, p in self.columns.items():
+            if p.moments is None or p.dtype != "number":
+                continue
+            present, n_missing = p.moments.n, p.n_rows - p.moments.n
+            if col in medians:
+                means[col] = (p.moments.mean * present + medians[col] * n_missing) / p.n_rows
+            elif col in ZERO_IMPUTED_COLS:
+                means[col] = p.moments.mean * present / p.n_rows
+            else:
+                means[col] = p.moments.mean if present else math.nan
+        return {"medians": medians, "means": means}
+
+
+# ---------- Files ----------
+
+def _profile_range(path, start, stop, chunk_size, quantile_k, hll_precision, seed):
+    """Profile of the rows of one byte range of the CSV (runs in a worker process)"""
+    profile = DataProfile(quantile_k, hll_precision, seed)
+    for chunk in iter_players_csv(path, chunk_size, FIFA_SCHEMA, start_byte=start, stop_byte=stop):
+        profile.update(chunk)
+    return profile
+
+
+def profile_file(path=DATA_PATH, workers=1, chunk_size=DEFAULT_CHUNK_SIZE,
+                 quantile_k=DEFAULT_QUANTILE_K, hll_precision=DEFAULT_HLL_PRECISION, seed=0):
+    """
+    Profile of a players CSV, read in one pass (in `workers` processes).
+
+    The same file, workers and seed always give the same profile.
+    """
+    ranges = byte_ranges(path, workers)
+    if not ranges:
+        raise ValueError(f"No rows were found in {path}.")
+    jobs = [(path, start, stop, chunk_size, quantile_k, hll_precision, [seed, part])
+            for part, (start, stop) in enumerate(ranges)]
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            profiles = list(executor.map(_profile_range, *zip(*jobs)))
+    else:
+        profiles = [_profile_range(*job) for job in jobs]
+
+    profile = profiles[0]
+    for other in profiles[1:]:
+        profile.merge(other)
+    return profile
+
+
+def exact_imputation_values(df):
+    """The values data_analysis.py computes in memory (reference for --check)"""
+    cleaned = clean_players(df)
+    medians = {col: float(pd.to_numeric(df[col], errors="coerce").median()) for col in MEDIAN_IMPUTED_COLS}
+    numeric = cleaned.select_dtypes("number")
+    return {"medians": medians, "means": numeric.mean().to_dict()}
+
+
+# ---------- CLI ----------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Single-pass profile of a players CSV (mergeable sketches)")
+    parser.add_argument("path", nargs="?", default=DATA_PATH)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--k", type=int, default=DEFAULT_QUANTILE_K, help="KLL accuracy parameter")
+    parser.add_argument("--check", action="store_true",
+                        help="Also compute the exact values in memory and compare (the file must fit)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    profile = profile_file(args.path, args.workers, args.chunk_size, args.k)
+    elapsed = time.perf_counter() - start
+    print(f"✅ {profile.n_rows:,d} rows profiled in {elapsed:.1f} s "
+          f"({profile.n_rows / elapsed:,.0f} rows/s, {args.workers} worker(s))\n")
+    with pd.option_context("display.max_rows", None, "display.width", 200, "display.float_format", "{:,.2f}".format):
+        print(profile.to_frame())
+
+    values = profile.imputation_values()
+    print("\n=== Imputation values (sketches) ===")
+    for col, median in values["medians"].items():
+        print(f"  median {col:<22s} {median:>16,.2f}")
+
+    if args.check:
+        from data_loader import read_players_csv
+        exact = exact_imputation_values(read_players_csv(args.path))
+        print("\n=== Sketch vs exact (in memory) ===")
+        for col in values["medians"]:
+            a, b = values["medians"][col], exact["medians"][col]
+            print(f"  median {col:<22s} {a:>16,.2f} {b:>16,.2f}  ({(a - b) / b:+.2%})")
+        gaps = {col: abs(values["means"][col] - exact["means"][col]) / max(abs(exact["means"][col]), 1e-12)
+                for col in values["means"] if col in exact["means"]}
+        worst = max(gaps, key=gaps.get)
+        print(f"  means: largest relative gap {gaps[worst]:.2e} ({worst})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# src/startup_profile.py
+
+"""
+Cold start instrumentation of the application.
+
+    from startup_profile import STARTUP
+
+    with STARTUP.measure_import("pandas"):
+        import pandas as pd
+    with STARTUP.measure("model loading"):
+        ...
+    STARTUP.mark("first prediction")   # time since the process started
+    print(STARTUP.format_report())
+
+STARTUP lives as long as the process: Streamlit re-runs the application script on
+every interaction, but only the first (cold) measurement of each step is kept.
+Import times are incremental: a module already imported by an earlier one costs
+(almost) nothing the second time.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+# psutil : gives the real start time of the process (Python + Streamlit startup included)
+import psutil
+
+
+def _process_start_time():
+    """Wall-clock start time of the current process"""
+    try:
+        return psutil.Process().create_time()
+    except psutil.Error:
+        return time.time()
+
+
+class StartupProfile:
+    """Import durations, step durations and milestones of one process"""
+
+    def __init__(self, process_start=None):
+        self.process_start = process_start if process_start is not None else _process_start_time()
+        self.imports = {}     # module -> seconds
+        self.steps = {}       # step -> seconds
+        self.milestones = {}  # milestone -> seconds since the process started
+        self._lock = threading.Lock()  # steps may be measured in background threads
+
+    def _record(self, table, key, value):
+        with self._lock:
+            if key in table:
+                return False
+            table[key] = value
+            return True
+
+    @contextmanager
+    def measure_import(self, module_name):
+        """Time the import statement(s) of the with block"""
+        start = time.perf_counter()
+        yield
+        self._record(self.imports, module_name, time.perf_counter() - start)
+
+    @contextmanager
+    def measure(self, step):
+        """Time a startup step (model loading, warm-up...)"""
+        start = time.perf_counter()
+        yield
+        self._record(self.steps, step, time.perf_counter() - start)
+
+    def mark(self, milestone):
+        """
+        Record the time since the process started, the first time only.
+
+        Returns True when this call recorded the milestone.
+        """
+        return self._record(self.milestones, milestone, time.time() - self.process_start)
+
+    def report(self):
+        with self._lock:
+            return {
+                "imports": dict(sorted(self.imports.items(), key=lambda item: -item[1])),
+                "steps": dict(self.steps),
+                "milestones": dict(sorted(self.milestones.items(), key=lambda item: item[1])),
+            }
+
+    def format_report(self):
+        report = self.report()
+        lines = ["Startup profile:"]
+        lines += [f"  import {name:<22s} {seconds * 1000:8.1f} ms" for name, seconds in report["imports"].items()]
+        lines += [f"  {step:<29s} {seconds * 1000:8.1f} ms" for step, seconds in report["steps"].items()]
+        lines += [f"  {name:<29s} {seconds:8.2f} s after process start"
+                  for name, seconds in report["milestones"].items()]
+        return "\n".join(lines)
+
+
+# Profile of the current process
+STARTUP = StartupProfile()
@@ -0,0 +1,239 @@
+# src/synthetic_data.py
+
+"""
+Synthetic FIFA-like players, to test the pipelines far beyond the 17,954 real rows.
+
+    python src/synthetic_data.py data/synthetic_10m.csv --rows 10000000
+    python src/synthetic_data.py data/synthetic_1m.parquet --rows 1000000 --seed 7
+
+    model = SyntheticPlayers.fit(read_players_csv())
+    for chunk in model.generate(10_000_000, chunk_size=100_000, seed=42):
+        ...                                  # DataFrames with the 51 columns of the CSV
+
+How a synthetic player is drawn:
+- numeric columns: Gaussian copula. The rank correlations between the columns are
+  fitted on the real file, and each column keeps exactly its real distribution
+  (values are taken from its sorted real values at the drawn quantile).
+- potential is drawn as the gap potential - overall_rating, so it is never below
+  the overall rating (like in the real data).
+- text columns (DONOR_COLS) are copied together from one random real player, which
+  keeps them consistent with each other (national team / position, ...).
+- missing values: same rate as the real column. The national columns are missing
+  exactly when the copied player has no national team.
+- name / full_name are "Player <n>" / "Synthetic Player <n>", birth_date matches age.
+
+Each chunk has its own random generator seeded with (seed, chunk index): the same
+seed and chunk size always give the same rows, and the memory used only depends on
+the chunk size, not on the number of rows.
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr, ndtri
+
+from config import DATA_PATH
+from data_loader import read_players_csv, write_chunks
+
+
+# Generated, not learned from the real players
+IDENTITY_COLS = ["name", "full_name", "birth_date"]
+
+# Text columns copied together from one real player
+DONOR_COLS = ["positions", "nationality", "preferred_foot", "body_type", "national_team", "national_team_position"]
+
+# Columns drawn as a difference with another column: potential = overall_rating + gap
+GAP_COLS = {"potential": "overall_rating"}
+
+DEFAULT_CHUNK_SIZE = 100_000
+BIRTH_DATE_FORMAT = "%m/%d/%Y"
+
+
+def _normal_scores(values):
+    """Rank-based normal scores of a column (missing values -> 0, the median score)"""
+    ranks = values.rank(method="average")
+    scores = ndtri((ranks - 0.5) / values.count())
+    return scores.fillna(0.0).to_numpy()
+
+
+def _correlation_factor(scores):
+    """Cholesky factor of the correlation matrix of the normal scores"""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        correlation = np.corrcoef(scores, rowvar=False)
+    # Constant columns have no correlation
+    correlation = np.nan_to_num(correlation, nan=0.0)
+    np.fill_diagonal(correlation, 1.0)
+    # Clip tiny negative eigenvalues (rounding) so the factorization cannot fail
+    eigenvalues, eigenvectors = np.linalg.eigh(correlation)
+    correlation = (eigenvectors * np.maximum(eigenvalues, 1e-10)) @ eigenvectors.T
+    d = np.sqrt(np.diag(correlation))
+    return np.linalg.cholesky(correlation / np.outer(d, d))
+
+
+class SyntheticPlayers:
+    """
+    Generator fitted on a players DataFrame (the raw CSV or load_players()).
+
+    Build it with SyntheticPlayers.fit(df), then call generate() or write().
+    """
+
+    def __init__(self, columns, numeric_cols, sorted_values, dtypes, factor,
+                 missing_rates, missing_like, donors, gap_bounds, birth_reference):
+        self.columns = columns
+        self.numeric_cols = numeric_cols
+        self.sorted_values = sorted_values
+        self.dtypes = dtypes
+        self.factor = factor
+        self.missing_rates = missing_rates
+        self.missing_like = missing_like
+        self.donors = donors
+        self.gap_bounds = gap_bounds
+        self.birth_reference = birth_reference
+
+    @classmethod
+    def fit(cls, df):
+        """Learn the distributions and correlations of `df`"""
+        columns = list(df.columns)
+        donor_cols = [c for c in DONOR_COLS if c in df.columns]
+        numeric_cols = [c for c in columns if c not in IDENTITY_COLS and c not in donor_cols]
+
+        values, dtypes, gap_bounds = {}, {}, {}
+        for c in numeric_cols:
+            if not pd.api.types.is_numeric_dtype(df[c]) and pd.to_numeric(df[c], errors="coerce").isna().all():
+                raise ValueError(f"Column '{c}' is not numeric and not a known text column.")
+            column = pd.to_numeric(df[c], errors="coerce").astype(np.float64)
+            dtypes[c] = df[c].dtype if pd.api.types.is_numeric_dtype(df[c]) else np.dtype(np.float64)
+            if c in GAP_COLS and GAP_COLS[c] in df.columns:
+                gap_bounds[c] = (column.min(), column.max())
+                column = column - pd.to_numeric(df[GAP_COLS[c]], errors="coerce")
+            values[c] = column
+
+        sorted_values = {c: np.sort(v.dropna().to_numpy()) for c, v in values.items()}
+        scores = np.column_stack([_normal_scores(values[c]) for c in numeric_cols])
+
+        # Missing values: follow a text column with the same missing rows, or a plain rate
+        missing_rates, missing_like = {}, {}
+        for c in numeric_cols:
+            missing = values[c].isna()
+            if not missing.any():
+                continue
+            twin = next((d for d in donor_cols if df[d].isna().equals(missing)), None)
+            if twin is not None:
+                missing_like[c] = twin
+            else:
+                missing_rates[c] = float(missing.mean())
+
+        return cls(columns, numeric_cols, sorted_values, dtypes, _correlation_factor(scores),
+                   missing_rates, missing_like, df[donor_cols].reset_index(drop=True),
+                   gap_bounds, cls._fit_birth_reference(df))
+
+    @staticmethod
+    def _fit_birth_reference(df):
+        """
+        (year, day of year) at which the ages of the real file were computed.
+
+        A player born on or before that day of the year has age = year - birth year.
+        """
+        if "birth_date" not in df.columns or "age" not in df.columns:
+            return None
+        birth = pd.to_datetime(df["birth_date"], format=BIRTH_DATE_FORMAT, errors="coerce")
+        reference_years = birth.dt.year + pd.to_numeric(df["age"], errors="coerce")
+        if reference_years.isna().all():
+            return None
+        year = int(reference_years.max())
+        day = int(birth.dt.dayofyear[reference_years == year].max())
+        return year, day
+
+    # ---------- Generation ----------
+
+    def sample(self, n_rows, rng, start_index=0):
+        """`n_rows` synthetic players (numbered from `start_index` in their names)"""
+        uniforms = ndtr(rng.standard_normal((n_rows, len(self.numeric_cols))) @ self.factor.T)
+        data = {}
+        for j, c in enumerate(self.numeric_cols):
+            sorted_values = self.sorted_values[c]
+            positions = np.minimum((uniforms[:, j] * len(sorted_values)).astype(np.intp), len(sorted_values) - 1)
+            data[c] = sorted_values[positions]
+        for c, base in GAP_COLS.items():
+            if c in self.gap_bounds:
+                data[c] = np.clip(data[base] + data[c], *self.gap_bounds[c])
+
+        donors = self.donors.iloc[rng.integers(0, len(self.donors), n_rows)].reset_index(drop=True)
+        for c in self.numeric_cols:
+            if c in self.missing_like:
+                missing = donors[self.missing_like[c]].isna().to_numpy()
+            elif c in self.missing_rates:
+                missing = rng.random(n_rows) < self.missing_rates[c]
+            else:
+                data[c] = data[c].astype(self.dtypes[c])
+                continue
+            data[c][missing] = np.nan
+            # Integer columns with missing values become float, like in pd.read_csv
+            if pd.api.types.is_integer_dtype(self.dtypes[c]):
+                data[c] = data[c].astype(np.float64)
+            else:
+                data[c] = data[c].astype(self.dtypes[c])
+
+        numbers = pd.RangeIndex(start_index + 1, start_index + n_rows + 1).astype(str)
+        data["name"] = "Player " + numbers
+        data["full_name"] = "Synthetic Player " + numbers
+        data["birth_date"] = self._birth_dates(data.get("age"), rng, n_rows)
+        for c in donors.columns:
+            data[c] = donors[c].to_numpy()
+
+        return pd.DataFrame({c: data[c] for c in self.columns if c in data})
+
+    def _birth_dates(self, ages, rng, n_rows):
+        """Birth dates consistent with the ages (same text format as the CSV)"""
+        if self.birth_reference is None or ages is None:
+            return np.full(n_rows, None, dtype=object)
+        year, day = self.birth_reference
+        days = rng.integers(1, 366, n_rows)
+        years = year - np.asarray(ages, dtype=np.int64) - (days > day)
+        dates = pd.to_datetime(years.astype(str), format="%Y") + pd.to_timedelta(days - 1, unit="D")
+        return (dates.month.astype(str) + "/" + dates.day.astype(str) + "/" + dates.year.astype(str)).to_numpy()
+
+    def generate(self, n_rows, chunk_size=DEFAULT_CHUNK_SIZE, seed=42):
+        """Yield the `n_rows` synthetic players as DataFrames of at most `chunk_size` rows"""
+        for chunk_index, start in enumerate(range(0, n_rows, chunk_size)):
+            rng = np.random.default_rng([seed, chunk_index])
+            yield self.sample(min(chunk_size, n_rows - start), rng, start_index=start)
+
+    def write(self, path, n_rows, chunk_size=DEFAULT_CHUNK_SIZE, seed=42, progress=None):
+        """
+        Stream the synthetic players to a CSV or Parquet file (chosen by extension).
+
+        `progress(rows_written)` is called after every chunk. Parquet needs pyarrow.
+        """
+        return write_chunks(self.generate(n_rows, chunk_size, seed), path, progress)
+
+
+# ---------- CLI ----------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic FIFA-like players")
+    parser.add_argument("output", help="Output file (.csv or .parquet)")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--source", default=DATA_PATH, help="Real players CSV used to fit the generator")
+    args = parser.parse_args(argv)
+
+    model = SyntheticPlayers.fit(read_players_csv(args.source))
+    start = time.perf_counter()
+
+    def progress(rows):
+        elapsed = time.perf_counter() - start
+        print(f"  {rows:>12,d} / {args.rows:,d} rows  ({rows / elapsed:,.0f} rows/s)", end="\r", flush=True)
+
+    written = model.write(args.output, args.rows, args.chunk_size, args.seed, progress=progress)
+    elapsed = time.perf_counter() - start
+    size_mb = os.path.getsize(args.output) / 1024 ** 2
+    print(f"\n✅ {written:,d} synthetic players written to {args.output} ({size_mb:,.0f} MB) in {elapsed:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -22,7 +22,9 @@ def check_data_files():
     data_path = os.path.join(PROJECT_ROOT, 'data', 'fifa_players.csv')
     if os.path.exists(data_path):
         # If the file exists, we also try to load it to catch encoding / parsing issues early.
-        df = pd.read_csv(data_path)
+        # load_players goes through the shared columnar cache (and builds it on the first run).
+        from data_loader import load_players
+        df = load_players(data_path)
         print(f"  ✅ fifa_players.csv found ({len(df)} rows)")
         return True
     else:
@@ -54,6 +56,14 @@ def check_models():
     else:
         print(f"  ❌ classification_model.pkl NOT FOUND")
     
+    # The app serves the active version of the model registry when there is one.
+    from model_registry import active_version
+    version = active_version(os.path.join(models_dir, 'registry'))
+    if version:
+        print(f"  ✅ model registry: active version {version}")
+    else:
+        print(f"  ⚠️ no model registry yet (the app uses the .pkl files)")
+    
     # Only returns True if BOTH models are present.
     return reg_exists and clf_exists
 
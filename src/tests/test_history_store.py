@@ -0,0 +1,98 @@
+# src/tests/test_history_store.py
+
+"""
+Dashboard metrics of the history database: the averages kept by the triggers and
+by HistoryAggregates must equal AVG() over the rows, missing values included, and
+the rows without a predicted class share one counter.
+
+    python -m pytest -q src/tests
+"""
+
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from history_store import HistoryAggregates, HistoryStore
+
+
+RECORDS = [
+    {"player_name": "A", "age": 20, "predicted_overall_rating": 80.0, "predicted_future_class": "high_growth"},
+    {"player_name": "B", "age": None, "predicted_overall_rating": 60.0, "predicted_future_class": "stable"},
+    {"player_name": "C", "age": 30, "predicted_overall_rating": None, "predicted_future_class": "stable"},
+    {"player_name": "D", "age": None, "predicted_overall_rating": None, "predicted_future_class": "decline"},
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return HistoryStore(db_path=str(tmp_path / "history.db"), csv_path=None)
+
+
+def _sql_averages(store):
+    with sqlite3.connect(store.db_path) as conn:
+        return conn.execute("SELECT COUNT(*), AVG(predicted_overall_rating), AVG(age) FROM history").fetchone()
+
+
+def test_averages_skip_missing_values(store):
+    store.add_players(RECORDS[:2])
+    aggregates = HistoryAggregates()
+    aggregates.refresh(store)
+    store.add_players(RECORDS[2:])
+    aggregates.refresh(store)
+
+    n_players, average_rating, average_age = _sql_averages(store)
+    stats = store.stats()
+    assert (stats["total_players"], stats["average_rating"], stats["average_age"]) == (4, 70.0, 25.0)
+    assert (n_players, average_rating, average_age) == (4, 70.0, 25.0)
+    assert (aggregates.n_players, aggregates.average_rating, aggregates.average_age) == (4, 70.0, 25.0)
+
+    with sqlite3.connect(store.db_path) as conn:
+        conn.execute("DELETE FROM history WHERE player_name = 'A'")
+    stats = store.stats()
+    assert (stats["total_players"], stats["average_rating"], stats["average_age"]) == (3, 60.0, 30.0)
+    assert stats["future_superstars"] == 0
+
+
+def test_null_class_is_one_counter(store):
+    no_class = {"player_name": "X", "age": 22, "predicted_overall_rating": 70.0, "predicted_future_class": None}
+    store.add_players([no_class] * 3)
+    store.add_players(RECORDS)
+
+    with sqlite3.connect(store.db_path) as conn:
+        counts = dict(conn.execute("SELECT predicted_future_class, n_players FROM history_class_counts"))
+    assert counts == {"": 3, "high_growth": 1, "stable": 2, "decline": 1}
+    assert store.snapshot()["class_counts"] == {"high_growth": 1, "stable": 2, "decline": 1}
+
+    with sqlite3.connect(store.db_path) as conn:
+        conn.execute("DELETE FROM history")
+        counts = dict(conn.execute("SELECT predicted_future_class, n_players FROM history_class_counts"))
+    assert counts == {"": 0, "high_growth": 0, "stable": 0, "decline": 0}
+    assert store.stats()["total_players"] == 0
+
+
+def test_older_database_is_upgraded(store):
+    store.add_players(RECORDS)
+    # Totals table and triggers of the first version: one counter for every average
+    with sqlite3.connect(store.db_path) as conn:
+        conn.executescript("""
+            DROP TRIGGER history_after_insert;
+            DROP TRIGGER history_after_delete;
+            DROP TABLE history_totals;
+            CREATE TABLE history_totals (id INTEGER PRIMARY KEY, n_players INTEGER NOT NULL,
+                                         sum_rating REAL NOT NULL, sum_age REAL NOT NULL);
+            INSERT INTO history_totals VALUES (1, 4, 140.0, 50.0);
+            PRAGMA user_version = 0;
+        """)
+
+    upgraded = HistoryStore(db_path=store.db_path, csv_path=None)
+    stats = upgraded.stats()
+    assert (stats["total_players"], stats["average_rating"], stats["average_age"]) == (4, 70.0, 25.0)
+
+    upgraded.add_player({"player_name": "E", "age": 25, "predicted_overall_rating": None,
+                         "predicted_future_class": "high_growth"})
+    stats = upgraded.stats()
+    assert (stats["total_players"], stats["average_age"], stats["future_superstars"]) == (5, 25.0, 2)
@@ -0,0 +1,111 @@
+# src/tests/test_prediction_cache.py
+
+"""
+Concurrency test of the prediction path shared by the sessions of the app: one
+FastPredictor and one PredictionCache called from several threads must give the
+same results as single-threaded calls.
+
+    python -m pytest -q src/tests
+"""
+
+import os
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import FEATURE_COLS
+from fast_predictor import FastPredictor
+from prediction_cache import PredictionCache
+
+
+N_THREADS = 8
+N_CALLS = 2000
+
+
+@pytest.fixture(scope="module")
+def predictor():
+    """Small models trained on random profiles (the saved models are not needed)"""
+    xgb = pytest.importorskip("xgboost")
+    from sklearn.linear_model import LogisticRegression
+
+    rng = np.random.default_rng(0)
+    X = rng.uniform(1, 99, (2000, len(FEATURE_COLS)))
+    y = X @ rng.normal(size=len(FEATURE_COLS))
+    reg_model = xgb.XGBRegressor(n_estimators=30, max_depth=4, random_state=42).fit(X, y)
+    labels = np.array(["decline", "stable", "likely_improve", "high_growth"])[
+        np.digitize(y, np.quantile(y, [0.25, 0.5, 0.75]))]
+    clf_model = LogisticRegression(max_iter=2000).fit(X / 100, labels)
+    clf_model.coef_ /= 100  # same model on the raw features
+    return FastPredictor(reg_model=reg_model, clf_model=clf_model)
+
+
+@pytest.fixture(scope="module")
+def players():
+    rng = np.random.default_rng(1)
+    return [dict(zip(FEATURE_COLS, row)) for row in rng.integers(1, 100, (300, len(FEATURE_COLS))).astype(float)]
+
+
+def _run_threads(target):
+    errors = []
+
+    def run(k):
+        try:
+            target(k)
+        except Exception as e:  # surfaced by the main thread
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(k,)) for k in range(N_THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+
+
+def _same(result, expected):
+    rating, future_class, probabilities = result
+    return rating == expected[0] and future_class == expected[1] and np.array_equal(probabilities, expected[2])
+
+
+def test_predictor_is_thread_safe(predictor, players):
+    expected = [predictor.predict(player) for player in players]
+    wrong = []
+
+    def worker(k):
+        for i in range(N_CALLS):
+            j = (i * 7 + k) % len(players)
+            if not _same(predictor.predict(players[j]), expected[j]):
+                wrong.append(j)
+
+    _run_threads(worker)
+    assert not wrong, f"{len(wrong)} wrong predictions out of {N_THREADS * N_CALLS}"
+
+
+def test_cache_matches_single_threaded(predictor, players):
+    expected = [predictor.predict(player) for player in players]
+    # Smaller than the number of players: entries are evicted and recomputed concurrently
+    cache = PredictionCache(max_size=64)
+    wrong = []
+
+    def worker(k):
+        for i in range(N_CALLS):
+            j = (i * 11 + k) % len(players)
+            if not _same(cache.predict(predictor, players[j], "fingerprint"), expected[j]):
+                wrong.append(j)
+
+    _run_threads(worker)
+    assert not wrong, f"{len(wrong)} wrong cached predictions out of {N_THREADS * N_CALLS}"
+    stats = cache.stats()
+    assert stats["hits"] + stats["misses"] == N_THREADS * N_CALLS
+    assert stats["size"] <= 64
+
+    # Every entry left in the cache is the single-threaded result of its input
+    for player, result in zip(players, expected):
+        key = tuple(float(player[name]) for name in FEATURE_COLS)
+        if key in cache._entries:
+            assert _same(cache._entries[key], result)
@@ -0,0 +1,222 @@
+# src/training_pipeline.py
+
+"""
+Parallel training and comparison of the regression models (overall_rating).
+
+This is the scriptable version of the comparison done by hand in
+src/notebooks/ml_advanced_models.ipynb (Linear Regression, Random Forest,
+Gradient Boosting, XGBoost, each with a test-set evaluation and a 5-fold
+cross-validation on the training set).
+
+Every (model, fold) pair is an independent task, and the whole grid runs in a
+process pool:
+- the training data is sent once to each worker (pool initializer), not with every task,
+- each worker is limited to `threads_per_worker` threads (BLAS/OpenMP via threadpoolctl,
+  and n_jobs for XGBoost / Random Forest), so N workers never fight for more than
+  N x threads_per_worker cores.
+
+    python src/training_pipeline.py --workers 8
+    -> models/regression_results.csv (same columns as `regression_results` in the notebook)
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+
+from sklearn.model_selection import KFold, train_test_split
+from sklearn.linear_model import LinearRegression
+from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+from sklearn.preprocessing import StandardScaler
+from sklearn.pipeline import make_pipeline
+from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+from threadpoolctl import threadpool_limits
+import xgboost as xgb
+
+from feature_store import open_features
+from ml_analysis import DATA_PATH, MODELS_DIR
+
+
+RESULTS_PATH = os.path.join(MODELS_DIR, "regression_results.csv")
+
+# Same split and number of folds as the notebook
+TEST_SIZE = 0.2
+N_FOLDS = 5
+RANDOM_STATE = 42
+
+
+# ---------- Models of the comparison (same hyperparameters as the notebook) ----------
+
+def _linear_regression(n_threads):
+    # The notebook standardizes the features for the linear model only
+    return make_pipeline(StandardScaler(), LinearRegression())
+
+
+def _random_forest(n_threads):
+    return RandomForestRegressor(n_estimators=100, random_state=RANDOM_STATE, n_jobs=n_threads)
+
+
+def _gradient_boosting(n_threads):
+    return GradientBoostingRegressor(n_estimators=100, learning_rate=0.1, max_depth=5,
+                                     random_state=RANDOM_STATE)
+
+
+def _xgboost(n_threads):
+    return xgb.XGBRegressor(n_estimators=100, learning_rate=0.1, max_depth=5,
+                            random_state=RANDOM_STATE, n_jobs=n_threads)
+
+
+REGRESSION_MODELS = {
+    "Linear Regression": _linear_regression,
+    "Random Forest": _random_forest,
+    "Gradient Boosting": _gradient_boosting,
+    "XGBoost": _xgboost,
+}
+
+# Rough relative training cost, used to start the slowest tasks first (better load balancing)
+_COST_HINT = {"Random Forest": 3, "Gradient Boosting": 2, "XGBoost": 1, "Linear Regression": 0}
+
+
+# ---------- Worker side ----------
+
+# Filled once per worker process by _init_worker
+_WORKER = {}
+
+
+def _init_worker(X_train, y_train, X_test, y_test, threads_per_worker):
+    """Pool initializer: keep the data in the worker and cap its thread pools"""
+    # Also exported for libraries that read the environment when they start their pools
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = str(threads_per_worker)
+    _WORKER["limits"] = threadpool_limits(limits=threads_per_worker)
+    _WORKER.update(X_train=X_train, y_train=y_train, X_test=X_test, y_test=y_test,
+                   threads=threads_per_worker)
+
+
+def _run_task(model_name, fold, n_folds=N_FOLDS):
+    """
+    Train one model on one fold.
+
+    fold = None -> fit on the whole training set, evaluate on the test set.
+    fold = k    -> k-th of `n_folds` cross-validation folds on the training set (R² only).
+    """
+    # CPU time of the worker (all its threads), so the parallel efficiency can be measured
+    start = time.process_time()
+    model = REGRESSION_MODELS[model_name](_WORKER["threads"])
+    X_train, y_train = _WORKER["X_train"], _WORKER["y_train"]
+
+    if fold is None:
+        model.fit(X_train, y_train)
+        y_pred = model.predict(_WORKER["X_test"])
+        y_test = _WORKER["y_test"]
+        mse = mean_squared_error(y_test, y_pred)
+        metrics = {
+            "MSE": mse,
+            "RMSE": float(np.sqrt(mse)),
+            "MAE": mean_absolute_error(y_test, y_pred),
+            "R² (Test)": r2_score(y_test, y_pred),
+        }
+    else:
+        # Same folds as cross_val_score(cv=n_folds) on a regressor: KFold without shuffling
+        train_idx, valid_idx = list(KFold(n_splits=n_folds).split(X_train))[fold]
+        model.fit(X_train[train_idx], y_train[train_idx])
+        metrics = {"R² (CV)": r2_score(y_train[valid_idx], model.predict(X_train[valid_idx]))}
+
+    return model_name, fold, metrics, time.process_time() - start
+
+
+# ---------- Driver side ----------
+
+def load_training_data(data_path=DATA_PATH, test_size=TEST_SIZE):
+    """Features / overall_rating of the cleaned dataset, split like the notebook"""
+    features = open_features(data_path)
+    y = features.overall_rating.astype(np.float64)
+    return train_test_split(features.matrix, y, test_size=test_size, random_state=RANDOM_STATE)
+
+
+def compare_models(X_train, X_test, y_train, y_test, model_names=None, workers=None,
+                   threads_per_worker=1, n_folds=N_FOLDS):
+    """
+    Run the (model x fold) grid in a process pool and build the comparison table.
+
+    Returns (results DataFrame, timing dict). The DataFrame has the columns of the
+    notebook's `regression_results` plus the CV standard deviation and the total
+    training CPU time of each model.
+    """
+    model_names = list(model_names or REGRESSION_MODELS)
+    workers = workers or os.cpu_count() or 1
+    tasks = [(name, fold) for name in model_names for fold in [None] + list(range(n_folds))]
+    tasks.sort(key=lambda task: -_COST_HINT.get(task[0], 0))
+
+    start = time.perf_counter()
+    # "spawn" starts clean interpreters: forking a process that already started
+    # OpenMP threads (XGBoost, BLAS) can deadlock the children.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                             initargs=(X_train, y_train, X_test, y_test, threads_per_worker)) as pool:
+        futures = [pool.submit(_run_task, name, fold, n_folds) for name, fold in tasks]
+        outputs = [future.result() for future in futures]
+    wall_time = time.perf_counter() - start
+
+    rows = []
+    for name in model_names:
+        test_metrics = next(m for n, f, m, _ in outputs if n == name and f is None)
+        cv_scores = np.array([m["R² (CV)"] for n, f, m, _ in outputs if n == name and f is not None])
+        rows.append(dict(
+            Model=name,
+            **test_metrics,
+            **{"R² (CV Mean)": cv_scores.mean(), "R² (CV Std)": cv_scores.std(),
+               "Train CPU time (s)": sum(t for n, _, _, t in outputs if n == name)},
+        ))
+
+    timing = {
+        "wall_time": wall_time,
+        "cpu_time": sum(t for *_, t in outputs),
+        "workers": workers,
+        "threads_per_worker": threads_per_worker,
+        "tasks": len(tasks),
+    }
+    return pd.DataFrame(rows), timing
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel comparison of the regression models")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of worker processes")
+    parser.add_argument("--threads-per-worker", type=int, default=1,
+                        help="Threads each worker may use (XGBoost / BLAS / Random Forest)")
+    parser.add_argument("--models", nargs="+", choices=list(REGRESSION_MODELS), help="Subset of models to compare")
+    parser.add_argument("--folds", type=int, default=N_FOLDS, help="Number of cross-validation folds")
+    parser.add_argument("--output", default=RESULTS_PATH, help="CSV file for the comparison table")
+    args = parser.parse_args(argv)
+
+    X_train, X_test, y_train, y_test = load_training_data()
+    print(f"Training set: {len(X_train)} samples, test set: {len(X_test)} samples")
+
+    results, timing = compare_models(X_train, X_test, y_train, y_test, model_names=args.models,
+                                     workers=args.workers, threads_per_worker=args.threads_per_worker,
+                                     n_folds=args.folds)
+
+    print("\n" + "=" * 80)
+    print("REGRESSION MODELS COMPARISON - PREDICTING OVERALL RATING")
+    print("=" * 80)
+    print(results.to_string(index=False))
+    print("=" * 80)
+
+    best = results.loc[results["R² (Test)"].idxmax()]
+    print(f"\n🏆 BEST REGRESSION MODEL: {best['Model']} (R² = {best['R² (Test)']:.4f})")
+    n_cores = timing['workers'] * timing['threads_per_worker']
+    print(f"\n{timing['tasks']} tasks on {timing['workers']} workers x {timing['threads_per_worker']} thread(s): "
+          f"{timing['wall_time']:.1f} s wall time for {timing['cpu_time']:.1f} s of training CPU time "
+          f"(parallel efficiency {timing['cpu_time'] / timing['wall_time'] / n_cores:.0%})")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    results.to_csv(args.output, index=False)
+    print(f"Comparison table saved in: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
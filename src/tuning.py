@@ -0,0 +1,334 @@
+# src/tuning.py
+
+"""
+Hyperparameter search for the two models of ml_analysis.py.
+
+The notebook (ml_advanced_models.ipynb) tunes XGBoost with an exhaustive
+GridSearchCV: every combination is trained with its full number of trees.
+Most combinations are clearly bad after a fraction of the budget, so this module
+uses successive halving (or Hyperband, several halving brackets):
+- sample n random configurations and evaluate them all with a small budget,
+- keep the best 1/eta of them and multiply their budget by eta, until the full budget.
+
+Budget ("resource") of each search space:
+- regressor  : number of boosting rounds, with XGBoost early stopping on a validation
+               split (a configuration stops adding trees once it stops improving),
+- classifier : number of training rows (the logistic regression is cheap per row).
+
+The trials of a rung are independent and run in a process pool. Every finished
+trial is appended to a JSONL file: an interrupted search started again with the
+same arguments skips the trials that are already in the file.
+
+    python src/tuning.py --space regressor --workers 8
+    python src/tuning.py --space classifier --method hyperband
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import log_loss, mean_squared_error
+from threadpoolctl import threadpool_limits
+
+from feature_store import open_features
+from incremental_training import split_indices
+from ml_analysis import DATA_PATH, MODELS_DIR, build_classifier, build_regressor
+
+
+TUNING_DIR = os.path.join(MODELS_DIR, "tuning")
+
+RANDOM_STATE = 42
+VALID_SIZE = 0.2             # share of the training set used to score the trials
+EARLY_STOPPING_ROUNDS = 20
+
+
+# ---------- Search spaces ----------
+
+def _log_uniform(rng, low, high):
+    return float(math.exp(rng.uniform(math.log(low), math.log(high))))
+
+
+def _sample_regressor(rng):
+    return {
+        "learning_rate": _log_uniform(rng, 0.01, 0.3),
+        "max_depth": int(rng.integers(3, 10)),
+        "min_child_weight": _log_uniform(rng, 1.0, 20.0),
+        "subsample": float(rng.uniform(0.6, 1.0)),
+        "colsample_bytree": float(rng.uniform(0.5, 1.0)),
+        "reg_lambda": _log_uniform(rng, 0.1, 10.0),
+    }
+
+
+def _sample_classifier(rng):
+    return {
+        "C": _log_uniform(rng, 1e-3, 1e2),
+        "class_weight": [None, "balanced"][int(rng.integers(0, 2))],
+    }
+
+
+# Sampler, metric (lower is better) and budget range (max_resource None -> all the fit rows)
+SEARCH_SPACES = {
+    "regressor": {"sample": _sample_regressor, "metric": "rmse", "max_resource": 1000, "min_resource": 30},
+    "classifier": {"sample": _sample_classifier, "metric": "log_loss", "max_resource": None, "min_resource": 500},
+}
+
+
+# ---------- Worker side ----------
+
+# Filled once per worker process by _init_worker
+_WORKER = {}
+
+
+def _init_worker(data, threads_per_worker):
+    """Pool initializer: keep the data in the worker and cap its thread pools"""
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = str(threads_per_worker)
+    _WORKER["limits"] = threadpool_limits(limits=threads_per_worker)
+    _WORKER.update(data, threads=threads_per_worker)
+
+
+def _fit_regressor(params, resource):
+    model = build_regressor(**params, n_estimators=resource, early_stopping_rounds=EARLY_STOPPING_ROUNDS,
+                            eval_metric="rmse", n_jobs=_WORKER["threads"])
+    model.fit(_WORKER["X_reg_fit"], _WORKER["y_reg_fit"],
+              eval_set=[(_WORKER["X_reg_valid"], _WORKER["y_reg_valid"])], verbose=False)
+    y_pred = model.predict(_WORKER["X_reg_valid"], iteration_range=(0, model.best_iteration + 1))
+    score = float(np.sqrt(mean_squared_error(_WORKER["y_reg_valid"], y_pred)))
+    # Trees really trained (early stopping may stop before `resource`)
+    return score, {"best_iteration": int(model.best_iteration), "cost": model.get_booster().num_boosted_rounds()}
+
+
+def _fit_classifier(params, resource):
+    # The fit rows are in a stratified order, so every prefix contains all the classes
+    model = build_classifier(**params)
+    model.fit(_WORKER["X_cls_fit"][:resource], _WORKER["y_cls_fit"][:resource])
+    proba = model.predict_proba(_WORKER["X_cls_valid"])
+    score = float(log_loss(_WORKER["y_cls_valid"], proba, labels=model.classes_))
+    return score, {"n_iter": int(model.n_iter_.max()), "cost": resource}
+
+
+_FITTERS = {"regressor": _fit_regressor, "classifier": _fit_classifier}
+
+
+def _run_trial(space, config_id, params, resource):
+    start = time.perf_counter()
+    score, info = _FITTERS[space](params, resource)
+    return {"space": space, "config_id": config_id, "params": params, "resource": resource,
+            "score": score, **info, "seconds": time.perf_counter() - start}
+
+
+# ---------- Data ----------
+
+def _stratified_order(labels, seed=RANDOM_STATE):
+    """
+    Permutation where every class is spread evenly, so any prefix of the rows
+    keeps (roughly) the class proportions of the whole set.
+    """
+    rng = np.random.default_rng(seed)
+    position = np.empty(len(labels), dtype=np.float64)
+    for label in np.unique(labels):
+        idx = np.flatnonzero(labels == label)
+        rng.shuffle(idx)
+        position[idx] = (np.arange(len(idx)) + 0.5) / len(idx)
+    return np.argsort(position, kind="stable")
+
+
+def load_tuning_data(data_path=DATA_PATH):
+    """
+    Fit / validation splits of the ml_analysis training sets, one per model.
+
+    Each model's ml_analysis test split is left out (regressor: 30 %, classifier:
+    20 % stratified, see incremental_training.split_indices), so the tuned models
+    can still be compared to the current ones on rows none of them was fitted on.
+    """
+    features = open_features(data_path)
+    X = features.matrix
+    y_reg = features.overall_rating.astype(np.float64)
+    y_cls = features.future_class
+    (reg_train, _), (cls_train, _) = split_indices(y_cls)
+
+    X_reg_fit, X_reg_valid, y_reg_fit, y_reg_valid = train_test_split(
+        X[reg_train], y_reg[reg_train], test_size=VALID_SIZE, random_state=RANDOM_STATE)
+    X_cls_fit, X_cls_valid, y_cls_fit, y_cls_valid = train_test_split(
+        X[cls_train], y_cls[cls_train], test_size=VALID_SIZE, random_state=RANDOM_STATE)
+
+    order = _stratified_order(y_cls_fit)
+    return {
+        "X_reg_fit": X_reg_fit, "y_reg_fit": y_reg_fit, "X_reg_valid": X_reg_valid, "y_reg_valid": y_reg_valid,
+        "X_cls_fit": X_cls_fit[order], "y_cls_fit": y_cls_fit[order],
+        "X_cls_valid": X_cls_valid, "y_cls_valid": y_cls_valid,
+    }
+
+
+# ---------- Trial log ----------
+
+def load_trials(path):
+    """Finished trials of a previous run, keyed by (config_id, resource)"""
+    trials = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    trial = json.loads(line)
+                except json.JSONDecodeError:
+                    # Last line cut by an interruption: that trial is simply run again
+                    continue
+                trials[(trial["config_id"], trial["resource"])] = trial
+    return trials
+
+
+def _append_trial(path, trial):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(trial) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+# ---------- Search ----------
+
+def _brackets(method, n_candidates, min_resource, max_resource, eta):
+    """
+    (bracket id, number of configurations, number of halvings) of each successive halving run.
+
+    halving   -> one bracket: n_candidates configurations, from min_resource to max_resource.
+    hyperband -> s_max + 1 brackets, from "many configurations, small budget" to
+                 "few configurations, full budget" (Li et al., 2018).
+    """
+    s_max = max(int(math.log(max_resource / min_resource, eta) + 1e-9), 0)
+    if method == "halving":
+        return [(0, n_candidates, s_max)]
+    return [(s, int(math.ceil((s_max + 1) / (s + 1) * eta ** s)), s) for s in range(s_max, -1, -1)]
+
+
+def search(space, data, method="halving", n_candidates=27, eta=3, workers=None, threads_per_worker=1,
+           trials_path=None, seed=RANDOM_STATE, max_resource=None, verbose=True):
+    """
+    Run the search and return (best trial, all trials, summary dict).
+
+    The configurations are drawn from a seeded generator, so running the same search
+    again produces the same config_ids: the trials already in `trials_path` are reused.
+    """
+    settings = SEARCH_SPACES[space]
+    max_resource = max_resource or settings["max_resource"] or len(data["X_cls_fit"])
+    min_resource = min(settings["min_resource"], max_resource)
+    workers = workers or os.cpu_count() or 1
+
+    trials_path = trials_path or os.path.join(TUNING_DIR, f"{space}_trials.jsonl")
+    os.makedirs(os.path.dirname(os.path.abspath(trials_path)), exist_ok=True)
+    done = load_trials(trials_path)
+    n_reused = 0
+    all_trials = []
+
+    start = time.perf_counter()
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                             initargs=(data, threads_per_worker)) as pool:
+        for bracket, n_configs, n_halvings in _brackets(method, n_candidates, min_resource, max_resource, eta):
+            rng = np.random.default_rng([seed, bracket])
+            configs = {f"b{bracket}-c{i:03d}": settings["sample"](rng) for i in range(n_configs)}
+
+            for k in range(n_halvings + 1):
+                # Budget of the rung: max_resource / eta^(rungs left), so the last rung is exactly max_resource
+                resource = max(int(round(max_resource / eta ** (n_halvings - k))), 1)
+                rung = {}
+                pending = []
+                for config_id, params in configs.items():
+                    previous = done.get((config_id, resource))
+                    if previous is not None and previous["params"] == params:
+                        rung[config_id] = previous
+                        n_reused += 1
+                    else:
+                        pending.append(pool.submit(_run_trial, space, config_id, params, resource))
+                for future in as_completed(pending):
+                    trial = future.result()
+                    trial["bracket"] = bracket
+                    _append_trial(trials_path, trial)
+                    rung[trial["config_id"]] = trial
+
+                all_trials.extend(rung.values())
+                ranked = sorted(rung.values(), key=lambda t: t["score"])
+                if verbose:
+                    print(f"[bracket {bracket}] {len(rung):3d} configs @ {resource:6d} -> best "
+                          f"{settings['metric']} {ranked[0]['score']:.4f}")
+
+                if len(ranked) == 1:
+                    break
+                keep = max(len(ranked) // eta, 1)
+                configs = {t["config_id"]: t["params"] for t in ranked[:keep]}
+
+    # Only the trials trained with the full budget compete for the final choice
+    full = [t for t in all_trials if t["resource"] >= max_resource] or all_trials
+    best = min(full, key=lambda t: t["score"])
+    n_configs_total = len({t["config_id"] for t in all_trials})
+    summary = {
+        "wall_time": time.perf_counter() - start,
+        "trials": len(all_trials),
+        "reused_trials": n_reused,
+        "configs": n_configs_total,
+        "cost": sum(t["cost"] for t in all_trials),
+        # Same configurations, all trained with the full budget (what a grid search would do)
+        "exhaustive_cost": n_configs_total * max_resource,
+    }
+    return best, all_trials, summary
+
+
+def best_params(space, trial):
+    """Hyperparameters to give to build_regressor / build_classifier"""
+    params = dict(trial["params"])
+    if space == "regressor":
+        # Early stopping found the useful number of trees
+        params["n_estimators"] = trial["best_iteration"] + 1
+    return params
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Successive halving / Hyperband hyperparameter search")
+    parser.add_argument("--space", choices=list(SEARCH_SPACES), default="regressor")
+    parser.add_argument("--method", choices=["halving", "hyperband"], default="halving")
+    parser.add_argument("--candidates", type=int, default=27, help="Configurations of the halving run")
+    parser.add_argument("--eta", type=int, default=3, help="Keep 1/eta of the configurations at each rung")
+    parser.add_argument("--max-resource", type=int, help="Full budget (trees or training rows)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of worker processes")
+    parser.add_argument("--threads-per-worker", type=int, default=1)
+    parser.add_argument("--trials", help="JSONL trial log (default models/tuning/<space>_trials.jsonl)")
+    parser.add_argument("--seed", type=int, default=RANDOM_STATE)
+    args = parser.parse_args(argv)
+
+    data = load_tuning_data()
+    prefix = "reg" if args.space == "regressor" else "cls"
+    print(f"Fit set: {len(data[f'X_{prefix}_fit'])} samples, "
+          f"validation set: {len(data[f'X_{prefix}_valid'])} samples")
+
+    best, _, summary = search(args.space, data, method=args.method, n_candidates=args.candidates, eta=args.eta,
+                              workers=args.workers, threads_per_worker=args.threads_per_worker,
+                              trials_path=args.trials, seed=args.seed, max_resource=args.max_resource)
+
+    params = best_params(args.space, best)
+    metric = SEARCH_SPACES[args.space]["metric"]
+    print(f"\n🏆 Best {args.space} ({best['config_id']}): {metric} = {best['score']:.4f}")
+    for name, value in params.items():
+        print(f"  {name:18s} = {value}")
+    print(f"\n{summary['trials']} trials ({summary['reused_trials']} reused from the log) on "
+          f"{summary['configs']} configurations in {summary['wall_time']:.1f} s")
+    print(f"Budget used: {summary['cost']} vs {summary['exhaustive_cost']} for training every "
+          f"configuration with the full budget ({summary['cost'] / summary['exhaustive_cost']:.0%})")
+
+    best_path = os.path.join(TUNING_DIR, f"{args.space}_best.json")
+    os.makedirs(TUNING_DIR, exist_ok=True)
+    with open(best_path, "w", encoding="utf-8") as f:
+        json.dump({"params": params, "score": best["score"], "metric": metric}, f, indent=2)
+    print(f"Best parameters saved in: {best_path}")
+
+
+if __name__ == "__main__":
+    main()